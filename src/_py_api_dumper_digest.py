@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Digests of the source files of modules, used to detect changed modules.
+
+The module is a top-level module which does not import `py_api_dumper`, so that
+it can be shared by `py_api_dumper` and its pytest plugin without the plugin
+importing `py_api_dumper` into every pytest session.
+"""
+
+import hashlib
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+def module_digest(module_name: str, *salts: object) -> Optional[str]:
+    """Return a digest of the source files of the top-level module of a module.
+
+    The contents of the source and extension files of the top-level module
+    containing the module are digested, together with the Python version and
+    any further salts, e.g. versions of tools whose output depends on them.
+
+    Args:
+        module_name (str):
+            Name of the module.
+        *salts (object):
+            Further values which the digest depends on.
+
+    Returns:
+        Optional[str]: Hexadecimal digest, or None if the source files of the
+        module cannot be found or read.
+    """
+    try:
+        spec = importlib.util.find_spec(module_name.partition(".")[0])
+    except ValueError:
+        return None
+    if spec is None:
+        return None
+    suffixes = tuple(importlib.machinery.all_suffixes())
+    if spec.submodule_search_locations:
+        roots = [Path(p) for p in spec.submodule_search_locations]
+        if not all(root.is_dir() for root in roots):
+            return None
+        files = sorted(
+            (str(file.relative_to(root)), file)
+            for root in roots
+            for file in root.rglob("*")
+            if file.name.endswith(suffixes) and "__pycache__" not in file.parts
+        )
+    elif spec.has_location and spec.origin is not None:
+        files = [(Path(spec.origin).name, Path(spec.origin))]
+    else:
+        return None
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(":".join(map(str, (tuple(sys.version_info),) + salts)).encode())
+    hasher.update(b"\n")
+    try:
+        for name, file in files:
+            content = file.read_bytes()
+            hasher.update(f"{name}:{len(content)}\n".encode())
+            hasher.update(content)
+    except OSError:
+        return None
+    return hasher.hexdigest()
@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Pytest plugin providing the `api_snapshot` fixture.
+
+The plugin is a top-level module, and imports `py_api_dumper` only when its
+fixtures are used, so that registering the plugin does not import
+`py_api_dumper` into every pytest session.
+"""
+
+import functools
+import io
+import operator
+from typing import TYPE_CHECKING, Dict, Optional
+
+import pytest
+
+from _py_api_dumper_digest import module_digest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from py_api_dumper import APIDump
+
+
+def pytest_addoption(parser):
+    """Add command-line options for API snapshots."""
+    group = parser.getgroup("py-api-dumper", "API snapshots")
+    group.addoption(
+        "--api-snapshot-update",
+        action="store_true",
+        help="Rewrite API snapshots with the current APIs",
+    )
+    group.addoption(
+        "--api-snapshot-cache",
+        action="store_true",
+        help="Cache API dumps in the pytest cache directory, e.g. to share them"
+        " between pytest-xdist workers",
+    )
+    parser.addini(
+        "api_snapshot_dir",
+        help="Directory containing API snapshots, relative to each test file"
+        " (default: api_snapshots)",
+        default="api_snapshots",
+    )
+
+
+class _DumpCache:
+
+    def __init__(self, cache_dir):
+        self._dumps: Dict[str, "APIDump"] = dict()
+        self._cache_dir = cache_dir
+
+    def get(self, module_name):
+        from py_api_dumper import APIDump, __version__
+
+        # Return dump from memory, if already dumped this session
+        dump = self._dumps.get(module_name)
+        if dump is not None:
+            return dump
+
+        # Return dump from cache file, if module source files are unchanged
+        cache_file = None
+        if self._cache_dir is not None:
+            digest = module_digest(module_name, __version__)
+            if digest is not None:
+                cache_file = self._cache_dir / f"{module_name}-{digest}.json"
+                if cache_file.is_file():
+                    dump = self._dumps[module_name] = APIDump.load_from_file(cache_file)
+                    return dump
+
+        # Dump module, and save to cache file
+        dump = self._dumps[module_name] = APIDump.from_modules(module_name)
+        if cache_file is not None:
+            cache_file_tmp = cache_file.with_suffix(f".{id(self)}.tmp")
+            dump.save_to_file(cache_file_tmp)
+            cache_file_tmp.replace(cache_file)
+
+        return dump
+
+
+@pytest.fixture(scope="session")
+def api_dump_cache(request):
+    """Session-scoped cache of API dumps, used by `api_snapshot`.
+
+    Each module is dumped at most once per session. If `--api-snapshot-cache`
+    is given, dumps are also saved in the pytest cache directory, keyed by a
+    digest of the contents of the module's source files, so that they are
+    shared between pytest-xdist workers and reused by later sessions.
+    """
+    cache_dir = None
+    if request.config.getoption("api_snapshot_cache"):
+        cache_dir = request.config.cache.mkdir("py-api-dumper")
+    return _DumpCache(cache_dir)
+
+
+@pytest.fixture
+def api_snapshot(request, api_dump_cache):
+    """Assert that the public API of modules matches a stored snapshot.
+
+    Call the fixture with the names of one or more modules, and optionally the
+    name of the snapshot (default: the module names joined with `+`). Snapshots
+    are stored in the `api_snapshot_dir` directory next to the test file. If the
+    APIs differ from the snapshot, the test fails showing the differences; run
+    pytest with `--api-snapshot-update` to rewrite the snapshot instead.
+
+    Example:
+        ```python
+        def test_api(api_snapshot):
+            api_snapshot("mymod.sub")
+        ```
+    """
+    from py_api_dumper import APIDiff, APIDump, _print_entries
+
+    snapshot_dir = request.path.parent / request.config.getini("api_snapshot_dir")
+    update = request.config.getoption("api_snapshot_update")
+
+    def check(*module_names: str, name: Optional[str] = None) -> "APIDump":
+
+        # Dump module APIs, once per session
+        current = functools.reduce(
+            operator.or_, (api_dump_cache.get(m) for m in module_names)
+        )
+
+        snapshot_file = snapshot_dir / f"{name or '+'.join(module_names)}.json"
+        if update:
+
+            # Rewrite snapshot, if it differs
+            if (
+                not snapshot_file.is_file()
+                or APIDump.load_from_file(snapshot_file) != current
+            ):
+                snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+                current.save_to_file(snapshot_file)
+
+        elif not snapshot_file.is_file():
+            pytest.fail(
+                f"API snapshot {snapshot_file} does not exist;"
+                " run pytest with --api-snapshot-update to create it",
+                pytrace=False,
+            )
+
+        else:
+
+            # Compare against snapshot, and show differences on failure
+            diff = APIDiff(APIDump.load_from_file(snapshot_file), current)
+            if not diff.equal():
+                text = io.StringIO()
+                for prefix, entries in (("-", diff.removed), ("+", diff.added)):
+                    _print_entries(prefix, entries, text)
+                pytest.fail(
+                    f"API of {', '.join(module_names)} differs from snapshot"
+                    f" {snapshot_file}:\n{text.getvalue()}",
+                    pytrace=False,
+                )
+
+        return current
+
+    return check
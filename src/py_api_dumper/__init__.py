@@ -4,21 +4,41 @@
 
 """Python API dumping and comparison tool."""
 
+import bisect
+import bz2
 import contextlib
+import fnmatch
+import functools
 import gzip
+import hashlib
 import importlib
-import importlib.metadata
+import importlib.machinery
+import importlib.util
 import inspect
+import io
+import itertools
 import json
+import lzma
+import multiprocessing
+import os
 import pkgutil
 import sys
+import types
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from types import ModuleType, NoneType
 from typing import (
+    Any,
+    Callable,
     Dict,
     FrozenSet,
+    Iterable,
+    Iterator,
     List,
+    NamedTuple,
     Optional,
+    Sequence,
     Set,
     TextIO,
     Tuple,
@@ -29,11 +49,269 @@ from typing import (
     get_origin,
 )
 
+from _py_api_dumper_digest import module_digest
+
+from . import columnar
+from .git import GitImporter, GitObjectReader
+from .importtime import ImportProfiler
+from .index import DumpIndex as DumpIndex
+from .index import _glob_prefix, _match_kinds
+from .metadata import (
+    API_MANIFEST,
+    DistributionIndex,
+    _normalize_name,
+    _read_verified_metadata,
+)
+from .suppress import SuppressionRules as SuppressionRules
+from .threadsafe import silenced_output
+from .usage import UsedNames as UsedNames
+from .wheel import WheelImporter
+
 __author__ = "Karl Wette"
-__version__ = "4.1.1"
+__version__ = "5.0.0"
 
 APIDumpType = TypeVar("APIDumpType", bound="APIDump")
 
+Extractor = Callable[["APIDump", List[Tuple], Any, str, Any], None]
+
+
+class _Walk(NamedTuple):
+
+    # State of a walk over the members of a module and its classes:
+    # - `module`: module being walked
+    # - `used_names`: if given, names of used members to restrict the walk to
+    # - `compact_threshold`: if given, minimum number of members of the same type
+    #   to compact into a table
+    # - `table_members`: names of members of the struct being walked, by type, to
+    #   compact into tables
+    module: ModuleType
+    used_names: Optional[UsedNames] = None
+    compact_threshold: Optional[int] = None
+    table_members: Optional[Dict[str, List[str]]] = None
+
+
+# Compression of dump files, by file suffix, as the magic bytes starting the
+# compressed file, a function to open it, and a function to decompress it
+_COMPRESSION = {
+    ".gz": (b"\x1f\x8b", gzip.open, gzip.decompress),
+    ".bz2": (b"BZh", bz2.open, bz2.decompress),
+    ".xz": (b"\xfd7zXZ\x00", lzma.open, lzma.decompress),
+}
+_COMPRESSION_MAGIC_SIZE = max(len(c[0]) for c in _COMPRESSION.values())
+
+# Version of the format of dump files, saved in their header line
+# - version 1 (not saved) is a single JSON document
+# - version 2 is a header line followed by one line per API entry
+_DUMP_FORMAT_VERSION = 2
+
+
+def _element_name_index(element):
+
+    # Return the index of the name of an API entry element
+    # - the name follows the positional index of required arguments
+    return 2 if element[0] == "REQUIRED" else 1
+
+
+def _element_name(element):
+
+    # Return the name of an API entry element
+    return element[_element_name_index(element)]
+
+
+def _entry_path(entry):
+
+    # Return the dotted path of the names of an API entry's elements
+    return ".".join(str(_element_name(e)) for e in entry)
+
+
+def _element_sort_key(element):
+
+    # Return a byte string whose order is the order of an API entry element
+    # - strings are encoded in UTF-8, which preserves the order of code points,
+    #   with `\x00` escaped as `\x00\xff` and terminated by `\x00\x01`
+    # - integers are encoded in 8 bytes, big-endian, offset to be non-negative
+    # - integers sort before strings, and the element terminator `\x00` sorts
+    #   shorter elements first
+    parts = []
+    for value in element:
+        if isinstance(value, str):
+            parts.append(b"\x02")
+            parts.append(value.encode("utf-8").replace(b"\x00", b"\x00\xff"))
+            parts.append(b"\x00\x01")
+        else:
+            parts.append(b"\x01")
+            parts.append((value + (1 << 63)).to_bytes(8, "big"))
+    parts.append(b"\x00")
+    return b"".join(parts)
+
+
+def _entry_sort_key(entry, element_keys):
+
+    # Return a byte string whose order is the order of an API entry, caching the
+    # keys of elements, which are shared between many entries
+    parts = []
+    for element in entry:
+        key = element_keys.get(element)
+        if key is None:
+            key = element_keys[element] = _element_sort_key(element)
+        parts.append(key)
+    return b"".join(parts)
+
+
+def _sorted_entries(entries):
+
+    # Sort API entries by their byte sort keys, computed once per entry
+    element_keys = dict()
+    return sorted(entries, key=lambda entry: _entry_sort_key(entry, element_keys))
+
+
+def _print_entries(prefix, entries, file):
+
+    # Print entries as a tree, omitting prefixes common to previous entries
+    stack = []
+    for entry in _sorted_entries(entries):
+
+        # Find the longest common prefix with respect to previously-printed entries
+        i_start = 0
+        while len(stack) > 0:
+            for i in range(max(len(stack[-1]), len(entry))):
+                if stack[-1][0:i] == entry[0:i]:
+                    i_start = i
+            if i_start > 0:
+                break
+            stack.pop()  # pragma: no cover
+
+        # Print entry without common prefix; add to stack of printed entries
+        for i in range(i_start, len(entry)):
+            indent = "\t" * i
+            entry_str = " : ".join(str(e) for e in entry[i])
+            print(prefix + indent + entry_str, file=file)
+        stack.append(entry)
+
+
+def _entry_module(entry):
+
+    # Return the name of the module containing an API entry
+    module_names = []
+    for element in entry:
+        if element[0] != "MODULE":
+            break
+        module_names.append(element[1])
+    return ".".join(module_names)
+
+
+def _module_digest(module_name):
+
+    # Return a digest of the contents of the source and extension files of the
+    # top-level module containing a module, or None if they cannot be found
+    # - the digest also depends on the Python version, the version of this
+    #   package, and the dump file format, any of which may change the API dumped
+    return module_digest(module_name, __version__, _DUMP_FORMAT_VERSION)
+
+
+def _table_element(member_type, names, tables):
+
+    # Return the element of an API entry for a table of members of the same type,
+    # saving their names in `tables` by a digest of the names
+    names = sorted(names)
+    hasher = hashlib.blake2b(digest_size=16)
+    for name in names:
+        hasher.update(name.encode("utf-8"))
+        hasher.update(b"\n")
+    digest = hasher.hexdigest()
+    tables[digest] = names
+    return ("MEMBERS", member_type, len(names), digest)
+
+
+def _compact_entries(entries, threshold, tables):
+
+    # Replace member entries of the same type in the same module or class by a
+    # table, if there are at least `threshold` of them
+    groups = dict()
+    for entry in entries:
+        if entry[-1][0] == "MEMBER":
+            groups.setdefault((entry[:-1], entry[-1][2]), []).append(entry)
+    compacted = set(entries)
+    for (prefix, member_type), members in groups.items():
+        if len(members) >= threshold:
+            compacted.difference_update(members)
+            names = [member[-1][1] for member in members]
+            compacted.add(prefix + (_table_element(member_type, names, tables),))
+    return compacted
+
+
+def _expand_entries(entries, tables):
+
+    # Replace entries of tables of members by the entries of their members
+    # - tables whose names are not known are not expanded
+    for entry in entries:
+        element = entry[-1]
+        names = tables.get(element[3]) if element[0] == "MEMBERS" else None
+        if names is None:
+            yield entry
+            continue
+        prefix = entry[:-1]
+        for name in names:
+            yield prefix + (("MEMBER", name, element[1]),)
+
+
+def _derive_tables(entries, tables):
+
+    # Return `tables` with the names of the members of tables of members in
+    # `entries` whose names are not known, re-derived from the live modules
+    # which contain them
+    # - names are derived by dumping the modules with every group of members
+    #   compacted, and are kept only if their digest matches a table in `entries`
+    unknown = dict(
+        (entry[-1][3], entry[0][1])
+        for entry in entries
+        if entry[-1][0] == "MEMBERS" and entry[-1][3] not in tables
+    )
+    if not unknown:
+        return tables
+    tables = dict(tables)
+    for module_name in sorted(set(unknown.values())):
+        try:
+            live = APIDump.from_modules(module_name, compact_tables=1)
+        except ImportError:
+            continue
+        tables.update(
+            (digest, names)
+            for digest, names in live.tables.items()
+            if digest in unknown
+        )
+    return tables
+
+
+def _content_tables(content, file_path):
+
+    # Return the names of the members of tables of members saved with an API dump
+    # file: in the header of the file, as saved by earlier versions, and in the
+    # file of tables, if any, saved by `save_to_file(tables_file=...)`
+    # - a missing file of tables is ignored, and the tables are not expanded
+    tables = dict(content.get("tables", {}))
+    tables_file = content.get("tables_file")
+    if tables_file is not None and isinstance(file_path, (Path, str)):
+        try:
+            tables_path = Path(file_path).parent / tables_file
+            with APIDump._open_dump_file(tables_path, "rt") as file:
+                tables.update(json.load(file))
+        except OSError:
+            pass
+    return tables
+
+
+def _referenced_tables(entries, tables):
+
+    # Return the tables of members referenced by API entries, by digest
+    return dict(
+        sorted(
+            (entry[-1][3], tables[entry[-1][3]])
+            for entry in entries
+            if entry[-1][0] == "MEMBERS" and entry[-1][3] in tables
+        )
+    )
+
 
 class APIDump:
     """Dump the public API of a Python module and its members.
@@ -41,46 +319,299 @@ class APIDump:
     Attributes:
         dump_file (Path):
             File containing dump of the public API.
-        modules (Dict[str, Dict[str, str]]):
+        modules (Dict[str, Dict[str, Any]]):
             Information on modules in the public API.
+        tables (Dict[str, List[str]]):
+            Names of the members in each table of members, by digest; see
+            `from_modules(compact_tables=...)`.
     """
 
     dump_file: Path
-    modules: Dict[str, Dict[str, str]]
+    modules: Dict[str, Dict[str, Any]]
+    tables: Dict[str, List[str]]
 
-    def __init__(self, *, dump_file=None, modules, api):
+    # Extractors registered by member type, and cached by concrete member type
+    # - extractors of this class also take the state of the walk; see `_Walk`
+    _extractors: Dict[type, Callable[..., None]] = dict()
+    _extractor_cache: Dict[type, Callable[..., None]] = dict()
+
+    def __init__(self, *, dump_file=None, modules, api, tables=None):
         """Private constructor of an APIDump object."""
         self.dump_file = dump_file
         self.modules = modules
+        self.tables = tables if tables is not None else dict()
         self._api = api
+        self._query_index = None
+        self._sorted_api = None
+        self._delta_depth = 0
+        self._delta_chain = ()
+        self._git_digests = dict()
+        self._compact_threshold = None
 
     def __eq__(self, other):
         return self._api == other._api
 
     @property
     def api(self) -> FrozenSet:
-        """Return the Python modules' public API."""
+        """Return the Python modules' public API.
+
+        For frozen dumps, the API is returned without copying it.
+        """
+        if isinstance(self._api, frozenset):
+            return self._api
         return frozenset(self._api)
 
+    @property
+    def frozen(self) -> bool:
+        """Return whether the API dump is frozen, i.e. immutable."""
+        return isinstance(self._api, frozenset)
+
+    def freeze(self: APIDumpType) -> APIDumpType:
+        """Make the API dump immutable.
+
+        API dumps created by `from_modules()`, `load_from_file()`, etc., and by
+        set operations, are already frozen.
+
+        Returns:
+            APIDumpType: This APIDump instance.
+        """
+        if not isinstance(self._api, frozenset):
+            self._api = frozenset(self._api)
+        return self
+
+    def _combine(self, api, modules, tables):
+
+        # Return a frozen dump of the result of a set operation
+        if not isinstance(api, frozenset):
+            api = frozenset(api)
+        return type(self)(modules=modules, api=api, tables=tables)
+
+    def __or__(self, other):
+        """Return the union of two API dumps, with the modules of both."""
+        if not isinstance(other, APIDump):
+            return NotImplemented
+        return self._combine(
+            self._api | other._api,
+            {**self.modules, **other.modules},
+            {**self.tables, **other.tables},
+        )
+
+    def __and__(self, other):
+        """Return the intersection of two API dumps, with the modules of this one."""
+        if not isinstance(other, APIDump):
+            return NotImplemented
+        return self._combine(
+            self._api & other._api, dict(self.modules), dict(self.tables)
+        )
+
+    def __sub__(self, other):
+        """Return the difference of two API dumps, with the modules of this one."""
+        if not isinstance(other, APIDump):
+            return NotImplemented
+        return self._combine(
+            self._api - other._api, dict(self.modules), dict(self.tables)
+        )
+
+    def expand_tables(self: APIDumpType) -> APIDumpType:
+        """Return the API dump with each table of members replaced by its members.
+
+        The names of the members of tables are taken from `tables`, or else are
+        re-derived from the live modules, if they can be imported and their
+        tables have the same digests. Tables whose names are not known are not
+        expanded.
+
+        Returns:
+            APIDumpType: Frozen APIDump instance.
+        """
+        tables = _derive_tables(self._api, self.tables)
+        return self._combine(
+            _expand_entries(self._api, tables), dict(self.modules), dict()
+        )
+
+    def restrict_to(self: APIDumpType, module_prefix: str) -> APIDumpType:
+        """Return the part of the API dump in a module and its submodules.
+
+        If the dump's entries are already sorted, e.g. if it was loaded from a
+        file, the entries of the module are found by binary search on their
+        byte sort keys, instead of by scanning all entries.
+
+        Args:
+            module_prefix (str):
+                Name of the module, e.g. `mymod.sub`.
+
+        Returns:
+            APIDumpType: Frozen APIDump instance.
+        """
+        prefix = tuple(("MODULE", m) for m in module_prefix.split("."))
+        modules = dict(
+            (module, info)
+            for module, info in self.modules.items()
+            if (module + ".").startswith(module_prefix + ".")
+            or module_prefix.startswith(module + ".")
+        )
+
+        if self._sorted_api is not None and len(self._sorted_api) == len(self._api):
+
+            # Find the range of sorted entries whose keys start with the prefix key
+            element_keys: Dict = dict()
+            prefix_key = _entry_sort_key(prefix, element_keys)
+            sorted_api = self._sorted_api
+            start = bisect.bisect_left(
+                sorted_api,
+                prefix_key,
+                key=lambda entry: _entry_sort_key(entry, element_keys),
+            )
+            end = bisect.bisect_left(
+                sorted_api,
+                prefix_key + b"\xff",
+                lo=start,
+                key=lambda entry: _entry_sort_key(entry, element_keys),
+            )
+            entries = sorted_api[start:end]
+            inst = type(self)(
+                modules=modules, api=frozenset(entries), tables=self.tables
+            )
+            inst._sorted_api = entries
+
+        else:
+
+            # Find entries which start with the prefix
+            n = len(prefix)
+            inst = type(self)(
+                modules=modules,
+                api=frozenset(e for e in self._api if e[:n] == prefix),
+                tables=self.tables,
+            )
+
+        return inst
+
+    def _sorted(self):
+
+        # Return entries in sorted order, sorting them only once; dumps saved
+        # in sorted order are not sorted again when loaded
+        if self._sorted_api is None or len(self._sorted_api) != len(self._api):
+            self._sorted_api = _sorted_entries(self._api)
+        return self._sorted_api
+
+    def query(self, pattern: str, kinds: Optional[Iterable[str]] = None) -> List[Tuple]:
+        """Find API entries whose dotted paths match a pattern.
+
+        The dotted path of an entry joins the names of its elements with `.`,
+        e.g. `mymod.MyClass.my_method.arg`. Patterns may contain shell-style
+        wildcards (`*`, `?`, `[...]`), which also match `.`; the literal prefix
+        of the pattern before any wildcard is located by binary search in a
+        sorted index of entries, which is built on the first query.
+
+        Args:
+            pattern (str):
+                Pattern matching dotted paths of API entries.
+            kinds (Optional[Iterable[str]]):
+                If given, only find entries of these kinds, e.g. `CLASS`.
+
+        Returns:
+            List[Tuple]: Matching API entries, sorted by dotted path.
+        """
+
+        # Build index of entries sorted by dotted path
+        if self._query_index is None or len(self._query_index[0]) != len(self._api):
+            index = sorted((_entry_path(entry), entry) for entry in self._api)
+            self._query_index = ([p for p, _ in index], [e for _, e in index])
+        paths, entries = self._query_index
+
+        # Find entries whose paths start with the literal prefix of `pattern`
+        prefix = _glob_prefix(pattern)
+        match_kind = _match_kinds(kinds)
+        results = []
+        for i in range(bisect.bisect_left(paths, prefix), len(paths)):
+            if not paths[i].startswith(prefix):
+                break
+            if fnmatch.fnmatchcase(paths[i], pattern) and match_kind(entries[i][-1][0]):
+                results.append(entries[i])
+
+        return results
+
     @staticmethod
     def _import_module(module_name):
 
-        # Import module, silencing any printed output
-        with contextlib.redirect_stdout(None):
-            with contextlib.redirect_stderr(None):
-                module = importlib.import_module(module_name)
+        # Import module, silencing any output printed by this thread
+        with silenced_output():
+            module = importlib.import_module(module_name)
 
         return module
 
+    @classmethod
+    def _dump_module(cls, module, used_names=None, compact_tables=None, tables=None):
+
+        # Dump module API into a separate instance, so that no state is shared
+        # between modules dumped concurrently, optionally restricted to used names
+        # - tables of members are saved in `tables`, if given
+        part = cls(api=set(), modules=dict(), tables=tables)
+        module_prefix = [("MODULE", m) for m in module.__name__.split(".")]
+        part._dump_struct(
+            module_prefix, module, _Walk(module, used_names, compact_tables)
+        )
+        return part._api
+
     @classmethod
     def from_modules(
-        cls: Type[APIDumpType], *modules: Union[ModuleType, str]
+        cls: Type[APIDumpType],
+        *modules: Union[ModuleType, str],
+        dist_index: Optional[DistributionIndex] = None,
+        profile_imports: bool = False,
+        executor: Optional[Executor] = None,
+        use_manifests: bool = True,
+        used_names: Optional[UsedNames] = None,
+        compact_tables: Optional[int] = None,
+        digests: bool = False,
     ) -> APIDumpType:
         """Dump the public API of the given Python modules.
 
+        Dumping is thread-safe: output printed while importing is silenced only
+        in the importing thread, and changes to the import system, e.g. by
+        `from_wheel()`, are made while holding a lock.
+
+        Modules given by name whose distribution embeds a valid API manifest,
+        which was dumped from them, are not imported; their APIs are read from
+        the manifest instead. See `from_manifest()` for details.
+
         Args:
             *modules (Union[ModuleType, str]):
                 List of modules and/or their string names.
+            dist_index (Optional[DistributionIndex]):
+                Index used to find the distributions which install the modules
+                (default: index the current search path once per run).
+            profile_imports (bool):
+                If True, measure the time and memory cost of importing each
+                module, and save them in the module information under `imports`.
+                See `ImportProfiler` for details.
+            executor (Optional[Executor]):
+                If given, walk the APIs of the modules in parallel using this
+                executor, e.g. a `ThreadPoolExecutor`. Modules are still imported,
+                and their source files digested if requested, one at a time by
+                the calling thread, before any module is walked; with the global
+                interpreter lock, threads also walk modules one at a time.
+            use_manifests (bool):
+                If False, import all modules, even if their distributions embed
+                an API manifest.
+            used_names (Optional[UsedNames]):
+                If given, restrict the API to the used names, e.g. of a consumer
+                codebase scanned with `UsedNames.from_paths()`. Only submodules
+                which enclose used names are imported, and only members which
+                are used or enclose used names are walked.
+            compact_tables (Optional[int]):
+                If given, replace the `MEMBER` entries of each module or class
+                which have the same type, if there are at least this many, e.g.
+                the members of an `Enum` or a table of constants, by a single
+                `MEMBERS` entry with their type, number, and a digest of their
+                names. The names are kept in `tables` by digest, but are saved
+                only if requested; see `save_to_file(tables_file=...)`, and
+                `APIDiff(expand_tables=True)` to compare members of tables.
+            digests (bool):
+                If True, save a digest of the source and extension files of each
+                module in the module information under `digest`, so that
+                `check()` against this dump skips modules which are unchanged.
+                The digest also depends on the versions of Python and of this
+                package.
 
         Returns:
             APIDumpType: APIDump instance.
@@ -88,23 +619,434 @@ class APIDump:
 
         # Create instance
         inst = cls(api=set(), modules=dict())
+        inst._compact_threshold = compact_tables
+
+        # Load all modules, optionally measuring their import costs
+        # - APIs of modules read from API manifests are added to `manifest_apis`
+        profiler = ImportProfiler() if profile_imports else None
+        manifest_apis: Optional[List[FrozenSet]] = [] if use_manifests else None
+        with profiler or contextlib.nullcontext():
+            all_modules = inst._load_all_modules(
+                modules,
+                dist_index or DistributionIndex.cached(),
+                manifest_apis,
+                used_names,
+                digests,
+            )
+        if profiler is not None:
+            for module_name, module_info in inst.modules.items():
+                module_info["imports"] = dict(
+                    (name, metrics)
+                    for name, metrics in sorted(profiler.metrics.items())
+                    if (name + ".").startswith(module_name + ".")
+                )
+
+        # Compact tables of members of modules read from API manifests
+        if compact_tables is not None and manifest_apis:
+            manifest_apis = [
+                _compact_entries(api, compact_tables, inst.tables)
+                for api in manifest_apis
+            ]
+
+        # Dump module APIs, optionally in parallel, into a frozen dump
+        map_modules = map if executor is None else executor.map
+        dump_module = functools.partial(
+            cls._dump_module,
+            used_names=used_names,
+            compact_tables=compact_tables,
+            tables=inst.tables,
+        )
+        inst._api = frozenset(
+            itertools.chain.from_iterable(
+                itertools.chain(
+                    manifest_apis or [], map_modules(dump_module, all_modules)
+                )
+            )
+        )
+
+        return inst
+
+    @classmethod
+    def from_manifest(
+        cls: Type[APIDumpType],
+        dist_name: str,
+        dist_index: Optional[DistributionIndex] = None,
+    ) -> Optional[APIDumpType]:
+        """Read the API manifest embedded in an installed distribution.
+
+        Wheels built with the `py_api_dumper.build` backend embed an API dump of
+        their modules, made at build time, in their `.dist-info` directory. The
+        manifest is read only if it, and every other file installed by the
+        distribution, match their hashes in the distribution's RECORD, i.e. if
+        the installed modules are those which were dumped. No modules are
+        imported.
+
+        Args:
+            dist_name (str):
+                Name of the distribution.
+            dist_index (Optional[DistributionIndex]):
+                Index used to find the distribution (default: index the current
+                search path once per run).
+
+        Returns:
+            Optional[APIDumpType]: APIDump instance, or None if the distribution
+            does not embed a valid API manifest.
+
+        Raises:
+            importlib.metadata.PackageNotFoundError:
+                If the distribution is not installed.
+        """
+        dist = (dist_index or DistributionIndex.cached()).distribution(dist_name)
+
+        # Read and validate API manifest
+        data = _read_verified_metadata(dist, API_MANIFEST)
+        if data is None:
+            return None
+        content = _load_dump_content(io.BufferedReader(io.BytesIO(data)))
+
+        # Locate the module paths saved relative to the distribution
+        for module_info in content["modules"].values():
+            if module_info.get("path") is not None:
+                module_info["path"] = str(dist.locate_file(module_info["path"]))
+
+        return cls._from_dump_content(None, content)
+
+    @classmethod
+    def check(
+        cls,
+        baseline: Union["APIDump", Path, str],
+        *modules: Union[ModuleType, str],
+        max_differences: Optional[int] = 1,
+    ) -> List[Tuple[str, Tuple]]:
+        """Compare the public API of the given Python modules against a baseline.
+
+        Entries are compared while the modules are walked, and walking stops as
+        soon as `max_differences` differences have been found. Added entries are
+        found as they are walked; removed entries are found once the module which
+        contained them has been walked. Modules whose source files have the same
+        digest as saved in the baseline, if dumped with
+        `from_modules(digests=True)`, are not imported or walked at all.
+        Tables of members are compacted as in the baseline; see
+        `from_modules(compact_tables=...)`.
+
+        Args:
+            baseline (Union[APIDump, Path, str]):
+                API dump, or file containing it, to compare against.
+            *modules (Union[ModuleType, str]):
+                List of modules and/or their string names (default: the modules
+                in the baseline).
+            max_differences (Optional[int]):
+                Stop after finding this many differences (default: 1). If None,
+                find all differences.
+
+        Returns:
+            List[Tuple[str, Tuple]]: Differences in the order found, as tuples of
+            `-` and an entry removed from the baseline, or `+` and an entry added
+            to it. Empty if the APIs match.
+        """
+        if not isinstance(baseline, APIDump):
+            baseline = cls.load_from_file(baseline)
+        checker = _APIChecker(baseline, max_differences)
+        try:
+            for module_or_name in modules or list(baseline.modules):
+                checker.check_module(module_or_name)
+        except _CheckLimitReached:
+            pass
+        return checker.differences
+
+    @classmethod
+    def matches(
+        cls,
+        baseline: Union["APIDump", Path, str],
+        *modules: Union[ModuleType, str],
+    ) -> bool:
+        """Return whether the public API of Python modules matches a baseline.
+
+        Stops at the first difference; see `check()` for details.
+
+        Args:
+            baseline (Union[APIDump, Path, str]):
+                API dump, or file containing it, to compare against.
+            *modules (Union[ModuleType, str]):
+                List of modules and/or their string names (default: the modules
+                in the baseline).
+
+        Returns:
+            bool: True if the APIs match.
+        """
+        return len(cls.check(baseline, *modules, max_differences=1)) == 0
+
+    @classmethod
+    def from_wheel(
+        cls: Type[APIDumpType],
+        wheel_file: Union[Path, str],
+        *modules: str,
+        cache_dir: Optional[Union[Path, str]] = None,
+        profile_imports: bool = False,
+        use_manifests: bool = True,
+        used_names: Optional[UsedNames] = None,
+        compact_tables: Optional[int] = None,
+    ) -> APIDumpType:
+        """Dump the public API of the Python modules in a wheel file.
+
+        The wheel is not installed; see `WheelImporter` for details. The version
+        of the dumped modules is that given in the wheel's metadata. If the
+        wheel embeds an API manifest, its modules are not imported.
+
+        Args:
+            wheel_file (Union[Path, str]):
+                Wheel file.
+            *modules (str):
+                Names of modules to dump (default: the public top-level modules
+                installed by the wheel).
+            cache_dir (Optional[Union[Path, str]]):
+                Directory in which to cache wheels containing extension modules
+                once extracted (default: extract to a temporary directory).
+            profile_imports (bool):
+                If True, measure the time and memory cost of importing each
+                module. See `from_modules()` for details.
+            use_manifests (bool):
+                If False, import all modules, even if the wheel embeds an API
+                manifest.
+            used_names (Optional[UsedNames]):
+                If given, restrict the API to the used names. See
+                `from_modules()` for details.
+            compact_tables (Optional[int]):
+                If given, replace tables of at least this many members by single
+                entries. See `from_modules()` for details.
+
+        Returns:
+            APIDumpType: APIDump instance.
+        """
+        with WheelImporter(wheel_file, cache_dir) as importer:
+            return cls.from_modules(
+                *(modules or importer.modules),
+                dist_index=importer.dist_index,
+                profile_imports=profile_imports,
+                use_manifests=use_manifests,
+                used_names=used_names,
+                compact_tables=compact_tables,
+            )
+
+    @classmethod
+    def from_git(
+        cls: Type[APIDumpType],
+        rev: str,
+        path: Union[Path, str] = ".",
+        *,
+        repo_dir: Optional[Union[Path, str]] = None,
+    ) -> APIDumpType:
+        """Dump the public API of the Python modules in a git revision.
+
+        The revision is not checked out; see `GitImporter` for details. The
+        version of the dumped modules is the revision.
+
+        Args:
+            rev (str):
+                Git revision.
+            path (Union[Path, str]):
+                Directory in the git revision, relative to `repo_dir`, which
+                either contains top-level modules or is itself a package.
+            repo_dir (Optional[Union[Path, str]]):
+                Directory within the git repository (default: current directory).
+
+        Returns:
+            APIDumpType: APIDump instance.
+        """
+        with GitObjectReader(repo_dir) as reader:
+            return cls._from_git(reader, rev, str(path), None)
+
+    @classmethod
+    def _from_git(cls, reader, rev, path, base):
+
+        # Create instance
+        inst = cls(dump_file=Path(f"{rev}:{path}"), api=set(), modules=dict())
+
+        # Entries of modules in the base dump, if any
+        module_apis: List[Iterable] = []
+        base_entries = dict()
+        if base is not None:
+            for entry in base._api:
+                base_entries.setdefault(_entry_module(entry), []).append(entry)
+
+        with GitImporter(reader, rev, path) as importer:
+            for module_name in importer.modules:
+
+                # Save module information for top-level modules
+                if "." not in module_name:
+                    inst.modules[module_name] = {
+                        "distribution": None,
+                        "version": rev,
+                        "path": importer.get_filename(module_name),
+                    }
+
+                # Reuse entries of module from the base dump if its source code,
+                # and that of the modules it imports, is unchanged
+                digest = inst._git_digests[module_name] = importer.digest(module_name)
+                if base is not None and base._git_digests.get(module_name) == digest:
+                    module_apis.append(base_entries.get(module_name, ()))
+                    continue
 
-        # Load all modules
-        all_modules = inst._load_all_modules(modules)
+                # Otherwise dump module API
+                module = APIDump._import_module(module_name)
+                module_apis.append(cls._dump_module(module))
 
-        # Dump module APIs
-        for module in all_modules:
-            module_prefix = [("MODULE", m) for m in module.__name__.split(".")]
-            inst._dump_struct(module_prefix, module, module)
+        # Freeze dump
+        inst._api = frozenset(itertools.chain.from_iterable(module_apis))
 
         return inst
 
-    def _load_all_modules(self, modules):
+    @classmethod
+    def dump_installed(
+        cls,
+        shard_dir: Union[Path, str],
+        *distributions: str,
+        dist_index: Optional[DistributionIndex] = None,
+        max_workers: Optional[int] = None,
+        max_modules_per_worker: int = 100,
+    ) -> Dict:
+        """Dump the public APIs of installed distributions to one file per distribution.
+
+        Each distribution is dumped in a worker process, and its dump is saved
+        in its own *shard* file in `shard_dir`, so that neither the imported
+        modules nor the API entries of all distributions are in memory at once.
+        Worker processes are replaced once they have dumped about
+        `max_modules_per_worker` top-level modules each. Top-level modules which
+        fail to import are recorded in the module information of the shard
+        under `error`, instead of aborting the dump. If a worker process crashes
+        while dumping a distribution, the distribution is dumped again on its
+        own, and if it crashes again, all its modules are recorded as failed.
+
+        Shard files are named after the normalised name and version of each
+        distribution, and are only written once complete. Distributions whose
+        shard files already exist are skipped, so that an interrupted dump can
+        be resumed by running it again.
+
+        Args:
+            shard_dir (Union[Path, str]):
+                Directory in which to save shard files.
+            *distributions (str):
+                Names of distributions to dump (default: all distributions in
+                `dist_index` which install public top-level modules).
+            dist_index (Optional[DistributionIndex]):
+                Index of installed distributions (default: index the current
+                search path once per run).
+            max_workers (Optional[int]):
+                Maximum number of worker processes (default: number of CPUs).
+                If 1, dump all distributions in the current process.
+            max_modules_per_worker (int):
+                Approximate number of top-level modules each worker process dumps
+                before it is replaced.
+
+        Returns:
+            Dict: Summary of the dump: `shards` lists the `distribution`,
+            `version`, `shard` file, number of API `entries`, and import `errors`
+            of each top-level module which failed, for each distribution in
+            order of name, or whether its shard was `skipped` as it already
+            existed; `errors` gives the total number of failed modules.
+        """
+        shard_dir = Path(shard_dir)
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        dist_index = dist_index or DistributionIndex.cached()
+
+        # List distributions to dump, and their shard files
+        versions = dist_index.distributions()
+        names = dict((_normalize_name(name), name) for name in versions)
+        tasks: List[Tuple[str, str, List[str], Path]] = []
+        for dist_name in sorted(distributions or versions, key=_normalize_name):
+            modules = dist_index.top_level_modules(dist_name)
+            if len(modules) == 0:
+                continue
+            dist_name = names[_normalize_name(dist_name)]
+            version = versions[dist_name]
+            shard_file = shard_dir / f"{_normalize_name(dist_name)}-{version}.json.gz"
+            tasks.append((dist_name, version, modules, shard_file))
+
+        # Skip distributions whose shard files exist from a previous run
+        results: Dict[str, Dict[str, Any]] = dict()
+        pending = []
+        for task in tasks:
+            if task[-1].is_file():
+                results[task[0]] = {
+                    "distribution": task[0],
+                    "version": task[1],
+                    "shard": str(task[-1]),
+                    "skipped": True,
+                }
+            else:
+                pending.append(task)
+
+        if max_workers == 1:
+
+            # Dump distributions in the current process
+            for task in pending:
+                results[task[0]] = _dump_shard(cls, dist_index, *task)
+
+        else:
+
+            # Dump distributions in worker processes, replacing the workers once
+            # they have dumped about `max_modules_per_worker` modules each
+            n_workers = max_workers or multiprocessing.cpu_count()
+            crashed = []
+            while len(pending) > 0:
+                n_modules = 0
+                chunk = []
+                while (
+                    len(pending) > 0 and n_modules < n_workers * max_modules_per_worker
+                ):
+                    task = pending.pop(0)
+                    chunk.append(task)
+                    n_modules += len(task[2])
+                crashed.extend(
+                    _dump_shards_in_workers(cls, dist_index, chunk, n_workers, results)
+                )
+
+            # Dump distributions whose workers crashed, one at a time, and
+            # record their modules as failed if they crash again
+            for dist_name, version, modules, shard_file in crashed:
+                task = (dist_name, version, modules, shard_file)
+                if _dump_shards_in_workers(cls, dist_index, [task], 1, results):
+                    results[dist_name] = _dump_shard(
+                        cls, dist_index, *task, error="worker process crashed"
+                    )
+
+        shards = [results[task[0]] for task in tasks]
+        return {
+            "shards": shards,
+            "errors": sum(len(shard.get("errors", {})) for shard in shards),
+        }
+
+    def _load_all_modules(
+        self, modules, dist_index, manifest_apis=None, used_names=None, digests=False
+    ):
 
         # Walk and load (sub)modules
         all_modules = dict()
+        manifests = dict()
         for module_or_name in modules:
 
+            # Read APIs of modules given by name from the API manifest of their
+            # distribution, if any, instead of importing them
+            if manifest_apis is not None and isinstance(module_or_name, str):
+                dist_name, _ = dist_index.lookup(module_or_name)
+                if dist_name is not None and dist_name not in manifests:
+                    manifests[dist_name] = APIDump.from_manifest(dist_name, dist_index)
+                manifest = manifests.get(dist_name)
+                if manifest is not None and module_or_name in manifest.modules:
+                    self.modules[module_or_name] = manifest.modules[module_or_name]
+                    manifest_api = manifest.restrict_to(module_or_name)._api
+                    if used_names is not None:
+                        manifest_api = frozenset(
+                            entry
+                            for entry in manifest_api
+                            if used_names._keeps(
+                                [str(_element_name(e)) for e in entry],
+                                [e[0] for e in entry],
+                            )
+                        )
+                    manifest_apis.append(manifest_api)
+                    continue
+
             # Load module if supplied a string name
             if isinstance(module_or_name, ModuleType):
                 module = module_or_name
@@ -118,12 +1060,12 @@ class APIDump:
             # Save module information:
             module_info = self.modules[module.__name__] = dict()
 
-            # - Save module version
-            try:
-                module_info["version"] = str(
-                    importlib.metadata.version(module.__name__)
-                )
-            except importlib.metadata.PackageNotFoundError:
+            # - Save module distribution and version
+            dist_name, dist_version = dist_index.lookup(module.__name__)
+            module_info["distribution"] = dist_name
+            if dist_version is not None:
+                module_info["version"] = dist_version
+            else:
                 try:
                     module_info["version"] = str(module.__version__)
                 except AttributeError:
@@ -135,25 +1077,131 @@ class APIDump:
             except AttributeError:  # pragma: no cover
                 module_info["path"] = None
 
-            # Walk submodules
-            for submodule_info in pkgutil.walk_packages(
-                module.__path__, module.__name__ + "."
-            ):
+            # - Save digest of module source files, if requested
+            if digests:
+                module_info["digest"] = _module_digest(module.__name__)
 
-                # Exclude private submodules
-                if any(m.startswith("_") for m in submodule_info.name.split(".")):
-                    continue
-
-                # Load submodule
-                submodule = APIDump._import_module(submodule_info.name)
-
-                # Save submodule
+            # Walk and save submodules, if module is a package, optionally only
+            # those which enclose used names
+            if used_names is None:
+                submodules = APIDump._iter_submodules(module)
+            else:
+                submodules = APIDump._iter_used_submodules(module, used_names)
+            for submodule in submodules:
                 if submodule.__name__ not in all_modules:
                     all_modules[submodule.__name__] = submodule
 
         return list(all_modules.values())
 
-    def _add_api_entry(self, entry):
+    @staticmethod
+    def _iter_submodules(module):
+
+        # Walk and load submodules, if module is a package
+        for submodule_info in pkgutil.walk_packages(
+            getattr(module, "__path__", []), module.__name__ + "."
+        ):
+
+            # Exclude private submodules
+            if any(m.startswith("_") for m in submodule_info.name.split(".")):
+                continue
+
+            # Load submodule
+            yield APIDump._import_module(submodule_info.name)
+
+    @staticmethod
+    def _iter_used_submodules(module, used_names):
+
+        # Load the submodules of a module which enclose used names, without
+        # walking other submodules
+        # - a name is a submodule only if its parent is a module
+        found = {module.__name__}
+        for name in used_names._submodules(module.__name__):
+            if name.rpartition(".")[0] not in found:
+                continue
+            try:
+                spec = importlib.util.find_spec(name)
+            except (ImportError, ValueError):
+                spec = None
+            if spec is not None:
+                found.add(name)
+                yield APIDump._import_module(name)
+
+    @classmethod
+    def register_extractor(cls, member_type: type, extractor: Extractor) -> None:
+        """Register a function to extract API entries from members of a type.
+
+        When dumping a module or class, each public member is passed to the
+        extractor registered for the first type in the method resolution order
+        of the member's type. The extractor is found once per concrete type,
+        and registered on this class or any of its base classes. Extractors are
+        registered for modules (which are skipped), classes, functions and
+        methods, and properties; members of other types are classified using
+        `inspect` once per type, and dumped as functions or plain members.
+
+        The extractor is called as `extractor(dump, prefix, struct, name,
+        member)`, where `prefix` is the API entry of the module or class
+        `struct` containing the member `name`, and adds API entries by calling
+        `dump.add_api_entry()`. Extractors are not registered in the worker
+        processes of `dump_installed()`.
+
+        Args:
+            member_type (type):
+                Type of members to extract API entries from.
+            extractor (Extractor):
+                Function which extracts API entries from a member.
+
+        Example:
+            ```python
+            def extract_enum_member(dump, prefix, struct, name, member):
+                dump.add_api_entry(prefix + [("ENUM", name, repr(member.value))])
+
+            APIDump.register_extractor(enum.Enum, extract_enum_member)
+            ```
+        """
+        if "_extractors" not in cls.__dict__:
+            cls._extractors = dict()
+        cls._extractors[member_type] = extractor
+
+        # Clear cached extractors of this class and its subclasses
+        classes = [cls]
+        while classes:
+            klass = classes.pop()
+            klass._extractor_cache = dict()
+            classes.extend(klass.__subclasses__())
+
+    def _extractor(self, member):
+
+        # Return the extractor for a member, cached by its type
+        extractor = self._extractor_cache.get(type(member))
+        if extractor is None:
+            extractor = self._extractor_cache[type(member)] = self._find_extractor(
+                member
+            )
+        return extractor
+
+    def _find_extractor(self, member):
+
+        # Find the extractor registered for the first type in the method resolution
+        # order of the member's type, on this class or its base classes
+        for member_type in type(member).__mro__:
+            for klass in type(self).__mro__:
+                extractor = klass.__dict__.get("_extractors", {}).get(member_type)
+                if extractor is not None:
+                    return extractor
+
+        # Classify members of other types
+        # - the `inspect` predicates used depend only on the type of the member
+        if inspect.isroutine(member):
+            return APIDump._extract_routine
+        return APIDump._extract_member
+
+    def add_api_entry(self, entry: Sequence[Tuple]) -> None:
+        """Add an API entry, e.g. from an extractor; see `register_extractor()`.
+
+        Args:
+            entry (Sequence[Tuple]):
+                Elements of the API entry, containing only `str` or `int` values.
+        """
 
         # Check that `entry` only contains `str` or `int` values
         _allowed_types = (str, int)
@@ -164,21 +1212,21 @@ class APIDump:
         # Add API entry
         self._api.add(tuple(entry))
 
-    def _dump_struct(self, prefix, struct, module):
+    def _dump_struct(self, prefix, struct, walk):
 
         # Add base entry
-        self._add_api_entry(prefix)
+        self.add_api_entry(prefix)
 
         # Iterate over struct members
+        # - members of this struct are collected by type, if compacting tables
         members = inspect.getmembers(struct)
-        module_name_with_dot = module.__name__ + "."
+        module_name_with_dot = walk.module.__name__ + "."
+        if walk.used_names is not None:
+            struct_path = _entry_path(prefix)
+        if walk.compact_threshold is not None:
+            walk = walk._replace(table_members=dict())
         for member_name, member in members:
 
-            # Exclude any modules
-            # - all relevant modules have already been found by _load_all_modules()
-            if inspect.ismodule(member):
-                continue
-
             # Exclude any private members, except class constructors
             if member_name.startswith("_") and member_name != "__init__":
                 continue
@@ -202,31 +1250,70 @@ class APIDump:
                 if not import_member:
                     continue
 
-            # Dump classes
-            if inspect.isclass(member):
-                class_prefix = prefix + [("CLASS", member.__name__)]
-                self._dump_struct(class_prefix, member, module)
-
-            # Dump methods and functions
-            elif inspect.isroutine(member):
-                try:
-                    attr_static = inspect.getattr_static(struct, member_name)
-                except AttributeError:  # pragma: no cover
-                    attr_static = None
-                if isinstance(attr_static, staticmethod):
-                    self._dump_function(prefix, "STATICMETHOD", member_name, member)
-                elif inspect.ismethod(member) and isinstance(member.__self__, type):
-                    self._dump_function(prefix, "CLASSMETHOD", member_name, member)
+            # Exclude members which are not used, and dump all members of used
+            # members, if restricted to used names
+            member_walk = walk
+            if walk.used_names is not None:
+                scope = walk.used_names._scope(struct_path + "." + member_name)
+                if scope is None:
+                    continue
+                if scope:
+                    member_walk = walk._replace(used_names=None)
+
+            # Dump member using the extractor registered for its type
+            # - extractors of this class are also passed the state of the walk
+            extractor = self._extractor(member)
+            if extractor in _WALK_EXTRACTORS:
+                extractor(self, prefix, struct, member_name, member, member_walk)
+            else:
+                extractor(self, prefix, struct, member_name, member)
+
+        # Add entries of members, compacting tables of members of the same type
+        if walk.table_members is not None:
+            for typ, names in walk.table_members.items():
+                if len(names) >= walk.compact_threshold:
+                    self.add_api_entry(
+                        prefix + [_table_element(typ, names, self.tables)]
+                    )
                 else:
-                    self._dump_function(prefix, "FUNCTION", member_name, member)
+                    for name in names:
+                        self.add_api_entry(prefix + [("MEMBER", name, typ)])
 
-            # Dump properties
-            elif isinstance(member, property) or inspect.isgetsetdescriptor(member):
-                self._dump_property(prefix, member_name)
+    def _extract_module(self, prefix, struct, name, member, walk):
 
-            else:
-                # Dump everything else
-                self._dump_member(prefix, member_name, member)
+        # Exclude any modules
+        # - all relevant modules have already been found by _load_all_modules()
+        pass
+
+    def _extract_class(self, prefix, struct, name, member, walk):
+
+        # Dump classes
+        class_prefix = prefix + [("CLASS", member.__name__)]
+        self._dump_struct(class_prefix, member, walk)
+
+    def _extract_routine(self, prefix, struct, name, member, walk):
+
+        # Dump methods and functions
+        try:
+            attr_static = inspect.getattr_static(struct, name)
+        except AttributeError:  # pragma: no cover
+            attr_static = None
+        if isinstance(attr_static, staticmethod):
+            self._dump_function(prefix, "STATICMETHOD", name, member)
+        elif inspect.ismethod(member) and isinstance(member.__self__, type):
+            self._dump_function(prefix, "CLASSMETHOD", name, member)
+        else:
+            self._dump_function(prefix, "FUNCTION", name, member)
+
+    def _extract_property(self, prefix, struct, name, member, walk):
+
+        # Dump properties
+        self._dump_property(prefix, name)
+
+    def _extract_member(self, prefix, struct, name, member, walk):
+
+        # Dump everything else
+        self._dump_member(prefix, name, member, walk)
 
     @staticmethod
     def _type_to_str_fmt_type(t):
@@ -292,7 +1379,7 @@ class APIDump:
             func_entry = prefix + [(fun_type, fun_name, return_type)]
         else:
             func_entry = prefix + [(fun_type, fun_name, "no-signature")]
-        self._add_api_entry(func_entry)
+        self.add_api_entry(func_entry)
 
         # Add function signature, if available
         if sig is not None:
@@ -310,24 +1397,27 @@ class APIDump:
                 else:
                     par_entry = [("REQUIRED", n_req_arg, par.name, par_type)]
                     n_req_arg += 1
-                self._add_api_entry(func_entry + par_entry)
+                self.add_api_entry(func_entry + par_entry)
 
     def _dump_property(self, prefix, name):
 
         # Add property entry
         entry = prefix + [("PROPERTY", name)]
-        self._add_api_entry(entry)
+        self.add_api_entry(entry)
 
-    def _dump_member(self, prefix, name, val):
+    def _dump_member(self, prefix, name, val, walk):
 
         # Exclude any private types
         typ = type(val).__name__
         if typ.startswith("_"):
             return
 
-        # Add member entry
+        # Add member entry, or collect members by type to compact into tables
+        if walk.table_members is not None:
+            walk.table_members.setdefault(typ, []).append(name)
+            return
         entry = prefix + [("MEMBER", name, typ)]
-        self._add_api_entry(entry)
+        self.add_api_entry(entry)
 
     def print_as_text(self, file: Optional[TextIO] = None) -> None:
         """Print the API dump as text to a file.
@@ -340,42 +1430,166 @@ class APIDump:
             file = sys.stdout
 
         # Print API dump
-        for entry in sorted(self._api):
+        for entry in self._sorted():
             indent = "\t" * (len(entry) - 1)
             entry_str = " : ".join(str(e) for e in entry[-1])
             print(indent + entry_str, file=file)
 
     @staticmethod
+    @contextlib.contextmanager
     def _open_dump_file(file_path, mode):
 
         # Use UTF-8 encoding
         encoding = "utf-8"
 
-        if file_path.suffix == ".gz":
+        reading = mode.startswith("r")
+        with contextlib.ExitStack() as stack:
 
-            # Open as gzip-compressed file
-            return gzip.open(file_path, mode, encoding=encoding)
+            if isinstance(file_path, io.BufferedIOBase):
 
-        else:
+                # Use the given binary stream, which is not closed
+                stream = file_path
+
+            elif str(file_path) == "-":
+
+                # Use standard input or output, which is not closed
+                stream = sys.stdin.buffer if reading else sys.stdout.buffer
+
+            else:
+
+                # Open as regular binary file
+                stream = stack.enter_context(open(file_path, "rb" if reading else "wb"))
+
+            if reading:
+
+                # Buffer streams which cannot be peeked at, e.g. `io.BytesIO`,
+                # detaching the buffer so as not to close the given stream
+                if not hasattr(stream, "peek"):
+                    stream = io.BufferedReader(stream)
+                    stack.callback(stream.detach)
+
+                # Detect compression from the magic bytes starting the stream
+                head = stream.peek(_COMPRESSION_MAGIC_SIZE)
+                compression = next(
+                    (c for c in _COMPRESSION.values() if head.startswith(c[0])), None
+                )
+
+            else:
 
-            # Open as regular text file
-            return file_path.open(mode, encoding=encoding)
+                # Choose compression from file suffix
+                compression = _COMPRESSION.get(Path(file_path).suffix)
 
-    def save_to_file(self, file_path: Union[Path, str]) -> None:
+            if compression is not None:
+
+                # Open as compressed stream
+                stream = stack.enter_context(
+                    compression[1](stream, "rb" if reading else "wb")
+                )
+
+            # Open as text stream, detaching it so as not to close the underlying
+            # stream, and flushing output
+            file = io.TextIOWrapper(stream, encoding=encoding)
+            try:
+                yield file
+            finally:
+                file.detach().flush()
+
+    def save_to_file(
+        self,
+        file_path: Union[Path, str],
+        base: Optional[Union["APIDump", Path, str]] = None,
+        *,
+        max_delta_depth: int = 10,
+        tables_file: Optional[Union[Path, str]] = None,
+    ) -> None:
         """Save the API dump to a file in a reloadable format.
 
+        If a base dump is given, only the entries removed from and added to the
+        base are saved (a *delta*), together with the path of the base dump file
+        relative to `file_path`, and a checksum of the base dump's API. Loading
+        a delta loads its base, which may itself be a delta; the number of
+        deltas in such a chain is its *depth*.
+
+        Tables of members are saved as their type, number, and digest only; see
+        `from_modules(compact_tables=...)`. If `tables_file` is given, the names
+        of their members are saved to it, and are loaded with the API dump;
+        otherwise they are re-derived from the live modules when expanded.
+
         Args:
             file_path (Union[Path, str]):
                 Name of file to save to.
+            base (Optional[Union[APIDump, Path, str]]):
+                If given, save the API dump as a delta from this API dump, which
+                must have been loaded from a file, or from this file.
+            max_delta_depth (int):
+                If saving as a delta would exceed this depth, save the complete
+                API dump instead.
+            tables_file (Optional[Union[Path, str]]):
+                If given, save the names of the members of the tables of members
+                referenced by the saved entries to this file, in JSON format.
+
+        Raises:
+            ValueError: If the base API dump was not loaded from a file, or was
+            loaded from `file_path` or from a delta whose chain contains it.
         """
         file_path = Path(file_path)
 
-        # Assemble file content
-        content = {"modules": self.modules, "api": list(sorted(self._api))}
+        # Load base dump, if given as a file
+        if base is not None and not isinstance(base, APIDump):
+            base = APIDump.load_from_file(base)
+        if base is not None and base.dump_file is None:
+            msg = "base API dump was not loaded from a file"
+            raise ValueError(msg)
+        if base is not None and Path(base.dump_file).resolve() == file_path.resolve():
+            msg = f"cannot save API dump to {file_path} as a delta from itself"
+            raise ValueError(msg)
+        if base is not None and file_path.resolve() in base._delta_chain:
+            msg = (
+                f"cannot save API dump to {file_path} as a delta from "
+                f"{base.dump_file}, which is itself a delta from {file_path}"
+            )
+            raise ValueError(msg)
+
+        if base is not None and base._delta_depth < max_delta_depth:
+
+            # Assemble file content as a delta from the base dump
+            content = {
+                "modules": self.modules,
+                "delta": {
+                    "base": os.path.relpath(base.dump_file, file_path.parent),
+                    "base_checksum": _api_checksum(base._sorted()),
+                    "base_modules": base.modules,
+                    "depth": base._delta_depth + 1,
+                },
+                "removed": _sorted_entries(base._api - self._api),
+                "added": _sorted_entries(self._api - base._api),
+            }
+            tables = {
+                **_referenced_tables(content["removed"], base.tables),
+                **_referenced_tables(content["added"], self.tables),
+            }
 
-        # Save to file as JSON
+        else:
+
+            # Assemble file content
+            # - entries are saved in sorted order, so that readers need not sort them
+            content = {"modules": self.modules, "sorted": True, "api": self._sorted()}
+            tables = _referenced_tables(content["api"], self.tables)
+
+        # Save names of tables of members referenced by entries to a separate file,
+        # if requested, and the threshold for compacting tables, so that checks
+        # compact tables alike
+        if tables_file is not None:
+            with APIDump._open_dump_file(tables_file, "wt") as file:
+                json.dump(tables, file, sort_keys=True)
+            content["tables_file"] = os.path.relpath(tables_file, file_path.parent)
+        if self._compact_threshold is not None:
+            content["compact_tables"] = self._compact_threshold
+
+        # Save to file as JSON, with a header line followed by one line per entry
+        # - readers can parse entries as they are read, e.g. from a pipe
         with APIDump._open_dump_file(file_path, "wt") as file:
-            json.dump(content, file)
+            _save_dump_content(file, content)
 
     @classmethod
     def load_from_file(
@@ -383,32 +1597,451 @@ class APIDump:
     ) -> APIDumpType:
         """Load an API dump from a file.
 
+        If the file contains a delta, its base dump is loaded and the delta is
+        applied to it; see `save_to_file()`.
+
         Args:
             file_path (Union[Path, str]):
                 Name of file to load.
 
         Returns:
             APIDumpType: APIDump instance.
+
+        Raises:
+            ValueError: If the base dump of a delta has changed since the delta
+            was saved, or if a chain of deltas loops back on itself.
         """
-        file_path = Path(file_path)
+        return cls._load_from_file(Path(file_path), ())
+
+    @classmethod
+    def _load_from_file(cls, file_path, loading):
 
         # Load from file as JSON
-        with APIDump._open_dump_file(file_path, "rt") as file:
-            content = json.load(file)
+        # - `loading` are the resolved paths of deltas whose base is being loaded
+        content = _load_dump_content(file_path)
 
-        # Create instance
-        inst = cls(
-            dump_file=file_path,
-            modules=dict(
-                (module, dict((k, v) for k, v in info.items()))
-                for module, info in content["modules"].items()
-            ),
-            api=set(tuple(tuple(e) for e in entry) for entry in content["api"]),
+        return cls._from_dump_content(file_path, content, loading=loading)
+
+    @classmethod
+    def load_many(
+        cls: Type[APIDumpType],
+        file_paths: Iterable[Union[Path, str]],
+        *,
+        max_workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int, Path], None]] = None,
+    ) -> List[APIDumpType]:
+        """Load many API dumps from files, sharing their identical entries.
+
+        Files are read and decompressed ahead in parallel threads, which release
+        the GIL while decompressing, and are parsed in the calling thread in
+        order. Identical API entries, e.g. those common to many versions of an
+        API, are parsed once and shared between the loaded dumps, as are the
+        identical elements of differing entries. Dumps saved as deltas reuse
+        their base dump if it was loaded before them.
+
+        Args:
+            file_paths (Iterable[Union[Path, str]]):
+                Names of files to load.
+            max_workers (Optional[int]):
+                Maximum number of threads reading files (default: as for
+                `ThreadPoolExecutor`).
+            progress (Optional[Callable[[int, int, Path], None]]):
+                If given, called as `progress(loaded, total, file_path)` after
+                each dump is loaded.
+
+        Returns:
+            List[APIDumpType]: APIDump instances, in the order of `file_paths`.
+
+        Raises:
+            ValueError: If the base dump of a delta has changed since the delta
+            was saved, or if a chain of deltas loops back on itself.
+        """
+        return cls._load_many(
+            [Path(p) for p in file_paths], max_workers, progress, _InternPool()
         )
 
+    @classmethod
+    def _load_many(cls, dump_files, max_workers, progress, pool):
+
+        # Load many API dumps from files, parsing their entries into `pool`
+        total = len(dump_files)
+
+        # Load base dumps of deltas from the dumps already loaded, if possible
+        loaded: Dict[Path, APIDumpType] = dict()
+
+        def load_base(base_file, loading):
+            base = loaded.get(base_file.resolve())
+            return base if base is not None else cls._load_from_file(base_file, loading)
+
+        # Read files ahead of the file being parsed, but not too far ahead, so
+        # that memory use by decompressed files is bounded
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        read_ahead = 2 * workers
+        dumps = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures: Dict[int, Any] = dict()
+            submitted = 0
+            for i, dump_file in enumerate(dump_files):
+                while submitted < min(i + read_ahead, total):
+                    futures[submitted] = executor.submit(
+                        _read_dump_data, dump_files[submitted]
+                    )
+                    submitted += 1
+
+                # Parse file into the shared intern pool
+                data = io.BytesIO(futures.pop(i).result())
+                data.name = str(dump_file)
+                content = _load_dump_content(io.BufferedReader(data), pool=pool)
+                dump = cls._from_dump_content(dump_file, content, load_base)
+                loaded[dump_file.resolve()] = dump
+                dumps.append(dump)
+                if progress is not None:
+                    progress(i + 1, total, dump_file)
+
+        return dumps
+
+    @classmethod
+    def _from_dump_content(cls, file_path, content, load_base=None, loading=()):
+
+        # Create instance from the content of an API dump file
+        modules = dict(
+            (module, dict((k, v) for k, v in info.items()))
+            for module, info in content["modules"].items()
+        )
+
+        if "delta" in content:
+
+            # Load base dump, unless the chain of deltas loops back on itself
+            delta = content["delta"]
+            base_file = file_path.parent / delta["base"]
+            loading = (*loading, file_path.resolve())
+            if base_file.resolve() in loading:
+                msg = f"chain of deltas from {file_path} loops back to {base_file}"
+                raise ValueError(msg)
+            base = (load_base or cls._load_from_file)(base_file, loading)
+
+            # Check that the base dump is the dump the delta was saved from
+            if (
+                base._delta_depth != delta["depth"] - 1
+                or _api_checksum(base._sorted()) != delta["base_checksum"]
+            ):
+                msg = f"base API dump {base_file} of {file_path} has changed"
+                raise ValueError(msg)
+
+            # Apply delta to base dump
+            api = base._api.difference(content["removed"]).union(content["added"])
+            tables = {**base.tables, **_content_tables(content, file_path)}
+            inst = cls(dump_file=file_path, modules=modules, api=api, tables=tables)
+            inst._delta_depth = delta["depth"]
+            inst._delta_chain = (base_file.resolve(), *base._delta_chain)
+
+        else:
+
+            # Create instance
+            inst = cls(
+                dump_file=file_path,
+                modules=modules,
+                api=frozenset(content["api"]),
+                tables=_content_tables(content, file_path),
+            )
+
+            # Keep entries saved in sorted order
+            if content.get("sorted", False):
+                inst._sorted_api = content["api"]
+
+        inst._compact_threshold = content.get("compact_tables")
+
         return inst
 
 
+# Register extractors for common member types
+APIDump._extractors.update(
+    {
+        ModuleType: APIDump._extract_module,
+        type: APIDump._extract_class,
+        property: APIDump._extract_property,
+        types.GetSetDescriptorType: APIDump._extract_property,
+    }
+)
+for _routine_type in (
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.MethodDescriptorType,
+    types.WrapperDescriptorType,
+    types.MethodWrapperType,
+    types.ClassMethodDescriptorType,
+):
+    APIDump._extractors[_routine_type] = APIDump._extract_routine
+
+# Extractors which are passed the state of the walk, in addition to the
+# arguments of extractors registered with `register_extractor()`
+_WALK_EXTRACTORS = frozenset(
+    (
+        APIDump._extract_module,
+        APIDump._extract_class,
+        APIDump._extract_routine,
+        APIDump._extract_property,
+        APIDump._extract_member,
+    )
+)
+
+
+def _api_checksum(sorted_api):
+
+    # Return a checksum of API entries, in sorted order
+    return hashlib.sha256(json.dumps(sorted_api).encode("utf-8")).hexdigest()
+
+
+def _save_dump_content(file, content):
+
+    # Save content of an API dump file as JSON
+    # - the first line is the content without lists of API entries, giving instead
+    #   the format version, and the number of lines containing each list
+    # - each following line is an API entry
+    keys = [key for key in ("api", "removed", "added") if key in content]
+    header = dict((k, v) for k, v in content.items() if k not in keys)
+    header["format"] = _DUMP_FORMAT_VERSION
+    header["entry_lines"] = dict((key, len(content[key])) for key in keys)
+    file.write(json.dumps(header))
+    file.write("\n")
+    encode = json.JSONEncoder().encode
+    for key in keys:
+        for entry in content[key]:
+            file.write(encode(entry))
+            file.write("\n")
+
+
+def _read_dump_data(file_path):
+
+    # Read the content of an API dump file, decompressing it if compressed
+    # - zlib, bz2 and lzma release the GIL while decompressing
+    data = Path(file_path).read_bytes()
+    for magic, _, decompress in _COMPRESSION.values():
+        if data.startswith(magic):
+            return decompress(data)
+    return data
+
+
+def _check_dump_format(content, file_path):
+
+    # Check that an API dump file was saved in a format this version can load,
+    # removing the format version from its content
+    version = content.pop("format", 1)
+    if not isinstance(version, int) or version > _DUMP_FORMAT_VERSION:
+        name = getattr(file_path, "name", file_path)
+        msg = (
+            f"API dump file {name} has format version {version}; this version of "
+            f"py-api-dumper loads versions up to {_DUMP_FORMAT_VERSION}"
+        )
+        raise ValueError(msg)
+
+
+def _load_dump_content(file_path, entries_as_lines=False, pool=None):
+
+    # Load content of an API dump file as JSON, converting API entries to tuples
+    # - see `_save_dump_content()`; dump files saved as a single JSON document by
+    #   previous versions are also loaded
+    # - if `entries_as_lines` is true, API entries are returned unparsed, as
+    #   lines of JSON; entries of dump files saved as a single JSON document are
+    #   encoded as lines
+    # - if `pool` is given, lines of API entries are parsed into tuples shared
+    #   through the pool
+    with APIDump._open_dump_file(file_path, "rt") as file:
+        header = file.readline()
+        try:
+            content = json.loads(header)
+        except json.JSONDecodeError:
+            content = json.loads(header + file.read())
+        _check_dump_format(content, file_path)
+        if entries_as_lines:
+            parse = str
+        else:
+            parse = json.loads if pool is None else pool.parse
+        entry_lines = content.pop("entry_lines", {})
+        for key, count in entry_lines.items():
+            content[key] = list(map(parse, itertools.islice(file, count)))
+            if len(content[key]) != count:
+                name = getattr(file_path, "name", file_path)
+                msg = f"API dump file {name} is truncated"
+                raise ValueError(msg)
+    if entries_as_lines:
+        if not entry_lines:
+            encode = json.JSONEncoder().encode
+            for key in ("api", "removed", "added"):
+                if key in content:
+                    content[key] = [encode(entry) + "\n" for entry in content[key]]
+    elif pool is None or not entry_lines:
+        _convert_entries_to_tuples(content)
+    return content
+
+
+def _load_matching_entries(file_path, pattern, kinds):
+
+    # Load the API entries of a dump file whose dotted paths match a pattern
+    # - only lines in the section of the top-level module named by the literal
+    #   prefix of the pattern are parsed, by matching the start of their JSON;
+    #   if entries are saved in sorted order, reading stops after that section
+    # - dumps saved as deltas, or as a single JSON document, are loaded in full
+    file_path = Path(file_path)
+    prefix = _glob_prefix(pattern)
+    line_prefix = None
+    if "." in prefix or prefix == pattern:
+        top_module = prefix.split(".")[0]
+        line_prefix = json.JSONEncoder().encode([["MODULE", top_module]])[:-1]
+    match_kind = _match_kinds(kinds)
+    with APIDump._open_dump_file(file_path, "rt") as file:
+        try:
+            content = json.loads(file.readline())
+        except json.JSONDecodeError:
+            content = dict()
+        _check_dump_format(content, file_path)
+        if "delta" in content or "entry_lines" not in content:
+            dump = APIDump.load_from_file(file_path)
+            return APIDump(
+                dump_file=file_path,
+                modules=dump.modules,
+                api=frozenset(dump.query(pattern, kinds)),
+                tables=dump.tables,
+            )
+        count = content["entry_lines"]["api"]
+        stop_after_section = content.get("sorted", False)
+        entries = []
+        in_section = False
+        for line in itertools.islice(file, count):
+            if line_prefix is None or line.startswith(line_prefix):
+                in_section = True
+                entry = _entry_as_tuple(json.loads(line))
+                if fnmatch.fnmatchcase(_entry_path(entry), pattern) and match_kind(
+                    entry[-1][0]
+                ):
+                    entries.append(entry)
+            elif in_section and stop_after_section:
+                break
+    return APIDump(
+        dump_file=file_path,
+        modules=content["modules"],
+        api=frozenset(entries),
+        tables=_content_tables(content, file_path),
+    )
+
+
+def _convert_entries_to_tuples(content):
+
+    # Convert API entries in the content of an API dump file, loaded as JSON, to
+    # tuples
+    for key in ("api", "removed", "added"):
+        if key in content:
+            content[key] = [_entry_as_tuple(entry) for entry in content[key]]
+
+
+def _entry_as_tuple(entry):
+
+    # Convert an API entry loaded as JSON to a tuple
+    return tuple(tuple(e) for e in entry)
+
+
+class _InternPool:
+
+    # Parse lines of API entries into tuples, sharing identical entries, and
+    # identical elements of entries, between all lines parsed
+    # - identical entries are parsed only once
+    # - entries are looked up by a digest of their line, so that lines are not
+    #   kept alive after they are parsed
+
+    def __init__(self):
+        self._entries = dict()
+        self._elements = dict()
+
+    def parse(self, line):
+        key = hashlib.blake2b(line.encode("utf-8"), digest_size=16).digest()
+        entry = self._entries.get(key)
+        if entry is None:
+            elements = self._elements
+            entry = self._entries[key] = tuple(
+                elements.setdefault(e, e) for e in map(tuple, json.loads(line))
+            )
+        return entry
+
+
+class _CheckLimitReached(Exception):
+    pass
+
+
+class _APIChecker(APIDump):
+
+    def __init__(self, baseline, max_differences):
+        super().__init__(modules=dict(), api=set())
+        self.differences = []
+        self._baseline = baseline
+        self._max_differences = max_differences
+        self._checked = set()
+
+        # Index baseline entries by module
+        self._baseline_entries = dict()
+        for entry in baseline._api:
+            self._baseline_entries.setdefault(_entry_module(entry), set()).add(entry)
+
+    def _add_difference(self, prefix, entry):
+
+        # Record difference, and stop checking once enough have been found
+        self.differences.append((prefix, entry))
+        if (
+            self._max_differences is not None
+            and len(self.differences) >= self._max_differences
+        ):
+            raise _CheckLimitReached
+
+    def add_api_entry(self, entry):
+
+        # Add API entry, and check it against the baseline as soon as it is found
+        entry = tuple(entry)
+        if entry not in self._api:
+            super().add_api_entry(entry)
+            if entry not in self._baseline._api:
+                self._add_difference("+", entry)
+
+    def check_module(self, module_or_name):
+        if isinstance(module_or_name, ModuleType):
+            module_name = module_or_name.__name__
+        else:
+            module_name = module_or_name
+
+        # Skip module if its source files are unchanged from the baseline
+        digest = self._baseline.modules.get(module_name, {}).get("digest")
+        if digest is not None and digest == _module_digest(module_name):
+            return
+
+        # Walk module and its submodules, checking each one once walked for
+        # entries in the baseline which were not found
+        if isinstance(module_or_name, ModuleType):
+            module = module_or_name
+        else:
+            module = APIDump._import_module(module_name)
+        for walked in itertools.chain([module], APIDump._iter_submodules(module)):
+            if walked.__name__ in self._checked:
+                continue
+            self._checked.add(walked.__name__)
+            module_prefix = [("MODULE", m) for m in walked.__name__.split(".")]
+            self._dump_struct(
+                module_prefix,
+                walked,
+                _Walk(walked, compact_threshold=self._baseline._compact_threshold),
+            )
+            removed = self._baseline_entries.get(walked.__name__, set()) - self._api
+            for entry in _sorted_entries(removed):
+                self._add_difference("-", entry)
+
+        # Check for modules in the baseline which were not found
+        for baseline_module in sorted(self._baseline_entries):
+            if baseline_module in self._checked:
+                continue
+            if (baseline_module + ".").startswith(module_name + "."):
+                self._checked.add(baseline_module)
+                for entry in _sorted_entries(self._baseline_entries[baseline_module]):
+                    self._add_difference("-", entry)
+
+
 APIDiffType = TypeVar("APIDiffType", bound="APIDiff")
 
 
@@ -418,31 +2051,56 @@ class APIDiff:
     Attributes:
         old_dump_file (Path):
             File containing dump of the old public API.
-        old_modules (Dict[str, Dict[str, str]]):
+        old_modules (Dict[str, Dict[str, Any]]):
             Information on modules in the old public API.
         new_dump_file (Path):
             File containing dump of the new public API.
-        new_modules (Dict[str, Dict[str, str]]):
+        new_modules (Dict[str, Dict[str, Any]]):
             Information on modules in the new public API.
         removed (frozenset):
             API entries removed from the new API that remain in the old API.
         added (frozenset):
             API entries removed from the old API that remain in the new API.
+        moved (frozenset):
+            Pairs of old and new API entries whose subtrees were moved unchanged
+            to a different parent entry.
+        renamed (frozenset):
+            Pairs of old and new API entries whose subtrees were renamed but are
+            otherwise unchanged.
+        perf_regressions (List[Tuple[str, str, float, float]]):
+            Modules whose import costs grew past the threshold, as tuples of the
+            module name, cost metric, and old and new costs.
+        suppressed (List[Tuple[str, int]]):
+            Suppression rules, in order, with the number of removed and added
+            API entries suppressed by each; rules which suppressed no entries
+            are stale.
     """
 
     old_dump_file: Path
-    old_modules: Dict[str, Dict[str, str]]
+    old_modules: Dict[str, Dict[str, Any]]
 
     new_dump_file: Path
-    new_modules: Dict[str, Dict[str, str]]
+    new_modules: Dict[str, Dict[str, Any]]
 
     removed: frozenset
     added: frozenset
 
+    moved: frozenset
+    renamed: frozenset
+
+    perf_regressions: List[Tuple[str, str, float, float]]
+
+    suppressed: List[Tuple[str, int]]
+
     def __init__(
         self,
         old: APIDump,
         new: APIDump,
+        *,
+        detect_moves: bool = False,
+        perf_threshold: Optional[float] = None,
+        suppress: Optional[SuppressionRules] = None,
+        expand_tables: bool = False,
     ):
         """Differences between two Python public API dumps.
 
@@ -451,6 +2109,24 @@ class APIDiff:
                 Dump of the old public API.
             new (APIDump):
                 Dump of the new public API.
+            detect_moves (bool):
+                If True, report subtrees which were moved or renamed but are
+                otherwise unchanged as `moved` and `renamed` instead of as
+                `removed` and `added` entries.
+            perf_threshold (Optional[float]):
+                If given, report modules whose cumulative import time or memory
+                cost, as recorded by `APIDump.from_modules(profile_imports=True)`,
+                grew by more than this fraction, e.g. 0.1 for 10%.
+            suppress (Optional[SuppressionRules]):
+                If given, do not report removed and added API entries matching
+                these rules; moves and renames are detected after suppression.
+            expand_tables (bool):
+                If True, report the members which differ between tables of
+                members, as saved by `APIDump.from_modules(compact_tables=...)`,
+                instead of the tables themselves. Only tables whose digests
+                differ are expanded, using the names of their members saved with
+                the dumps, or else re-derived from the live modules if their
+                digests match; see `APIDump.expand_tables()`.
         """
 
         self.old_dump_file = old.dump_file
@@ -460,16 +2136,232 @@ class APIDiff:
         self.new_modules = new.modules
 
         # Entries removed from `new` that remain in `old`
-        self.removed = frozenset(old.api - new.api)
+        self.removed = (old - new).api
 
         # Entries added to `new` that are not in `old`
-        self.added = frozenset(new.api - old.api)
+        self.added = (new - old).api
+
+        # Expand tables of members which differ
+        if expand_tables:
+            self._expand_tables(old.tables, new.tables)
+
+        # Suppress entries matching rules
+        self.suppressed = []
+        if suppress is not None:
+            self._suppress(suppress)
+
+        # Detect moved and renamed subtrees
+        self.moved = frozenset()
+        self.renamed = frozenset()
+        if detect_moves:
+            self._detect_moves()
+
+        # Compare import costs of modules
+        self.perf_regressions = []
+        if perf_threshold is not None:
+            self._compare_perf(perf_threshold)
+
+    def _expand_tables(self, old_tables, new_tables):
+
+        # Replace removed and added tables of members by their members, then
+        # cancel members which were only moved into or out of a table
+        # - names of members which were not saved are re-derived if possible
+        old_tables = _derive_tables(self.removed, old_tables)
+        new_tables = _derive_tables(self.added, new_tables)
+        removed = frozenset(_expand_entries(self.removed, old_tables))
+        added = frozenset(_expand_entries(self.added, new_tables))
+        self.removed = removed - added
+        self.added = added - removed
+
+    def _suppress(self, rules):
+
+        # Filter out removed and added entries matching the rules, in one pass over
+        # each, counting the entries suppressed by each rule
+        counts = [0] * len(rules.rules)
+
+        def unsuppressed(entries, change):
+            for entry in entries:
+                index = rules.match(_entry_path(entry), change)
+                if index is None:
+                    yield entry
+                else:
+                    counts[index] += 1
+
+        self.removed = frozenset(unsuppressed(self.removed, "-"))
+        self.added = frozenset(unsuppressed(self.added, "+"))
+        self.suppressed = list(zip(rules.rules, counts))
+
+    def _compare_perf(self, perf_threshold):
+
+        # Find modules whose cumulative import costs grew past the threshold
+        old_imports = dict()
+        for module_info in self.old_modules.values():
+            old_imports.update(module_info.get("imports", {}))
+        for module_info in self.new_modules.values():
+            for module_name, new_metrics in module_info.get("imports", {}).items():
+                old_metrics = old_imports.get(module_name)
+                if old_metrics is None:
+                    continue
+                for metric in ("cumulative_time", "cumulative_memory"):
+                    old_cost = old_metrics[metric]
+                    new_cost = new_metrics[metric]
+                    if new_cost > old_cost * (1 + perf_threshold):
+                        self.perf_regressions.append(
+                            (module_name, metric, old_cost, new_cost)
+                        )
+        self.perf_regressions.sort()
+
+    @staticmethod
+    def _index_subtrees(entries):
+
+        # Group entries by depth
+        by_depth = dict()
+        for entry in entries:
+            by_depth.setdefault(len(entry), []).append(entry)
+
+        # Compute a digest of the subtree of every entry, deepest entries first
+        # - each digest is computed from the elements and digests of its children,
+        #   so that the digests of all subtrees are computed in linear time
+        digests = dict()
+        children = dict()
+        child_tokens = dict()
+        roots = set()
+        leaf_digest = hashlib.blake2b(digest_size=16).digest()
+        for depth in sorted(by_depth, reverse=True):
+            for entry in by_depth[depth]:
+                tokens = child_tokens.pop(entry, None)
+                if tokens is None:
+                    digest = leaf_digest
+                else:
+                    tokens.sort()
+                    digest = hashlib.blake2b(b"".join(tokens), digest_size=16).digest()
+                digests[entry] = digest
+                parent = entry[:-1]
+                if parent in entries:
+                    children.setdefault(parent, []).append(entry)
+                    child_tokens.setdefault(parent, []).append(
+                        repr(entry[-1]).encode("utf-8") + digest
+                    )
+                else:
+                    roots.add(entry)
+
+        return by_depth, digests, children, roots
+
+    @staticmethod
+    def _rename_key(entry, digest):
+
+        # Index entries by parent, element without its name, and subtree digest
+        element = entry[-1]
+        i_name = _element_name_index(element)
+        return (entry[:-1], element[:i_name] + element[i_name + 1 :], digest)
+
+    def _detect_moves(self):
+
+        # Index subtrees of removed entries by their digests
+        # - arguments can only be moved within the same function, i.e. renamed
+        # - only subtrees whose parent was not removed can be renamed
+        # - candidates are stored in reverse sorted order, to be popped in order
+        _, removed_digests, removed_children, removed_roots = APIDiff._index_subtrees(
+            self.removed
+        )
+        moved_index = dict()
+        renamed_index = dict()
+        for entry, digest in removed_digests.items():
+            if entry[-1][0] not in ("REQUIRED", "OPTIONAL"):
+                moved_index.setdefault((entry[-1], digest), []).append(entry)
+        for entry in removed_roots:
+            renamed_key = APIDiff._rename_key(entry, removed_digests[entry])
+            renamed_index.setdefault(renamed_key, []).append(entry)
+        for index in (moved_index, renamed_index):
+            for candidates in index.values():
+                if len(candidates) > 1:
+                    candidates.sort(reverse=True)
+
+        # Match subtrees of added entries against removed subtrees
+        # - added subtrees are visited shallowest first, so that whole subtrees
+        #   are matched in preference to their contents
+        # - removed subtrees with already-matched contents cannot be matched
+        added_by_depth, added_digests, added_children, added_roots = (
+            APIDiff._index_subtrees(self.added)
+        )
+        matched_removed = set()
+        partial_removed = set()
+        matched_added = set()
+        moved = []
+        renamed = []
+
+        def is_matched(entry, matched):
+            return any(entry[:i] in matched for i in range(1, len(entry) + 1))
+
+        def find_match(candidates):
+            while candidates:
+                candidate = candidates.pop()
+                if candidate not in partial_removed and not is_matched(
+                    candidate, matched_removed
+                ):
+                    return candidate
+            return None
+
+        for depth in sorted(added_by_depth):
+
+            # Find added subtrees with possible matches, in sorted order
+            matchable = []
+            for entry in added_by_depth[depth]:
+                digest = added_digests[entry]
+                moved_key = (entry[-1], digest)
+                if entry in added_roots:
+                    renamed_key = APIDiff._rename_key(entry, digest)
+                else:
+                    renamed_key = None
+                if moved_key in moved_index or renamed_key in renamed_index:
+                    matchable.append((entry, moved_key, renamed_key))
+            matchable.sort()
+
+            for entry, moved_key, renamed_key in matchable:
+                if is_matched(entry, matched_added):
+                    continue
+
+                # Find a removed subtree with the same root element, or else a
+                # removed subtree with the same parent and a renamed root element
+                candidate = None
+                if entry[-1][0] not in ("REQUIRED", "OPTIONAL"):
+                    candidate = find_match(moved_index.get(moved_key, ()))
+                    matches = moved
+                if candidate is None:
+                    candidate = find_match(renamed_index.get(renamed_key, ()))
+                    matches = renamed
+                if candidate is None:
+                    continue
+
+                # Save matched subtrees
+                matches.append((candidate, entry))
+                matched_removed.add(candidate)
+                partial_removed.update(candidate[:i] for i in range(1, len(candidate)))
+                matched_added.add(entry)
+
+        # Remove matched subtrees from removed and added entries
+        for attr, matched, children in (
+            ("removed", matched_removed, removed_children),
+            ("added", matched_added, added_children),
+        ):
+            subtrees = set()
+            stack = list(matched)
+            while stack:
+                entry = stack.pop()
+                subtrees.add(entry)
+                stack.extend(children.get(entry, ()))
+            setattr(self, attr, getattr(self, attr) - subtrees)
+        self.moved = frozenset(moved)
+        self.renamed = frozenset(renamed)
 
     @classmethod
     def from_files(
         cls: Type[APIDiffType],
         old_dump_file: Union[Path, str],
         new_dump_file: Union[Path, str],
+        *,
+        engine: str = "auto",
+        **kwargs,
     ) -> APIDiffType:
         """Differences between two Python public API dumps loaded from files.
 
@@ -478,23 +2370,361 @@ class APIDiff:
                 Name of file containing dump of the old public API.
             new_dump_file (Union[Path, str]):
                 Name of file containing dump of the new public API.
+            engine (str):
+                How to find the differing API entries: `python` loads both dumps
+                and compares their entries as sets of tuples; `numpy` compares
+                the lines of JSON of their entries as arrays of bytes using
+                NumPy, and parses differing entries only; `auto` uses `numpy` if NumPy is
+                installed and either dump has at least `CROSSOVER_ENTRIES`
+                entries, and `python` otherwise. Dumps saved as deltas are always
+                compared using `python`.
+            **kwargs:
+                Keyword arguments to the APIDiff constructor.
 
         Returns:
             APIDiffType: APIDiff instance.
+
+        Raises:
+            ValueError: If the engine is unknown.
+            ImportError: If the `numpy` engine is requested but NumPy is not
+            installed.
         """
+        if engine not in ("auto", "python", "numpy"):
+            msg = f"unknown API diff engine: {engine}"
+            raise ValueError(msg)
+        if engine == "numpy" and not columnar.available():
+            msg = "API diff engine 'numpy' requires NumPy to be installed"
+            raise ImportError(msg)
+        dump_files = (Path(old_dump_file), Path(new_dump_file))
+
+        # Load dumps from files, leaving API entries as lines of JSON
+        contents = [_load_dump_content(f, entries_as_lines=True) for f in dump_files]
+
+        # Choose engine, importing NumPy only if it would be used
+        if engine == "auto":
+            entries = max(len(c.get("api", ())) for c in contents)
+            if entries >= columnar.CROSSOVER_ENTRIES and columnar.available():
+                engine = "numpy"
+            else:
+                engine = "python"
+        if any("api" not in c for c in contents):
+            engine = "python"
+
+        if engine == "numpy":
+
+            # Create dumps containing only the entries which differ between dumps
+            # - only the lines of differing entries are parsed; entries which
+            #   are equal but whose lines differ, e.g. if saved by different
+            #   versions of the JSON encoder, are then discarded
+            old_content, new_content = contents
+            removed, added = columnar.differences(
+                old_content["api"], new_content["api"]
+            )
+            old_api, new_api = (
+                frozenset(_entry_as_tuple(json.loads(lines[i])) for i in indexes)
+                for lines, indexes in (
+                    (old_content["api"], removed),
+                    (new_content["api"], added),
+                )
+            )
+            old = APIDump(
+                dump_file=dump_files[0],
+                modules=old_content["modules"],
+                api=old_api - new_api,
+                tables=_content_tables(old_content, dump_files[0]),
+            )
+            new = APIDump(
+                dump_file=dump_files[1],
+                modules=new_content["modules"],
+                api=new_api - old_api,
+                tables=_content_tables(new_content, dump_files[1]),
+            )
 
-        # Load dumps from files
-        old = APIDump.load_from_file(old_dump_file)
-        new = APIDump.load_from_file(new_dump_file)
+        else:
+
+            # Create dumps from file contents
+            for content in contents:
+                for key in ("api", "removed", "added"):
+                    if key in content:
+                        content[key] = list(map(json.loads, content[key]))
+                _convert_entries_to_tuples(content)
+            old, new = map(APIDump._from_dump_content, dump_files, contents)
 
         # Create instance
-        inst = cls(old, new)
+        inst = cls(old, new, **kwargs)
 
         return inst
 
+    @classmethod
+    def from_delta(
+        cls: Type[APIDiffType], delta_file: Union[Path, str], **kwargs
+    ) -> APIDiffType:
+        """Differences between a Python public API dump saved as a delta and its base.
+
+        The differences are read from the delta file alone; neither the delta
+        nor its base dump is loaded. See `APIDump.save_to_file()`.
+
+        Args:
+            delta_file (Union[Path, str]):
+                Name of file containing dump of the new public API, saved as a
+                delta from the dump of the old public API.
+            **kwargs:
+                Keyword arguments to the APIDiff constructor.
+
+        Returns:
+            APIDiffType: APIDiff instance.
+
+        Raises:
+            ValueError: If the file does not contain a delta.
+        """
+        delta_file = Path(delta_file)
+
+        # Load delta from file
+        content = _load_dump_content(delta_file)
+        if "delta" not in content:
+            msg = f"{delta_file} is not an API dump saved as a delta"
+            raise ValueError(msg)
+        delta = content["delta"]
+
+        # Create dumps containing only removed and added entries
+        # - the delta saves the tables of members of both, if saved
+        tables = _content_tables(content, delta_file)
+        old = APIDump(
+            dump_file=delta_file.parent / delta["base"],
+            modules=delta["base_modules"],
+            api=set(content["removed"]),
+            tables=tables,
+        )
+        new = APIDump(
+            dump_file=delta_file,
+            modules=content["modules"],
+            api=set(content["added"]),
+            tables=tables,
+        )
+
+        # Create instance
+        inst = cls(old, new, **kwargs)
+
+        return inst
+
+    @classmethod
+    def from_git(
+        cls: Type[APIDiffType],
+        old_rev: str,
+        new_rev: str,
+        path: Union[Path, str] = ".",
+        *,
+        repo_dir: Optional[Union[Path, str]] = None,
+        **kwargs,
+    ) -> APIDiffType:
+        """Differences between the public APIs of two git revisions.
+
+        Both revisions are read through the same `git cat-file` process. Modules
+        whose source code, and that of the modules they import, is unchanged
+        between the revisions are dumped only once.
+
+        Args:
+            old_rev (str):
+                Old git revision.
+            new_rev (str):
+                New git revision.
+            path (Union[Path, str]):
+                Directory in the git revisions; see `APIDump.from_git()`.
+            repo_dir (Optional[Union[Path, str]]):
+                Directory within the git repository (default: current directory).
+            **kwargs:
+                Keyword arguments to the APIDiff constructor.
+
+        Returns:
+            APIDiffType: APIDiff instance.
+        """
+
+        # Dump revisions, reusing modules of the old revision in the new revision
+        with GitObjectReader(repo_dir) as reader:
+            old = APIDump._from_git(reader, old_rev, str(path), None)
+            new = APIDump._from_git(reader, new_rev, str(path), old)
+
+        # Create instance
+        inst = cls(old, new, **kwargs)
+
+        return inst
+
+    @classmethod
+    def batch(
+        cls,
+        pairs: Sequence[Sequence],
+        *,
+        text: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> Dict:
+        """Differences between many pairs of Python public API dumps loaded from files.
+
+        Pairs which share dump files, directly or through other pairs, are
+        grouped together, and the groups are diffed in parallel, with each
+        worker process given whole groups. Each dump file is therefore loaded
+        once, e.g. a baseline dump diffed against many other dumps, and is kept
+        only until the last pair in its group which uses it.
+
+        Args:
+            pairs (Sequence[Sequence]):
+                List of names of files containing dumps of the old and new public
+                APIs, optionally followed by the name of a file to output the API
+                differences to.
+            text (bool):
+                If True, output API differences in text format instead of JSON.
+            max_workers (Optional[int]):
+                Maximum number of worker processes (default: number of CPUs).
+                If 1, diff all pairs in the current process.
+            **kwargs:
+                Keyword arguments to the APIDiff constructor.
+
+        Returns:
+            Dict: Summary of the API differences:
+            `pairs` lists the old and new dump files, output file, whether the
+            APIs are `equal`, and the number of `removed`, `added`, `moved`, and
+            `renamed` entries per package of each pair, in input order; `packages`
+            gives the total numbers of entries per package; `equal` is True if
+            there are no differences between any pair of APIs.
+        """
+
+        # Normalise pairs of file names
+        pairs = [
+            (
+                Path(pair[0]),
+                Path(pair[1]),
+                Path(pair[2]) if len(pair) > 2 and pair[2] is not None else None,
+            )
+            for pair in pairs
+        ]
+
+        # Diff groups of pairs which share dump files, in parallel if there is more
+        # than one group
+        # - each worker process is given whole groups, largest first, so that it
+        #   loads each dump file once
+        groups = sorted(_batch_groups(pairs), key=len, reverse=True)
+        results: List[Dict] = [dict() for _ in pairs]
+        if max_workers == 1 or len(groups) <= 1:
+            group_results = [
+                _batch_diff_group(cls, text, kwargs, None, [(i, pairs[i]) for i in g])
+                for g in groups
+            ]
+        else:
+            workers = min(max_workers or os.cpu_count() or 1, len(groups))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                group_results = list(
+                    executor.map(
+                        functools.partial(_batch_diff_group, cls, text, kwargs, 1),
+                        [[(i, pairs[i]) for i in g] for g in groups],
+                    )
+                )
+        for group_result in group_results:
+            for i, summary in group_result:
+                results[i] = summary
+
+        # Aggregate summary
+        packages: Dict[str, Dict[str, int]] = dict()
+        for summary in results:
+            for package, counts in summary["packages"].items():
+                totals = packages.setdefault(package, dict.fromkeys(_BATCH_CHANGES, 0))
+                for key in totals:
+                    totals[key] += counts[key]
+
+        return {
+            "pairs": results,
+            "packages": dict(sorted(packages.items())),
+            "equal": all(summary["equal"] for summary in results),
+        }
+
+    @classmethod
+    def bisect(
+        cls,
+        dump_files: Sequence[Union[Path, str]],
+        pattern: str,
+        *,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> Optional[Dict]:
+        """Find the first of a series of Python public API dumps where API entries changed.
+
+        The API entries whose dotted paths match `pattern` (see
+        `APIDump.query()`) are compared between dumps by binary search, assuming
+        that they changed once in the series, e.g. of releases. Only the
+        O(log n) dumps visited by the search are loaded, and only the entries in
+        the top-level module named by the pattern are parsed. In dumps saved in
+        sorted order, reading stops at the end of that module. Dumps saved as
+        deltas are loaded in full.
+
+        Args:
+            dump_files (Sequence[Union[Path, str]]):
+                Names of files containing dumps of the public APIs, in order.
+            pattern (str):
+                Pattern matching dotted paths of API entries.
+            kinds (Optional[Iterable[str]]):
+                If given, only compare entries of these kinds, e.g. `FUNCTION`.
+
+        Returns:
+            Optional[Dict]: None if the matching entries are the same in the first
+            and last dumps; otherwise a summary of the change: `index` is the
+            index of the first dump whose matching entries differ from those in
+            the first dump, and `old_dump` and `new_dump` the files before and at
+            that index; `change` is `added` if no entries matched before it,
+            `removed` if no entries match at it, or else `changed`; `diff` is the
+            APIDiff of the matching entries; and `loaded` is the number of dumps
+            loaded.
+
+        Raises:
+            ValueError: If fewer than two dumps are given.
+        """
+        if len(dump_files) < 2:
+            msg = "at least two API dumps are required to bisect"
+            raise ValueError(msg)
+
+        # Load matching entries of dumps once, as they are visited
+        visited: Dict[int, APIDump] = dict()
+
+        def visit(i):
+            if i not in visited:
+                visited[i] = _load_matching_entries(dump_files[i], pattern, kinds)
+            return visited[i]
+
+        # Binary search for the first dump whose matching entries differ from those
+        # of the first dump
+        first = visit(0)._api
+        lo, hi = 0, len(dump_files) - 1
+        if visit(hi)._api == first:
+            return None
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if visit(mid)._api == first:
+                lo = mid
+            else:
+                hi = mid
+
+        # Summarise change
+        old, new = visit(lo), visit(hi)
+        if not old._api:
+            change = "added"
+        elif not new._api:
+            change = "removed"
+        else:
+            change = "changed"
+        return {
+            "index": hi,
+            "old_dump": old.dump_file,
+            "new_dump": new.dump_file,
+            "change": change,
+            "diff": cls(old, new),
+            "loaded": len(visited),
+        }
+
     def equal(self):
         """Return True if there are no differences, False otherwise."""
-        return len(self.added) == 0 and len(self.removed) == 0
+        return (
+            len(self.added) == 0
+            and len(self.removed) == 0
+            and len(self.moved) == 0
+            and len(self.renamed) == 0
+        )
 
     def print_as_text(self, file: Optional[TextIO] = None) -> None:
         """Print the API differences as text to a file.
@@ -523,32 +2753,37 @@ class APIDiff:
 
         # Print API entries added and removed
         for prefix, entries in (("-", self.removed), ("+", self.added)):
-            stack: List[Tuple] = []
-            for entry in sorted(entries):
-
-                # Find the longest common prefix with respect to previously-printed entries
-                i_start = 0
-                while len(stack) > 0:
-                    for i in range(max(len(stack[-1]), len(entry))):
-                        if stack[-1][0:i] == entry[0:i]:
-                            i_start = i
-                    if i_start > 0:
-                        break
-                    stack.pop()  # pragma: no cover
-
-                # Print entry without common prefix; add to stack of printed entries
-                for i in range(i_start, len(entry)):
-                    indent = "\t" * i
-                    entry_str = " : ".join(str(e) for e in entry[i])
-                    print(prefix + indent + entry_str, file=file)
-                stack.append(entry)
+            _print_entries(prefix, entries, file)
+
+        # Print API subtrees moved and renamed
+        for label, matches in (("MOVED", self.moved), ("RENAMED", self.renamed)):
+            for old_entry, new_entry in sorted(matches):
+                print(
+                    "~" + label,
+                    old_entry[-1][0],
+                    _entry_path(old_entry) + " -> " + _entry_path(new_entry),
+                    sep=" : ",
+                    file=file,
+                )
+
+        # Print modules whose import costs grew past the threshold
+        for module_name, metric, old_cost, new_cost in self.perf_regressions:
+            print(
+                "!PERF",
+                module_name,
+                metric,
+                f"{old_cost:.6g} -> {new_cost:.6g}",
+                sep=" : ",
+                file=file,
+            )
 
     def save_as_json(self, file_path: Union[Path, str]) -> None:
         """Save the API differences to a file in JSON format.
 
         Args:
             file_path (Union[Path, str]):
-                Name of file to save to.
+                Name of file to save to. Compression is selected by the file
+                suffix, as for `APIDump.save_to_file()`.
         """
         file_path = Path(file_path)
 
@@ -558,10 +2793,279 @@ class APIDiff:
             "new_dump": str(self.new_dump_file),
             "old_modules": self.old_modules,
             "new_modules": self.new_modules,
-            "removed": list(sorted(self.removed)),
-            "added": list(sorted(self.added)),
+            "removed": _sorted_entries(self.removed),
+            "added": _sorted_entries(self.added),
+            "moved": list(sorted(self.moved)),
+            "renamed": list(sorted(self.renamed)),
+            "perf_regressions": self.perf_regressions,
         }
 
         # Save to file as JSON
-        with file_path.open("wt", encoding="utf-8") as file:
+        with APIDump._open_dump_file(file_path, "wt") as file:
             json.dump(content, file, sort_keys=True)
+
+    def save_as_json_lines(self, file_path: Union[Path, str]) -> None:
+        """Save the API differences to a file in JSON Lines format.
+
+        Each line of the file is a JSON object (a *record*) whose `change` key
+        gives its kind of record. The first record is a `header` which gives
+        the old and new dump files and module information. It is followed by
+        one record for each `removed` and `added` entry, each `moved` and
+        `renamed` pair of entries, and each `perf_regression`, which also give
+        the name of the `module` containing the entry. Records are written one
+        at a time, and can be read one at a time with `read_json_lines()`.
+
+        Args:
+            file_path (Union[Path, str]):
+                Name of file to save to. Compression is selected by the file
+                suffix, as for `APIDump.save_to_file()`.
+        """
+        file_path = Path(file_path)
+
+        # Save records to file as JSON Lines
+        with APIDump._open_dump_file(file_path, "wt") as file:
+
+            def write_record(record):
+                file.write(json.dumps(record, sort_keys=True) + "\n")
+
+            # Write header record
+            write_record(
+                {
+                    "change": "header",
+                    "old_dump": str(self.old_dump_file),
+                    "new_dump": str(self.new_dump_file),
+                    "old_modules": self.old_modules,
+                    "new_modules": self.new_modules,
+                }
+            )
+
+            # Write records of API entries removed and added
+            for change, entries in (("removed", self.removed), ("added", self.added)):
+                for entry in _sorted_entries(entries):
+                    write_record(
+                        {
+                            "change": change,
+                            "module": _entry_module(entry),
+                            "entry": entry,
+                        }
+                    )
+
+            # Write records of API subtrees moved and renamed
+            for change, matches in (("moved", self.moved), ("renamed", self.renamed)):
+                for old_entry, new_entry in sorted(matches):
+                    write_record(
+                        {
+                            "change": change,
+                            "module": _entry_module(old_entry),
+                            "old": old_entry,
+                            "new": new_entry,
+                        }
+                    )
+
+            # Write records of modules whose import costs grew past the threshold
+            for module_name, metric, old_cost, new_cost in self.perf_regressions:
+                write_record(
+                    {
+                        "change": "perf_regression",
+                        "module": module_name,
+                        "metric": metric,
+                        "old": old_cost,
+                        "new": new_cost,
+                    }
+                )
+
+    @staticmethod
+    def read_json_lines(file_path: Union[Path, str]) -> Iterator[Dict[str, Any]]:
+        """Read API differences from a file in JSON Lines format, one record at a time.
+
+        See `save_as_json_lines()` for the format of the records. API entries in
+        the records are returned as tuples, as in the `removed`, `added`, `moved`,
+        and `renamed` attributes.
+
+        Args:
+            file_path (Union[Path, str]):
+                Name of file to read.
+
+        Yields:
+            Dict[str, Any]: Records of API differences.
+        """
+        file_path = Path(file_path)
+
+        # Read records from file as JSON Lines
+        with APIDump._open_dump_file(file_path, "rt") as file:
+            for line in file:
+                record = json.loads(line)
+                if record["change"] in ("removed", "added"):
+                    record["entry"] = tuple(tuple(e) for e in record["entry"])
+                elif record["change"] in ("moved", "renamed"):
+                    for key in ("old", "new"):
+                        record[key] = tuple(tuple(e) for e in record[key])
+                yield record
+
+
+# Kinds of API differences counted per package by `APIDiff.batch()`
+_BATCH_CHANGES = ("removed", "added", "moved", "renamed")
+
+
+def _batch_groups(pairs):
+
+    # Group the indices of pairs of `APIDiff.batch()` which share dump files,
+    # directly or through other pairs, in input order
+    parent: Dict[Path, Path] = dict()
+
+    def find(key):
+        while parent.setdefault(key, key) != key:
+            key = parent[key] = parent[parent[key]]
+        return key
+
+    keys = [(old.resolve(), new.resolve()) for old, new, _ in pairs]
+    for old_key, new_key in keys:
+        parent[find(old_key)] = find(new_key)
+    groups: Dict[Path, List[int]] = dict()
+    for i, (old_key, _) in enumerate(keys):
+        groups.setdefault(find(old_key), []).append(i)
+    return list(groups.values())
+
+
+def _batch_diff_group(cls, text, kwargs, read_workers, group):
+
+    # Diff a group of pairs of API dumps which share dump files, loading each
+    # dump file once, into an intern pool shared by the group, and keeping it
+    # only until the last pair which uses it
+    # - worker processes read dump files in one thread, since the processes
+    #   already use the available CPUs
+    uses: Dict[Path, int] = dict()
+    for _, (old_dump_file, new_dump_file, _) in group:
+        for key in {old_dump_file.resolve(), new_dump_file.resolve()}:
+            uses[key] = uses.get(key, 0) + 1
+    pool = _InternPool()
+    dumps: Dict[Path, APIDump] = dict()
+    results = []
+    for i, pair in group:
+        old_key, new_key = keys = (pair[0].resolve(), pair[1].resolve())
+        missing = dict(
+            (key, dump_file)
+            for key, dump_file in zip(keys, pair[:2])
+            if key not in dumps
+        )
+        dumps.update(
+            zip(
+                missing,
+                APIDump._load_many(list(missing.values()), read_workers, None, pool),
+            )
+        )
+        results.append(
+            (i, _batch_diff(cls, text, kwargs, pair, dumps[old_key], dumps[new_key]))
+        )
+        for key in set(keys):
+            uses[key] -= 1
+            if uses[key] == 0:
+                del dumps[key]
+    return results
+
+
+def _batch_diff(cls, text, kwargs, pair, old, new):
+
+    # Diff a pair of API dumps, which may be shared with other pairs, and so
+    # are not modified; the diff is labelled with the dump files of the pair
+    old_dump_file, new_dump_file, output_file = pair
+    diff = cls(old, new, **kwargs)
+    diff.old_dump_file = old_dump_file
+    diff.new_dump_file = new_dump_file
+
+    # Output API differences
+    if output_file is not None:
+        if text:
+            with output_file.open("wt", encoding="utf-8") as file:
+                diff.print_as_text(file)
+        else:
+            diff.save_as_json(output_file)
+
+    # Count API entries removed, added, moved, and renamed per package
+    packages: Dict[str, Dict[str, int]] = dict()
+    for key, entries in (
+        ("removed", diff.removed),
+        ("added", diff.added),
+        ("moved", [old_entry for old_entry, _ in diff.moved]),
+        ("renamed", [old_entry for old_entry, _ in diff.renamed]),
+    ):
+        for entry in entries:
+            counts = packages.setdefault(entry[0][1], dict.fromkeys(_BATCH_CHANGES, 0))
+            counts[key] += 1
+
+    return {
+        "old_dump": str(old_dump_file),
+        "new_dump": str(new_dump_file),
+        "output": None if output_file is None else str(output_file),
+        "equal": diff.equal(),
+        "packages": dict(sorted(packages.items())),
+    }
+
+
+def _dump_shards_in_workers(cls, dist_index, tasks, max_workers, results):
+
+    # Dump distributions in a new pool of worker processes, which are spawned so
+    # that they do not inherit any imported modules; save summaries of the
+    # shards in `results`, and return the distributions whose workers crashed
+    crashed = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            (task, executor.submit(_dump_shard, cls, dist_index, *task))
+            for task in tasks
+        ]
+        for task, future in futures:
+            try:
+                results[task[0]] = future.result()
+            except BrokenProcessPool:
+                crashed.append(task)
+    return crashed
+
+
+def _dump_shard(cls, dist_index, dist_name, version, modules, shard_file, error=None):
+
+    # Dump the top-level modules of a distribution, recording modules which fail
+    # to import, or else record all modules as failed with the given error
+    shard = cls(api=set(), modules=dict())
+    for module_name in modules:
+        if error is None:
+            try:
+                dump = cls.from_modules(module_name, dist_index=dist_index)
+            except (Exception, SystemExit) as err:
+                module_error = f"{type(err).__name__}: {err}"
+            else:
+                shard.modules.update(dump.modules)
+                shard._api.update(dump._api)
+                continue
+        else:
+            module_error = error
+        shard.modules[module_name] = {
+            "distribution": dist_name,
+            "version": version,
+            "path": None,
+            "error": module_error,
+        }
+
+    # Save shard file, only once complete
+    shard_file_tmp = shard_file.with_name(".tmp-" + shard_file.name)
+    shard.save_to_file(shard_file_tmp)
+    shard_file_tmp.replace(shard_file)
+
+    return _shard_summary(shard, dist_name, version, modules, shard_file)
+
+
+def _shard_summary(shard, dist_name, version, modules, shard_file):
+
+    # Summarise a shard, with the import errors of any modules which failed
+    return {
+        "distribution": dist_name,
+        "version": version,
+        "shard": str(shard_file),
+        "entries": len(shard._api),
+        "errors": dict(
+            (module_name, info["error"])
+            for module_name, info in shard.modules.items()
+            if "error" in info
+        ),
+    }
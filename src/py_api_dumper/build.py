@@ -0,0 +1,127 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""PEP 517 build backend which embeds an API manifest in wheels.
+
+This backend wraps the `setuptools.build_meta` backend. Wheels it builds
+embed an API dump of their modules, the *API manifest*, in their `.dist-info`
+directory, so that consumers of an installed distribution can read its API
+without importing it; see `APIDump.from_manifest()`. To use it, add to
+`pyproject.toml`:
+
+```toml
+[build-system]
+requires = ["setuptools>=64.0", "py-api-dumper"]
+build-backend = "py_api_dumper.build"
+```
+"""
+
+import gzip
+import io
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from setuptools import build_meta as _setuptools  # type: ignore[import-untyped]
+
+from . import APIDump, _save_dump_content
+from .metadata import API_MANIFEST, _record_digest
+from .wheel import WheelImporter
+
+# Hooks which are unchanged from `setuptools.build_meta`
+get_requires_for_build_wheel = _setuptools.get_requires_for_build_wheel
+get_requires_for_build_sdist = _setuptools.get_requires_for_build_sdist
+prepare_metadata_for_build_wheel = _setuptools.prepare_metadata_for_build_wheel
+build_sdist = _setuptools.build_sdist
+get_requires_for_build_editable = _setuptools.get_requires_for_build_editable
+prepare_metadata_for_build_editable = _setuptools.prepare_metadata_for_build_editable
+build_editable = _setuptools.build_editable
+
+
+def build_wheel(
+    wheel_directory: str,
+    config_settings: Optional[Dict] = None,
+    metadata_directory: Optional[str] = None,
+) -> str:
+    """Build a wheel, and embed an API manifest in it.
+
+    Args:
+        wheel_directory (str):
+            Directory in which to build the wheel.
+        config_settings (Optional[Dict]):
+            Configuration settings passed to `setuptools.build_meta`.
+        metadata_directory (Optional[str]):
+            Directory containing metadata prepared for the wheel.
+
+    Returns:
+        str: File name of the wheel.
+    """
+    wheel_name = _setuptools.build_wheel(
+        wheel_directory, config_settings, metadata_directory
+    )
+    embed_manifest(Path(wheel_directory) / wheel_name)
+    return wheel_name
+
+
+def embed_manifest(wheel_file: Union[Path, str]) -> None:
+    """Dump the API of the modules in a wheel file, and embed it in the wheel.
+
+    The API manifest is saved in the wheel's `.dist-info` directory, and its
+    hash is added to the wheel's RECORD. The paths of the dumped modules are
+    saved relative to the root of the wheel. The manifest is compressed without
+    a timestamp, so that building a wheel remains reproducible.
+
+    Args:
+        wheel_file (Union[Path, str]):
+            Wheel file.
+    """
+    wheel_file = Path(wheel_file)
+
+    # Dump API of modules in wheel, importing them
+    with WheelImporter(wheel_file) as importer:
+        api_dump = APIDump.from_modules(
+            *importer.modules, dist_index=importer.dist_index, use_manifests=False
+        )
+        root = str(importer.path)
+    modules = dict(
+        (module, dict(info)) for module, info in sorted(api_dump.modules.items())
+    )
+    for module_info in modules.values():
+        if module_info.get("path") is not None:
+            path = os.path.relpath(module_info["path"], root)
+            module_info["path"] = Path(path).as_posix()
+
+    # Save API manifest as a compressed dump file
+    text = io.StringIO()
+    _save_dump_content(
+        text, {"modules": modules, "sorted": True, "api": api_dump._sorted()}
+    )
+    data = gzip.compress(text.getvalue().encode("utf-8"), mtime=0)
+
+    # Rewrite wheel with API manifest, and with its hash added to the RECORD
+    with zipfile.ZipFile(wheel_file) as wheel:
+        names = wheel.namelist()
+        dist_info = next(n for n in names if n.endswith(".dist-info/METADATA"))
+        dist_info = dist_info[: -len("METADATA")]
+        manifest_name = dist_info + API_MANIFEST
+        record_name = dist_info + "RECORD"
+        record = [
+            line
+            for line in wheel.read(record_name).decode("utf-8").splitlines()
+            if not line.startswith(manifest_name + ",")
+        ]
+        record.append(f"{manifest_name},sha256={_record_digest(data)},{len(data)}")
+        fd, tmp_name = tempfile.mkstemp(dir=wheel_file.parent, suffix=".whl")
+        os.close(fd)
+        with zipfile.ZipFile(tmp_name, "w", zipfile.ZIP_DEFLATED) as new_wheel:
+            for info in wheel.infolist():
+                if info.filename not in (manifest_name, record_name):
+                    new_wheel.writestr(info, wheel.read(info))
+            record_info = wheel.getinfo(record_name)
+            manifest_info = zipfile.ZipInfo(manifest_name, record_info.date_time)
+            new_wheel.writestr(manifest_info, data)
+            new_wheel.writestr(record_info, "\n".join(record) + "\n")
+    os.replace(tmp_name, wheel_file)
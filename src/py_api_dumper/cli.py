@@ -5,16 +5,153 @@
 """Command-line parser."""
 
 import argparse
+import contextlib
+import importlib.metadata
+import json
+import os
 import sys
+import time
 from pathlib import Path
 
-from . import APIDiff, APIDump
+from . import (
+    APIDiff,
+    APIDump,
+    DistributionIndex,
+    DumpIndex,
+    SuppressionRules,
+    UsedNames,
+    _print_entries,
+)
 
 
-def _dump(args):
+def _open_text_output(file_path):
+
+    # Open a text output file, or standard output if `-`
+    if str(file_path) == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return file_path.open("wt", encoding="utf-8")
+
+
+def _default_wheel_cache():
+
+    # Return the default directory in which to cache extracted wheels
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "py-api-dumper" / "wheels"
+
+
+def _used_names(args):
+
+    # Scan consumer codebases for the names of the APIs they use, if given
+    if not args.used_by:
+        return None
+    return UsedNames.from_paths(*args.used_by, max_workers=args.jobs)
+
+
+def _dump_installed(args, used_names):
+
+    # Index installed distributions, optionally persisting the index
+    if args.dist_index_cache is not None:
+        dist_index = DistributionIndex.load(args.dist_index_cache)
+    else:
+        dist_index = DistributionIndex.cached()
+
+    # Add top-level modules installed by the given distributions
+    modules = list(args.modules)
+    for dist_name in args.dist:
+        try:
+            modules.extend(dist_index.top_level_modules(dist_name))
+        except importlib.metadata.PackageNotFoundError:
+            args.parser.error(f"distribution {dist_name} is not installed")
+
+    # Default to installed top-level modules used by consumer codebases
+    if len(modules) == 0 and used_names is not None:
+        modules.extend(
+            module
+            for module in used_names.top_level_modules()
+            if dist_index.lookup(module)[0] is not None
+        )
+    if len(modules) == 0:
+        args.parser.error("no modules to dump")
 
     # Dump module APIs
-    dump = APIDump.from_modules(*args.modules)
+    return APIDump.from_modules(
+        *modules,
+        dist_index=dist_index,
+        profile_imports=args.profile_imports,
+        use_manifests=not args.no_manifests,
+        used_names=used_names,
+        compact_tables=args.compact_tables,
+        digests=args.digests,
+    )
+
+
+def _dump_all_installed(args):
+
+    # Dump module APIs of all installed distributions to shard files
+    if args.shard_dir is None:
+        args.parser.error("--all-installed requires --shard-dir")
+    dist_index = (
+        DistributionIndex.load(args.dist_index_cache)
+        if args.dist_index_cache is not None
+        else None
+    )
+    summary = APIDump.dump_installed(
+        args.shard_dir,
+        *args.dist,
+        dist_index=dist_index,
+        max_workers=args.jobs,
+        max_modules_per_worker=args.max_modules_per_worker,
+    )
+
+    # Print summary of shards, and any modules which failed to import
+    width = max(
+        [len("DISTRIBUTION")] + [len(s["distribution"]) for s in summary["shards"]]
+    )
+    print(f"{'DISTRIBUTION':<{width}}  {'ENTRIES':>7}  ERRORS")
+    for shard in summary["shards"]:
+        if shard.get("skipped", False):
+            print(f"{shard['distribution']:<{width}}  {'-':>7}  skipped")
+            continue
+        print(
+            f"{shard['distribution']:<{width}}  {shard['entries']:>7}"
+            f"  {len(shard['errors'])}"
+        )
+        for module_name, error in shard["errors"].items():
+            print(f"{module_name}: {error}", file=sys.stderr)
+
+    return 0
+
+
+def _dump(args):
+
+    if args.all_installed:
+
+        # Dump module APIs of all installed distributions to shard files
+        for option, value in (
+            ("--used-by", args.used_by),
+            ("--compact-tables", args.compact_tables),
+        ):
+            if value:
+                args.parser.error(f"{option} is not supported with --all-installed")
+        return _dump_all_installed(args)
+
+    elif args.wheel is not None:
+
+        # Dump module APIs from the given wheel file, without installing it
+        dump = APIDump.from_wheel(
+            args.wheel,
+            *args.modules,
+            cache_dir=args.wheel_cache or _default_wheel_cache(),
+            profile_imports=args.profile_imports,
+            use_manifests=not args.no_manifests,
+            used_names=_used_names(args),
+            compact_tables=args.compact_tables,
+        )
+
+    else:
+
+        # Dump module APIs from installed modules
+        dump = _dump_installed(args, _used_names(args))
 
     if args.output is None:
 
@@ -24,18 +161,45 @@ def _dump(args):
     elif args.text:
 
         # Print API dump as text to the given --output file
-        dump.print_as_text(args.output.open("wt"))
+        with _open_text_output(args.output) as file:
+            dump.print_as_text(file)
 
     else:
 
-        # Save the API dump to the given --output file in a reloadable format
-        dump.save_to_file(args.output)
+        # Save the API dump to the given --output file in a reloadable format,
+        # optionally as a delta from the given --base dump
+        dump.save_to_file(
+            args.output,
+            base=args.base,
+            max_delta_depth=args.max_delta_depth,
+            tables_file=args.tables_file,
+        )
 
 
 def _diff(args):
 
-    # Load API diff
-    diff = APIDiff.from_files(args.old_dump, args.new_dump)
+    # Load API diff, from dump files or else from git revisions
+    kwargs = dict(
+        detect_moves=args.detect_moves,
+        perf_threshold=args.perf,
+        expand_tables=args.expand_tables,
+    )
+    if args.suppress is not None:
+        kwargs["suppress"] = SuppressionRules.from_file(args.suppress)
+    if args.git:
+        diff = APIDiff.from_git(
+            str(args.old_dump), str(args.new_dump), args.path or ".", **kwargs
+        )
+    elif args.path is not None:
+        args.parser.error("PATH is only valid with --git")
+    elif str(args.old_dump) == str(args.new_dump) == "-":
+        args.parser.error(
+            "only one of old_dump and new_dump may be read from standard input"
+        )
+    else:
+        diff = APIDiff.from_files(
+            args.old_dump, args.new_dump, engine=args.engine, **kwargs
+        )
 
     if args.output is None:
 
@@ -45,13 +209,187 @@ def _diff(args):
     elif args.text:
 
         # Print API diff as text to the given --output file
-        diff.print_as_text(args.output.open("wt"))
+        with _open_text_output(args.output) as file:
+            diff.print_as_text(file)
+
+    elif args.json_lines:
+
+        # Save the API diff to the given --output file in JSON Lines format
+        diff.save_as_json_lines(args.output)
 
     else:
 
         # Save the API diff to the given --output file in JSON format
         diff.save_as_json(args.output)
 
+    # Report the entries suppressed by each rule, and flag stale rules
+    for rule, count in diff.suppressed:
+        if count > 0:
+            print(f"suppressed {count} entries: {rule}", file=sys.stderr)
+        else:
+            print(f"warning: stale suppression rule: {rule}", file=sys.stderr)
+
+    # Exit with non-zero status if any import costs grew past the threshold
+    return 1 if len(diff.perf_regressions) > 0 else 0
+
+
+def _diff_batch(args):
+
+    # Read pairs of API dump files from manifest
+    # - each line gives the old dump file, new dump file, and optional output file
+    # - relative file names are relative to the manifest
+    pairs = []
+    manifest_dir = args.manifest.parent
+    with args.manifest.open("rt", encoding="utf-8") as file:
+        for line in file:
+            names = line.split()
+            if len(names) == 0 or names[0].startswith("#"):
+                continue
+            if len(names) not in (2, 3):
+                args.parser.error(
+                    f"invalid line in manifest {args.manifest}: {line.strip()}"
+                )
+            old_dump, new_dump = manifest_dir / names[0], manifest_dir / names[1]
+            if len(names) > 2:
+                output = manifest_dir / names[2]
+            elif args.output_dir is not None:
+                suffix = ".txt" if args.text else ".json"
+                output = args.output_dir / f"{old_dump.stem}--{new_dump.stem}{suffix}"
+            else:
+                output = None
+            pairs.append((old_dump, new_dump, output))
+
+    # Load API diffs in parallel and write the given output files
+    if args.output_dir is not None:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+    summary = APIDiff.batch(
+        pairs, text=args.text, max_workers=args.jobs, detect_moves=args.detect_moves
+    )
+
+    # Print summary of API entries removed, added, moved, and renamed per package
+    changes = ("removed", "added", "moved", "renamed")
+    width = max([len("PACKAGE")] + [len(p) for p in summary["packages"]])
+    print(f"{'PACKAGE':<{width}}" + "".join(f"  {c.upper():>7}" for c in changes))
+    for package, counts in summary["packages"].items():
+        print(f"{package:<{width}}" + "".join(f"  {counts[c]:>7}" for c in changes))
+
+    if args.output is not None:
+
+        # Save summary to the given --output file in JSON format
+        with args.output.open("wt", encoding="utf-8") as file:
+            json.dump(summary, file, sort_keys=True)
+
+    # Exit with non-zero status if any APIs differ
+    return 0 if summary["equal"] else 1
+
+
+def _check(args):
+
+    # Compare module APIs against the baseline, stopping early
+    try:
+        differences = APIDump.check(
+            args.baseline, *args.modules, max_differences=args.max_differences or None
+        )
+    except (OSError, ValueError, ImportError) as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 2
+
+    # Print API differences as text to standard output
+    for prefix in ("-", "+"):
+        _print_entries(prefix, [e for p, e in differences if p == prefix], sys.stdout)
+    if len(differences) == args.max_differences:
+        print(f"stopped after {len(differences)} difference(s)", file=sys.stderr)
+
+    # Exit with non-zero status if any APIs differ
+    return 0 if len(differences) == 0 else 1
+
+
+def _repack(args):
+
+    # Load API dump, following any chain of deltas
+    dump = APIDump.load_from_file(args.dump)
+
+    # Save the complete API dump, or else as a delta from the given --base dump
+    dump.save_to_file(
+        args.output or args.dump, base=args.base, max_delta_depth=args.max_delta_depth
+    )
+
+    return 0
+
+
+def _show(args):
+
+    # Find API entries using the index saved next to the API dump file, or else
+    # by loading the API dump, if read from standard input or if the index cannot
+    # be saved
+    index = None
+    if str(args.dump) != "-":
+        try:
+            index = DumpIndex.for_dump_file(args.dump)
+        except OSError:
+            pass
+    if index is not None:
+        with index:
+            entries = index.query(args.pattern, kinds=args.kind)
+    else:
+        entries = APIDump.load_from_file(args.dump).query(args.pattern, args.kind)
+
+    # Print matching API entries as text to standard output
+    _print_entries("", entries, sys.stdout)
+
+    # Exit with non-zero status if no API entries match
+    return 0 if len(entries) > 0 else 1
+
+
+def _bisect(args):
+
+    # Find the first API dump where the matching API entries changed
+    result = APIDiff.bisect(args.dumps, args.entry, kinds=args.kind)
+    if result is None:
+        print(
+            f"{args.entry}: unchanged in {len(args.dumps)} API dumps", file=sys.stderr
+        )
+        return 1
+
+    # Print change, and API differences as text to standard output
+    print(
+        f"{args.entry}: {result['change']} in {result['new_dump']}"
+        f" (after {result['old_dump']}); loaded {result['loaded']}"
+        f" of {len(args.dumps)} API dumps",
+        file=sys.stderr,
+    )
+    result["diff"].print_as_text()
+
+    return 0
+
+
+def _watch(args):
+
+    # Import lazily, since the watch module imports this package
+    from .watch import APIWatch
+
+    # Watch module, and print API differences as its source files change
+    with APIWatch(
+        args.module, args.baseline, use_inotify=False if args.poll else None
+    ) as watch:
+        print(f"watching {watch.root}", file=sys.stderr)
+        try:
+            for changed_files in watch.changed_files():
+                try:
+                    affected, diff = watch.update(changed_files)
+                except RuntimeError as err:
+                    print(err, file=sys.stderr)
+                    continue
+                if len(affected) == 0:
+                    continue
+                print(f"# {time.strftime('%H:%M:%S')} re-dumped {' '.join(affected)}")
+                diff.print_as_text()
+                sys.stdout.flush()
+        except KeyboardInterrupt:
+            pass
+
+    return 0
+
 
 def cli(*argv):
     """Command-line parser entry point."""
@@ -66,31 +404,368 @@ def cli(*argv):
         "dump", description="dump APIs", help="dump APIs"
     )
     parser_dump.add_argument(
-        "-o", "--output", type=Path, default=None, help="Output API dump to this file"
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Output API dump to this file, or to standard output if '-'",
     )
     parser_dump.add_argument(
         "-t", "--text", action="store_true", help="Output API dump in text format"
     )
     parser_dump.add_argument(
-        "modules", type=str, nargs="+", help="Dump APIs of these modules"
+        "--base",
+        type=Path,
+        default=None,
+        help="Save the API dump to the --output file as a delta from the API dump"
+        " in this file",
+    )
+    parser_dump.add_argument(
+        "--max-delta-depth",
+        type=int,
+        default=10,
+        help="Save the complete API dump if saving as a delta would exceed this"
+        " depth of chained deltas (default: %(default)s)",
+    )
+    parser_dump.add_argument(
+        "--dist",
+        type=str,
+        action="append",
+        default=[],
+        help="Dump APIs of all top-level modules installed by this distribution",
+    )
+    parser_dump.add_argument(
+        "--dist-index-cache",
+        type=Path,
+        default=None,
+        help="Persist the index of installed distributions to this file",
+    )
+    parser_dump.add_argument(
+        "--wheel",
+        type=Path,
+        default=None,
+        help="Dump APIs of modules in this wheel file, without installing it",
+    )
+    parser_dump.add_argument(
+        "--wheel-cache",
+        type=Path,
+        default=None,
+        help="Cache extracted wheels in this directory"
+        " (default: $XDG_CACHE_HOME/py-api-dumper/wheels)",
+    )
+    parser_dump.add_argument(
+        "--no-manifests",
+        action="store_true",
+        help="Import all modules, even if their distributions embed an API manifest",
+    )
+    parser_dump.add_argument(
+        "--used-by",
+        type=Path,
+        action="append",
+        default=[],
+        help="Restrict APIs to those used by the Python source files in this"
+        " directory or file, which are scanned but not imported; if no modules are"
+        " given, dump the installed top-level modules they use",
+    )
+    parser_dump.add_argument(
+        "--compact-tables",
+        type=int,
+        nargs="?",
+        const=100,
+        default=None,
+        metavar="THRESHOLD",
+        help="Save members of the same type in a module or class, e.g. of an enum"
+        " or a table of constants, as a single entry with their number and a digest"
+        " of their names, if there are at least this many (default: %(const)s)",
+    )
+    parser_dump.add_argument(
+        "--digests",
+        action="store_true",
+        help="Save a digest of the source files of each module, so that 'check'"
+        " against the dump skips modules which are unchanged",
+    )
+    parser_dump.add_argument(
+        "--tables-file",
+        type=Path,
+        default=None,
+        help="Save the names of the members of tables saved by --compact-tables to"
+        " this file; otherwise they are re-derived from the installed modules when"
+        " expanded",
+    )
+    parser_dump.add_argument(
+        "--all-installed",
+        action="store_true",
+        help="Dump APIs of all installed distributions (or those given by --dist)"
+        " to one file per distribution in the --shard-dir directory",
     )
-    parser_dump.set_defaults(subcommand=_dump)
+    parser_dump.add_argument(
+        "--shard-dir",
+        type=Path,
+        default=None,
+        help="Save dumps of each distribution to this directory; distributions"
+        " already dumped are skipped",
+    )
+    parser_dump.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Maximum number of worker processes with --all-installed or --used-by",
+    )
+    parser_dump.add_argument(
+        "--max-modules-per-worker",
+        type=int,
+        default=100,
+        help="Replace worker processes after they dump this many top-level modules"
+        " (default: %(default)s)",
+    )
+    parser_dump.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="Record the time and memory cost of importing each module",
+    )
+    parser_dump.add_argument(
+        "modules", type=str, nargs="*", help="Dump APIs of these modules"
+    )
+    parser_dump.set_defaults(subcommand=_dump, parser=parser_dump)
     parser_diff = subparsers.add_parser(
         "diff", description="compare APIs", help="compare APIs"
     )
     parser_diff.add_argument(
-        "-o", "--output", type=Path, default=None, help="Output API diff to this file"
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Output API diff to this file, or to standard output if '-'",
     )
     parser_diff.add_argument(
         "-t", "--text", action="store_true", help="Output API diff in text format"
     )
     parser_diff.add_argument(
-        "old_dump", type=Path, help="File containing dump of old API"
+        "-l",
+        "--json-lines",
+        action="store_true",
+        help="Output API diff in JSON Lines format, one record per changed entry",
+    )
+    parser_diff.add_argument(
+        "--detect-moves",
+        action="store_true",
+        help="Report moved and renamed subtrees instead of removed and added entries",
+    )
+    parser_diff.add_argument(
+        "--expand-tables",
+        action="store_true",
+        help="Report the members which differ between tables of members saved by"
+        " 'dump --compact-tables', instead of the tables",
     )
     parser_diff.add_argument(
-        "new_dump", type=Path, help="File containing dump of new API"
+        "--perf",
+        type=float,
+        nargs="?",
+        const=0.1,
+        default=None,
+        metavar="THRESHOLD",
+        help="Report modules whose import costs grew by more than this fraction"
+        " (default: %(const)s)",
+    )
+    parser_diff.add_argument(
+        "--suppress",
+        type=Path,
+        default=None,
+        metavar="RULES",
+        help="Do not report removed or added entries matching the rules in this file",
+    )
+    parser_diff.add_argument(
+        "--engine",
+        choices=("auto", "python", "numpy"),
+        default="auto",
+        help="How to compare API dump files; 'numpy' is faster for large dumps"
+        " (default: %(default)s)",
+    )
+    parser_diff.add_argument(
+        "--git",
+        action="store_true",
+        help="Compare APIs of modules in two git revisions, without checking them out",
+    )
+    parser_diff.add_argument(
+        "old_dump",
+        type=Path,
+        help="File containing dump of old API, or standard input if '-', or old git"
+        " revision if --git",
+    )
+    parser_diff.add_argument(
+        "new_dump",
+        type=Path,
+        help="File containing dump of new API, or standard input if '-', or new git"
+        " revision if --git",
+    )
+    parser_diff.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Directory in the git revisions containing modules, or a package"
+        " (default: current directory)",
+    )
+    parser_diff.set_defaults(subcommand=_diff, parser=parser_diff)
+    parser_diff_batch = subparsers.add_parser(
+        "diff-batch",
+        description="compare many pairs of APIs listed in a manifest",
+        help="compare many pairs of APIs",
+    )
+    parser_diff_batch.add_argument(
+        "-o", "--output", type=Path, default=None, help="Output summary to this file"
+    )
+    parser_diff_batch.add_argument(
+        "-d",
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Output API diffs not given in the manifest to this directory",
+    )
+    parser_diff_batch.add_argument(
+        "-t", "--text", action="store_true", help="Output API diffs in text format"
+    )
+    parser_diff_batch.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Maximum number of worker processes",
+    )
+    parser_diff_batch.add_argument(
+        "--detect-moves",
+        action="store_true",
+        help="Report moved and renamed subtrees instead of removed and added entries",
+    )
+    parser_diff_batch.add_argument(
+        "manifest",
+        type=Path,
+        help="File listing old and new API dump files, and optional output files",
+    )
+    parser_diff_batch.set_defaults(subcommand=_diff_batch, parser=parser_diff_batch)
+    parser_check = subparsers.add_parser(
+        "check",
+        description="check that APIs match a baseline, stopping at the first"
+        " difference; exit status is 0 if they match, 1 if they differ, and 2"
+        " on error",
+        help="check APIs against a baseline",
+    )
+    parser_check.add_argument(
+        "-n",
+        "--max-differences",
+        type=int,
+        default=1,
+        help="Stop after finding this many differences; 0 finds all differences"
+        " (default: %(default)s)",
+    )
+    parser_check.add_argument(
+        "baseline", type=Path, help="File containing dump of baseline API"
+    )
+    parser_check.add_argument(
+        "modules",
+        type=str,
+        nargs="*",
+        help="Check APIs of these modules (default: the modules in the baseline)",
+    )
+    parser_check.set_defaults(subcommand=_check)
+    parser_repack = subparsers.add_parser(
+        "repack",
+        description="rewrite an API dump saved as a delta as a complete API dump,"
+        " or as a delta from another base",
+        help="repack API dumps",
+    )
+    parser_repack.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Output API dump to this file (default: rewrite the API dump file)",
+    )
+    parser_repack.add_argument(
+        "--base",
+        type=Path,
+        default=None,
+        help="Save the API dump as a delta from the API dump in this file",
+    )
+    parser_repack.add_argument(
+        "--max-delta-depth",
+        type=int,
+        default=10,
+        help="Save the complete API dump if saving as a delta would exceed this"
+        " depth of chained deltas (default: %(default)s)",
+    )
+    parser_repack.add_argument("dump", type=Path, help="File containing dump of API")
+    parser_repack.set_defaults(subcommand=_repack)
+    parser_show = subparsers.add_parser(
+        "show",
+        description="show API entries whose dotted paths match a pattern",
+        help="show API entries",
+    )
+    parser_show.add_argument(
+        "-k",
+        "--kind",
+        type=str,
+        action="append",
+        default=None,
+        help="Only show API entries of this kind, e.g. CLASS, FUNCTION",
+    )
+    parser_show.add_argument("dump", type=Path, help="File containing dump of API")
+    parser_show.add_argument(
+        "pattern",
+        type=str,
+        help="Pattern matching dotted paths of API entries, e.g. 'mymod.*.func'",
+    )
+    parser_show.set_defaults(subcommand=_show)
+    parser_bisect = subparsers.add_parser(
+        "bisect",
+        description="find the first of a series of API dumps where API entries"
+        " matching a pattern were added, removed, or changed",
+        help="bisect API changes",
+    )
+    parser_bisect.add_argument(
+        "-e",
+        "--entry",
+        type=str,
+        required=True,
+        help="Pattern matching dotted paths of API entries, e.g. 'mymod.func*'",
+    )
+    parser_bisect.add_argument(
+        "-k",
+        "--kind",
+        type=str,
+        action="append",
+        default=None,
+        help="Only compare API entries of this kind, e.g. CLASS, FUNCTION",
+    )
+    parser_bisect.add_argument(
+        "dumps",
+        type=Path,
+        nargs="+",
+        help="Files containing dumps of APIs, in order, e.g. of releases",
+    )
+    parser_bisect.set_defaults(subcommand=_bisect)
+    parser_watch = subparsers.add_parser(
+        "watch",
+        description="watch the source files of a module, and compare its API"
+        " as they change",
+        help="watch API changes",
+    )
+    parser_watch.add_argument(
+        "-b",
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Compare against API dump in this file"
+        " (default: the API when watching starts)",
+    )
+    parser_watch.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll source files for changes instead of using inotify",
     )
-    parser_diff.set_defaults(subcommand=_diff)
+    parser_watch.add_argument("module", type=str, help="Watch this module")
+    parser_watch.set_defaults(subcommand=_watch)
 
     # Parse command line
     argv = [str(a) for a in (argv or sys.argv[1:] or ["--help"])]
@@ -98,6 +773,6 @@ def cli(*argv):
 
     # Execute sub-command
     try:
-        args.subcommand(args)
+        return args.subcommand(args)
     except BrokenPipeError:  # pragma: no cover
         pass
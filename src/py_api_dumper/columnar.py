@@ -0,0 +1,183 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Columnar engine for the differences between large API dumps, using NumPy.
+
+NumPy is imported when the engine is first used, so that importing this package
+does not import it.
+"""
+
+import functools
+from typing import List, Sequence, Tuple
+
+# Minimum number of API entries in a dump for which the columnar engine is
+# faster than the pure-Python engine
+# - measured at 50-100 entries, for dumps differing in 5% of their entries; the
+#   time to import NumPy (about 70 ms) is not counted, as it is spent once per
+#   process
+CROSSOVER_ENTRIES = 100
+
+# Number of bytes of lines hashed or compared at once, so that memory use is
+# bounded by a small multiple of the size of the lines
+_CHUNK_BYTES = 1 << 20
+
+_HASH_PRIME = 0x100000001B3
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+
+    # Import NumPy, or return None if it is not installed
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def available() -> bool:
+    """Return True if the columnar engine is available, i.e. NumPy is installed."""
+    return _numpy() is not None
+
+
+def _line_buffer(lines):
+
+    # Return lines of JSON, each ending in a newline except perhaps the last, as
+    # one array of UTF-8 bytes, and the start and end offsets of each line
+    np = _numpy()
+    data = "".join(lines)
+    if not data.endswith("\n"):
+        data += "\n"
+    buf = np.frombuffer(data.encode("utf-8"), dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord("\n"))[: len(lines)] + 1
+    starts = np.concatenate(([0], ends[:-1]))[: len(lines)]
+    return buf, starts, ends
+
+
+def _chunks(ends):
+
+    # Split consecutive lines, given the end offsets of their bytes, into runs
+    # of about `_CHUNK_BYTES` bytes
+    np = _numpy()
+    cuts = np.searchsorted(ends, np.arange(_CHUNK_BYTES, ends[-1], _CHUNK_BYTES))
+    bounds = np.unique(np.concatenate(([0], cuts, [len(ends)])))
+    return zip(bounds[:-1].tolist(), bounds[1:].tolist())
+
+
+def _line_keys(buf, starts, ends):
+
+    # Hash each line to a 64-bit key
+    # - a polynomial in the bytes of the line modulo 2**64, followed by the
+    #   SplitMix64 finaliser, computed for all bytes of a run of lines at once
+    np = _numpy()
+    lengths = ends - starts
+    powers = np.cumprod(
+        np.full(int(lengths.max(initial=0)), _HASH_PRIME, dtype=np.uint64)
+    )
+    keys = np.zeros(len(starts), dtype=np.uint64)
+    for lo, hi in _chunks(ends) if len(ends) > 0 else ():
+        offsets = np.arange(starts[lo], ends[hi - 1]) - np.repeat(
+            starts[lo:hi], lengths[lo:hi]
+        )
+        terms = buf[starts[lo] : ends[hi - 1]] * powers[offsets]
+        keys[lo:hi] = np.add.reduceat(terms, starts[lo:hi] - starts[lo])
+    keys ^= keys >> np.uint64(30)
+    keys *= np.uint64(0xBF58476D1CE4E5B9)
+    keys ^= keys >> np.uint64(27)
+    keys *= np.uint64(0x94D049BB133111EB)
+    keys ^= keys >> np.uint64(31)
+    return keys
+
+
+def _repeated(keys):
+
+    # Return the keys which occur more than once
+    np = _numpy()
+    unique, counts = np.unique(keys, return_counts=True)
+    return unique[counts > 1]
+
+
+def _lines_equal(old, new, old_index, new_index):
+
+    # Compare pairs of lines of the old and new dumps, given by index, byte by
+    # byte, for all bytes of a run of pairs at once
+    np = _numpy()
+    (old_buf, old_starts, old_ends), (new_buf, new_starts, new_ends) = old, new
+    old_starts, new_starts = old_starts[old_index], new_starts[new_index]
+    lengths = old_ends[old_index] - old_starts
+    equal = lengths == new_ends[new_index] - new_starts
+    pairs = np.flatnonzero(equal)
+    pair_ends = np.cumsum(lengths[pairs])
+    for lo, hi in _chunks(pair_ends) if len(pairs) > 0 else ():
+        run_lengths = lengths[pairs[lo:hi]]
+        run_starts = pair_ends[lo:hi] - run_lengths - (pair_ends[lo - 1] if lo else 0)
+        offsets = np.arange(run_lengths.sum()) - np.repeat(run_starts, run_lengths)
+        same = (
+            old_buf[np.repeat(old_starts[pairs[lo:hi]], run_lengths) + offsets]
+            == new_buf[np.repeat(new_starts[pairs[lo:hi]], run_lengths) + offsets]
+        )
+        equal[pairs[lo:hi]] = np.logical_and.reduceat(same, run_starts)
+    return equal
+
+
+def differences(
+    old_lines: Sequence[str], new_lines: Sequence[str]
+) -> Tuple[List[int], List[int]]:
+    """Find the lines of API entries which differ between two API dumps.
+
+    The lines of JSON of the entries, as read from the dump files, are encoded
+    into one array of bytes per dump, and each line is hashed to a 64-bit key
+    in a single vectorized pass. Each entry of the old dump is matched to the
+    entry of the new dump with the same key by a binary search of the sorted
+    keys, and matched lines are compared byte by byte, so that entries whose
+    keys collide are never mistaken for equal entries. Entries whose keys occur
+    more than once are compared as strings. No lines are parsed.
+
+    Args:
+        old_lines (Sequence[str]):
+            Lines of JSON of the API entries of the old dump.
+        new_lines (Sequence[str]):
+            Lines of JSON of the API entries of the new dump.
+
+    Returns:
+        Tuple[List[int], List[int]]: Indexes of the lines of the old dump which
+        are not in the new dump, and of the lines of the new dump which are not
+        in the old dump, in ascending order.
+    """
+
+    # Encode and hash lines
+    np = _numpy()
+    old, new = _line_buffer(old_lines), _line_buffer(new_lines)
+    old_keys, new_keys = _line_keys(*old), _line_keys(*new)
+    removed = np.ones(len(old_keys), dtype=bool)
+    added = np.ones(len(new_keys), dtype=bool)
+
+    # Find keys which occur more than once in either dump
+    colliding = np.union1d(_repeated(old_keys), _repeated(new_keys))
+    old_colliding = np.isin(old_keys, colliding)
+    new_colliding = np.isin(new_keys, colliding)
+
+    # Match entries of the old dump to entries of the new dump with the same
+    # keys, and compare the matched lines
+    if len(new_keys) > 0:
+        new_order = np.argsort(new_keys)
+        sorted_keys = new_keys[new_order]
+        found = np.searchsorted(sorted_keys, old_keys).clip(max=len(new_keys) - 1)
+        matched = (sorted_keys[found] == old_keys) & ~old_colliding
+        old_index = np.flatnonzero(matched)
+        new_index = new_order[found[matched]]
+        equal = _lines_equal(old, new, old_index, new_index)
+        removed[old_index[equal]] = False
+        added[new_index[equal]] = False
+
+    # Compare entries with colliding keys as strings
+    old_index, new_index = np.flatnonzero(old_colliding), np.flatnonzero(new_colliding)
+    old_set = {old_lines[i].rstrip("\n") for i in old_index.tolist()}
+    new_set = {new_lines[i].rstrip("\n") for i in new_index.tolist()}
+    for i in old_index.tolist():
+        removed[i] = old_lines[i].rstrip("\n") not in new_set
+    for i in new_index.tolist():
+        added[i] = new_lines[i].rstrip("\n") not in old_set
+
+    return np.flatnonzero(removed).tolist(), np.flatnonzero(added).tolist()
@@ -0,0 +1,395 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Import modules from git revisions without checking them out."""
+
+import ast
+import hashlib
+import importlib
+import importlib.abc
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple, Union
+
+from .threadsafe import import_lock
+
+_TREE_MODE = b"40000"
+_BLOB_MODES = (b"100644", b"100755")
+
+
+class GitObjectReader:
+    """Read objects from a git repository through a persistent process.
+
+    Objects are read with a single `git cat-file --batch` process, which is
+    started when the reader is entered and stopped when it is exited, so that
+    reading many objects does not start a process for each object.
+    """
+
+    def __init__(self, repo_dir: Optional[Union[Path, str]] = None):
+        """Read objects from a git repository through a persistent process.
+
+        Args:
+            repo_dir (Optional[Union[Path, str]]):
+                Directory within the git repository (default: current directory).
+                Object names of the form `REV:./PATH` are relative to it.
+        """
+        self._repo_dir = repo_dir
+        self._process: Optional[subprocess.Popen] = None
+        self._stdin: Optional[IO[bytes]] = None
+        self._stdout: Optional[IO[bytes]] = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=self._repo_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._stdin, self._stdout = self._process.stdin, self._process.stdout
+        return self
+
+    def __exit__(self, *args):
+        self._stdin.close()
+        self._stdout.close()
+        self._process.wait()
+        self._process = self._stdin = self._stdout = None
+
+    def read(self, name: str) -> Tuple[str, str, bytes]:
+        """Read an object.
+
+        Args:
+            name (str):
+                Name of the object, e.g. `HEAD:./src/mymod/__init__.py`.
+
+        Returns:
+            Tuple[str, str, bytes]: Hash, type and contents of the object.
+
+        Raises:
+            KeyError: If the object does not exist.
+        """
+        assert self._stdin is not None and self._stdout is not None
+
+        # Request object, and read its header
+        self._stdin.write(name.encode("utf-8") + b"\n")
+        self._stdin.flush()
+        header = self._stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(name)
+        obj_hash, obj_type, obj_size = header
+
+        # Read object contents, followed by a newline
+        content = self._stdout.read(int(obj_size) + 1)[:-1]
+
+        return obj_hash.decode("ascii"), obj_type.decode("ascii"), content
+
+    def read_tree(self, name: str) -> Dict[str, str]:
+        """Read the hashes of all files in a tree object and its subtrees.
+
+        Args:
+            name (str):
+                Name of the tree object, e.g. `HEAD:./src`.
+
+        Returns:
+            Dict[str, str]: Hashes of files, keyed by their paths in the tree.
+
+        Raises:
+            KeyError: If the object does not exist, or is not a tree.
+        """
+        _, obj_type, content = self.read(name)
+        if obj_type != "tree":
+            raise KeyError(name)
+
+        # Parse tree entries: "<mode> <name>\0<20-byte hash>"
+        files = dict()
+        i = 0
+        while i < len(content):
+            j = content.index(b"\0", i)
+            mode, entry_name = content[i:j].split(b" ", 1)
+            entry_hash = content[j + 1 : j + 21].hex()
+            i = j + 21
+            path = entry_name.decode("utf-8")
+            if mode == _TREE_MODE:
+                for sub_path, sub_hash in self.read_tree(entry_hash).items():
+                    files[path + "/" + sub_path] = sub_hash
+            elif mode in _BLOB_MODES:
+                files[path] = entry_hash
+
+        return files
+
+
+def _module_names(files, package):
+
+    # Map names of modules in a tree to their file paths, and whether they are
+    # packages; modules are only found in packages which have an `__init__.py`
+    modules = dict()
+    for path in files:
+        parts = path.split("/")
+        if not parts[-1].endswith(".py"):
+            continue
+        if parts[-1] == "__init__.py":
+            is_package = True
+            parts = parts[:-1]
+        else:
+            is_package = False
+            parts[-1] = parts[-1][: -len(".py")]
+        if package is not None:
+            parts.insert(0, package)
+        if not all(p.isidentifier() for p in parts):
+            continue
+        modules[".".join(parts)] = (path, is_package)
+    return {
+        name: info
+        for name, info in modules.items()
+        if all(
+            modules.get(".".join(name.split(".")[:k]), (None, False))[1]
+            for k in range(1, name.count(".") + 1)
+        )
+    }
+
+
+def _imported_modules(tree, module_name, is_package, modules):
+
+    # Return the names of modules whose contents are imported by a module
+    # - `from M import N` imports submodule `M.N` if it exists, else `N` from `M`
+    # - parent packages, which are executed on import, are not included
+    package = module_name if is_package else module_name.rpartition(".")[0]
+    imported = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level > 0:
+                parts = package.split(".")
+                parent = ".".join(parts[: len(parts) - node.level + 1])
+                base = parent + "." + base if base else parent
+            for alias in node.names:
+                submodule = base + "." + alias.name
+                imported.add(submodule if submodule in modules else base)
+    return {name for name in imported if name in modules}
+
+
+class GitImporter(importlib.abc.MetaPathFinder, importlib.abc.InspectLoader):
+    """Import modules from a git revision without checking it out.
+
+    While active, modules found in a directory of a git revision are imported
+    from the contents of their files, as read by a `GitObjectReader`. Any
+    already-imported modules of the same names are hidden. Only Python source
+    files can be imported; extension modules cannot. The import system is
+    changed for the whole process, so other threads also import modules from
+    the revision while it is active.
+
+    Attributes:
+        rev (str):
+            Git revision.
+        path (str):
+            Directory in the git revision, relative to the reader's directory,
+            which either contains top-level modules or is itself a package.
+        modules (List[str]):
+            Names of public modules found in the directory.
+    """
+
+    rev: str
+    path: str
+    modules: List[str]
+
+    def __init__(self, reader: GitObjectReader, rev: str, path: str = "."):
+        """Import modules from a git revision without checking it out.
+
+        Args:
+            reader (GitObjectReader):
+                Reader of objects from the git repository.
+            rev (str):
+                Git revision.
+            path (str):
+                Directory in the git revision, relative to the reader's
+                directory, which either contains top-level modules or is itself
+                a package.
+        """
+        self.rev = rev
+        self.path = path
+        self._reader = reader
+
+        # List files in directory
+        path_str = Path(path).as_posix().strip("/")
+        self._files = reader.read_tree(f"{rev}:./{path_str}")
+
+        # Find modules in directory, which is itself a package if it contains
+        # an `__init__.py`
+        package = None
+        if "__init__.py" in self._files:
+            package = Path(reader._repo_dir or ".", path).resolve().name
+        self._modules = _module_names(self._files, package)
+        self.modules = sorted(
+            name
+            for name in self._modules
+            if not any(m.startswith("_") for m in name.split("."))
+        )
+
+        self._sources: Dict[str, bytes] = dict()
+        self._digests: Dict[str, str] = dict()
+
+    def __enter__(self):
+
+        # Hide already-imported modules of the same names as those in the
+        # revision, and import modules from revision first, holding the lock on
+        # the import system while modifying it
+        with import_lock:
+            self._saved_modules = {
+                name: sys.modules.pop(name)
+                for name in list(sys.modules)
+                if self._in_revision(name)
+            }
+            sys.meta_path.insert(0, self)
+            importlib.invalidate_caches()
+
+        return self
+
+    def __exit__(self, *args):
+
+        # Remove modules imported from revision, and restore hidden modules
+        with import_lock:
+            sys.meta_path.remove(self)
+            for name in list(sys.modules):
+                if self._in_revision(name):
+                    del sys.modules[name]
+            sys.modules.update(self._saved_modules)
+            importlib.invalidate_caches()
+
+    def _in_revision(self, module_name):
+
+        # Return whether a module has the same top-level module as one in the revision
+        return module_name.split(".")[0] in self._modules
+
+    def find_spec(self, fullname, path, target=None):
+        """Find a module spec for a module in the git revision.
+
+        Args:
+            fullname (str):
+                Name of module.
+            path (Optional[Sequence[str]]):
+                Search path for submodules.
+            target (Optional[ModuleType]):
+                Module to be reloaded, if any.
+
+        Returns:
+            Optional[ModuleSpec]: Module spec, or None if not found.
+        """
+        if fullname not in self._modules:
+            return None
+        spec = importlib.util.spec_from_loader(
+            fullname,
+            self,
+            origin=self.get_filename(fullname),
+            is_package=self.is_package(fullname),
+        )
+        assert spec is not None
+        spec.has_location = True
+        return spec
+
+    def get_filename(self, fullname: str) -> str:
+        """Return a name for the file of a module in the git revision.
+
+        Args:
+            fullname (str):
+                Name of module.
+
+        Returns:
+            str: File name, of the form `REV:PATH`.
+        """
+        file_path = Path(self.path, self._modules[fullname][0]).as_posix()
+        return f"{self.rev}:{file_path}"
+
+    def is_package(self, fullname: str) -> bool:
+        """Return whether a module in the git revision is a package.
+
+        Args:
+            fullname (str):
+                Name of module.
+
+        Returns:
+            bool: True if the module is a package.
+        """
+        return self._modules[fullname][1]
+
+    def get_source(self, fullname: str) -> str:
+        """Return the source code of a module in the git revision.
+
+        Args:
+            fullname (str):
+                Name of module.
+
+        Returns:
+            str: Source code.
+        """
+        return importlib.util.decode_source(self._get_source_bytes(fullname))
+
+    def get_code(self, fullname):
+        """Return the compiled code of a module in the git revision.
+
+        Args:
+            fullname (str):
+                Name of module.
+
+        Returns:
+            CodeType: Compiled code.
+        """
+        return compile(
+            self._get_source_bytes(fullname),
+            self.get_filename(fullname),
+            "exec",
+            dont_inherit=True,
+        )
+
+    def _get_source_bytes(self, fullname):
+
+        # Read source code of module through reader, once
+        source = self._sources.get(fullname)
+        if source is None:
+            file_hash = self._files[self._modules[fullname][0]]
+            _, _, source = self._reader.read(file_hash)
+            self._sources[fullname] = source
+        return source
+
+    def digest(self, module_name: str) -> str:
+        """Return a digest of the source code which determines a module's API.
+
+        The digest covers the files of the module and of all modules in the
+        revision which it imports, directly or indirectly. Modules with equal
+        digests in two revisions are assumed to have the same API.
+
+        Args:
+            module_name (str):
+                Name of module.
+
+        Returns:
+            str: Digest.
+        """
+        digest = self._digests.get(module_name)
+        if digest is None:
+
+            # Find all modules in the revision imported by the module
+            imported = set()
+            pending = [module_name]
+            while len(pending) > 0:
+                name = pending.pop()
+                if name in imported:
+                    continue
+                imported.add(name)
+                tree = ast.parse(self._get_source_bytes(name))
+                pending.extend(
+                    _imported_modules(tree, name, self.is_package(name), self._modules)
+                )
+
+            # Hash the hashes of the files of the module and its imports
+            hasher = hashlib.blake2b(digest_size=16)
+            for name in sorted(imported):
+                hasher.update(
+                    f"{name}:{self._files[self._modules[name][0]]}\n".encode()
+                )
+            digest = self._digests[module_name] = hasher.hexdigest()
+
+        return digest
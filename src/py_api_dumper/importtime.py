@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Measure the time and memory cost of importing modules."""
+
+import importlib.abc
+import sys
+import time
+import tracemalloc
+from typing import Dict
+
+from .threadsafe import import_lock
+
+
+class _ProfilingLoader(importlib.abc.Loader):
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+
+        # Create module; extension modules are initialised here
+        return self._profiler._measure(spec.name, self._loader.create_module, spec)
+
+    def exec_module(self, module):
+
+        # Restore original loader before executing module
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+
+        # Execute module
+        self._profiler._measure(module.__name__, self._loader.exec_module, module)
+
+
+class ImportProfiler:
+    """Measure the time and memory cost of importing modules.
+
+    While active, measures the wall time taken to import each module, and the
+    memory allocated (and not freed) by importing each module as traced by
+    `tracemalloc`. As with `python -X importtime`, *self* costs exclude the costs
+    of importing other modules imported by a module, whereas *cumulative* costs
+    include them. Modules which have already been imported are not measured.
+    Modules imported by other threads while active are also measured.
+
+    Attributes:
+        metrics (Dict[str, Dict[str, float]]):
+            Import costs of each module: `self_time` and `cumulative_time` in
+            seconds, `self_memory` and `cumulative_memory` in bytes.
+    """
+
+    metrics: Dict[str, Dict[str, float]]
+
+    def __init__(self):
+        """Measure the time and memory cost of importing modules."""
+        self.metrics = dict()
+        self._stack = []
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        with import_lock:
+            sys.meta_path.insert(0, self)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, *args):
+        with import_lock:
+            sys.meta_path.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def find_spec(self, fullname, path, target=None):
+        """Find a module spec using the other finders, and wrap its loader.
+
+        Args:
+            fullname (str):
+                Name of module.
+            path (Optional[Sequence[str]]):
+                Search path for submodules.
+            target (Optional[ModuleType]):
+                Module to be reloaded, if any.
+
+        Returns:
+            Optional[ModuleSpec]: Module spec, or None if not found.
+        """
+
+        # Find module spec using the other finders
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Wrap loader in order to measure module creation and execution
+        if hasattr(spec.loader, "exec_module"):
+            spec.loader = _ProfilingLoader(spec.loader, self)
+
+        return spec
+
+    def _measure(self, name, func, *args):
+
+        # Measure the cost of `func`, and of any imports it performs
+        self._stack.append([0.0, 0])
+        memory_start = tracemalloc.get_traced_memory()[0]
+        time_start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            cost_time = time.perf_counter() - time_start
+            cost_memory = tracemalloc.get_traced_memory()[0] - memory_start
+            child_time, child_memory = self._stack.pop()
+
+            # Accumulate costs of this module
+            metrics = self.metrics.setdefault(
+                name,
+                {
+                    "self_time": 0.0,
+                    "cumulative_time": 0.0,
+                    "self_memory": 0,
+                    "cumulative_memory": 0,
+                },
+            )
+            metrics["self_time"] += cost_time - child_time
+            metrics["cumulative_time"] += cost_time
+            metrics["self_memory"] += cost_memory - child_memory
+            metrics["cumulative_memory"] += cost_memory
+
+            # Accumulate costs of the importing module
+            if len(self._stack) > 0:
+                self._stack[-1][0] += cost_time
+                self._stack[-1][1] += cost_memory
@@ -0,0 +1,253 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Sorted prefix index of the entries in an API dump file."""
+
+import fnmatch
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Type, TypeVar, Union
+
+DumpIndexType = TypeVar("DumpIndexType", bound="DumpIndex")
+
+_MAGIC = b"py-api-dumper-index-1\n"
+
+_OFFSET = struct.Struct(">Q")
+_TRAILER = struct.Struct(">QQ")
+
+
+def _glob_prefix(pattern):
+
+    # Return the literal prefix of a shell-style wildcard pattern
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:i]
+    return pattern
+
+
+def _match_kinds(kinds):
+
+    # Return a function which matches the kind of an entry's last element
+    if kinds is None:
+        return lambda kind: True
+    kinds = frozenset(kinds)
+    return kinds.__contains__
+
+
+def _dump_file_stamp(dump_file):
+
+    # Identify the contents of a dump file by its size and modification time
+    stat = os.stat(dump_file)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _index_is_current(header, stamp):
+
+    # Return True if an index was built from the dump file with the given stamp,
+    # and the base dump files of any chain of deltas are unchanged
+    # - the base of a delta is fixed when it is saved, so an unchanged dump file
+    #   has the same chain of base dump files
+    if header.get("dump_file") != stamp:
+        return False
+    try:
+        return all(
+            _dump_file_stamp(base_file) == base_stamp
+            for base_file, base_stamp in header.get("base_files", {}).items()
+        )
+    except OSError:
+        return False
+
+
+class DumpIndex:
+    """Sorted prefix index of the entries in an API dump file.
+
+    The index is saved next to the dump file, with the suffix `.idx` appended
+    to its name. It lists every entry of the dump sorted by its dotted path,
+    followed by a table of the file offsets of each entry, so that entries
+    matching a path prefix are found by binary search without reading the whole
+    index.
+
+    Attributes:
+        index_file (Path):
+            File containing the index.
+    """
+
+    index_file: Path
+
+    def __init__(self, index_file: Union[Path, str]):
+        """Open an index of the entries in an API dump file.
+
+        Args:
+            index_file (Union[Path, str]):
+                Name of file containing the index.
+        """
+        self.index_file = Path(index_file)
+
+        # Read header and location of offsets table
+        self._file = self.index_file.open("rb")
+        if self._file.readline() != _MAGIC:
+            self._file.close()
+            msg = f"{self.index_file} is not an API dump index"
+            raise ValueError(msg)
+        self._header = json.loads(self._file.readline())
+        self._file.seek(-_TRAILER.size, os.SEEK_END)
+        self._offsets_start, self._count = _TRAILER.unpack(
+            self._file.read(_TRAILER.size)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        """Close the index file."""
+        self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def build(
+        index_file: Union[Path, str],
+        entries: Iterable[Tuple],
+        header: Optional[dict] = None,
+    ) -> None:
+        """Build an index of API entries.
+
+        Args:
+            index_file (Union[Path, str]):
+                Name of file to save the index to.
+            entries (Iterable[Tuple]):
+                API entries to index.
+            header (Optional[dict]):
+                Additional information to save in the index.
+        """
+        from . import _entry_path
+
+        index_file = Path(index_file)
+
+        # Sort entries by dotted path
+        records = sorted((_entry_path(entry), json.dumps(entry)) for entry in entries)
+
+        # Write entries, followed by table of entry offsets, and trailer
+        # - write to a temporary file first, so that the index is always complete
+        index_file_tmp = index_file.with_name(index_file.name + ".tmp")
+        with index_file_tmp.open("wb") as file:
+            file.write(_MAGIC)
+            file.write(json.dumps(header or {}).encode("utf-8") + b"\n")
+            offsets = []
+            for path, entry_json in records:
+                offsets.append(file.tell())
+                file.write(f"{path}\t{entry_json}\n".encode("utf-8"))
+            offsets_start = file.tell()
+            for offset in offsets:
+                file.write(_OFFSET.pack(offset))
+            file.write(_TRAILER.pack(offsets_start, len(offsets)))
+        index_file_tmp.replace(index_file)
+
+    @classmethod
+    def for_dump_file(
+        cls: Type[DumpIndexType], dump_file: Union[Path, str]
+    ) -> DumpIndexType:
+        """Open the index of an API dump file, building it if needed.
+
+        The index is (re)built if it does not exist, or if the dump file, or
+        the base dump file of any chain of deltas it was saved as, has been
+        modified since the index was built.
+
+        Args:
+            dump_file (Union[Path, str]):
+                Name of file containing the API dump.
+
+        Returns:
+            DumpIndexType: DumpIndex instance.
+
+        Raises:
+            OSError: If the index needs to be built, but cannot be saved.
+        """
+        from . import APIDump
+
+        dump_file = Path(dump_file)
+        index_file = dump_file.with_name(dump_file.name + ".idx")
+        stamp = _dump_file_stamp(dump_file)
+
+        # Open existing index if it is up to date
+        try:
+            inst = cls(index_file)
+        except (OSError, ValueError):
+            pass
+        else:
+            if _index_is_current(inst._header, stamp):
+                return inst
+            inst.close()
+
+        # Build index, recording the base dump files of any chain of deltas
+        dump = APIDump.load_from_file(dump_file)
+        header = {
+            "dump_file": stamp,
+            "base_files": dict(
+                (str(base_file), _dump_file_stamp(base_file))
+                for base_file in dump._delta_chain
+            ),
+        }
+        cls.build(index_file, dump.api, header)
+
+        return cls(index_file)
+
+    def _read_record(self, i):
+
+        # Read the dotted path and JSON text of the `i`th entry
+        self._file.seek(self._offsets_start + i * _OFFSET.size)
+        (offset,) = _OFFSET.unpack(self._file.read(_OFFSET.size))
+        self._file.seek(offset)
+        return self._file.readline().decode("utf-8").rstrip("\n").split("\t", 1)
+
+    def query(self, pattern: str, kinds: Optional[Iterable[str]] = None) -> List[Tuple]:
+        """Find API entries whose dotted paths match a pattern.
+
+        See `APIDump.query()` for the syntax of patterns.
+
+        Args:
+            pattern (str):
+                Pattern matching dotted paths of API entries.
+            kinds (Optional[Iterable[str]]):
+                If given, only find entries of these kinds, e.g. `CLASS`.
+
+        Returns:
+            List[Tuple]: Matching API entries, sorted by dotted path.
+        """
+        prefix = _glob_prefix(pattern)
+        match_kind = _match_kinds(kinds)
+
+        # Find first entry whose path is not before the literal prefix of `pattern`
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._read_record(mid)[0] < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Read entries while their paths start with the literal prefix
+        results = []
+        if lo < self._count:
+            self._file.seek(self._offsets_start + lo * _OFFSET.size)
+            (offset,) = _OFFSET.unpack(self._file.read(_OFFSET.size))
+            self._file.seek(offset)
+            for _ in range(lo, self._count):
+                path, entry_json = (
+                    self._file.readline().decode("utf-8").rstrip("\n").split("\t", 1)
+                )
+                if not path.startswith(prefix):
+                    break
+                if fnmatch.fnmatchcase(path, pattern):
+                    entry = tuple(tuple(e) for e in json.loads(entry_json))
+                    if match_kind(entry[-1][0]):
+                        results.append(entry)
+
+        return results
@@ -0,0 +1,363 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Index of installed distribution metadata."""
+
+import base64
+import hashlib
+import importlib.metadata
+import itertools
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+DistributionIndexType = TypeVar("DistributionIndexType", bound="DistributionIndex")
+
+# Name of the API manifest embedded in the metadata directory of a distribution
+API_MANIFEST = "api_manifest.json.gz"
+
+
+def _normalize_name(name):
+
+    # Normalise a distribution name as per PEP 503
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _top_level_modules(dist):
+
+    # Use top-level modules declared by the distribution, if any
+    top_level = dist.read_text("top_level.txt")
+    if top_level is not None:
+        return [m for m in top_level.split() if m]
+
+    # Otherwise infer top-level modules from the files the distribution installs
+    modules = []
+    for file in dist.files or []:
+        if len(file.parts) == 0 or file.parts[0] == "..":
+            continue
+        name = file.parts[0]
+        if len(file.parts) == 1:
+            if file.suffix not in (".py", ".pyd", ".so"):
+                continue
+            name = name.split(".")[0]
+        elif "." in name or name == "__pycache__":
+            continue
+        if name.isidentifier() and name not in modules:
+            modules.append(name)
+    return modules
+
+
+def _record_digest(data, mode="sha256"):
+
+    # Return the digest of the contents of a file, as given in a RECORD file
+    # - URL-safe base64 encoding without padding, as per PEP 376
+    digest = hashlib.new(mode, data).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+_verified_metadata_cache: Dict[Tuple[str, str, int], Tuple[Tuple, Optional[bytes]]] = (
+    dict()
+)
+
+
+def _installed_file_stamps(metadata_file, files):
+
+    # Directory and RECORD modification time of an installed distribution, and
+    # the modification times and sizes of the files with hashes in its RECORD;
+    # None if any of them is missing, or if the distribution is not installed
+    # in a directory, e.g. is a wheel
+    located = metadata_file.locate()
+    if not isinstance(located, Path):
+        return None
+    try:
+        record_stamp = os.stat(located.parent / "RECORD").st_mtime_ns
+        stamps = tuple(
+            (stat.st_mtime_ns, stat.st_size)
+            for stat in (os.stat(file.locate()) for file in files if file.hash)
+        )
+    except OSError:
+        return None
+    return str(located.parent), record_stamp, stamps
+
+
+def _read_verified_metadata(dist, name):
+
+    # Read a file in the metadata directory of a distribution, provided that it
+    # and every other file installed by the distribution match their hashes in
+    # the distribution's RECORD; otherwise return None
+    files = dist.files or []
+    metadata_file = next(
+        (
+            file
+            for file in files
+            if file.name == name
+            and len(file.parts) == 2
+            and file.parts[0].endswith(".dist-info")
+        ),
+        None,
+    )
+    if metadata_file is None or metadata_file.hash is None:
+        return None
+
+    # Files are hashed once per version of the RECORD, and again only if any
+    # installed file has since changed
+    installed = _installed_file_stamps(metadata_file, files)
+    if installed is not None:
+        dist_path, record_stamp, stamps = installed
+        cached = _verified_metadata_cache.get((dist_path, name, record_stamp))
+        if cached is not None and cached[0] == stamps:
+            return cached[1]
+
+    content = None
+    for file in files:
+        if file.hash is None:
+            continue
+        try:
+            data = file.read_binary()
+            if _record_digest(data, file.hash.mode) != file.hash.value:
+                content = None
+                break
+        except (OSError, ValueError):
+            content = None
+            break
+        if file == metadata_file:
+            content = data
+    if installed is not None:
+        _verified_metadata_cache[(dist_path, name, record_stamp)] = (stamps, content)
+    return content
+
+
+def _path_stamps(path):
+
+    # Modification times of the directories on the search path
+    stamps = dict()
+    for path_entry in path:
+        try:
+            stamps[path_entry] = os.stat(path_entry or ".").st_mtime_ns
+        except OSError:
+            stamps[path_entry] = None
+    return stamps
+
+
+class DistributionIndex:
+    """Index of installed distributions and the top-level modules they install.
+
+    The index is built with a single pass over the distribution metadata found
+    on the search path, so that looking up the distribution of a module does not
+    rescan every installed distribution.
+
+    Attributes:
+        path (List[str]):
+            Search path which was indexed.
+    """
+
+    path: List[str]
+
+    _cached: Optional["DistributionIndex"] = None
+
+    def __init__(self, *, path, stamps, distributions):
+        """Private constructor of a DistributionIndex object."""
+        self.path = path
+        self._stamps = stamps
+        self._distributions = distributions
+
+        # Map top-level modules and normalised names to distributions
+        # - the first distribution found on the search path takes precedence
+        self._by_module = dict()
+        self._by_norm_name = dict()
+        for name, info in distributions.items():
+            self._by_norm_name.setdefault(_normalize_name(name), name)
+            for module_name in info["modules"]:
+                self._by_module.setdefault(module_name, name)
+
+    @classmethod
+    def from_path(
+        cls: Type[DistributionIndexType], path: Optional[Sequence[str]] = None
+    ) -> DistributionIndexType:
+        """Index the distributions installed on a search path.
+
+        Args:
+            path (Optional[Sequence[str]]):
+                Search path to index (default: `sys.path`).
+
+        Returns:
+            DistributionIndexType: DistributionIndex instance.
+        """
+        path = list(sys.path if path is None else path)
+
+        # Index distribution names, versions and top-level modules
+        distributions: Dict[str, Dict] = dict()
+        for dist in importlib.metadata.distributions(path=path):
+            name = dist.metadata["Name"]
+            if name is None or name in distributions:
+                continue
+            distributions[name] = {
+                "version": dist.version,
+                "modules": _top_level_modules(dist),
+            }
+
+        # Create instance
+        inst = cls(path=path, stamps=_path_stamps(path), distributions=distributions)
+
+        return inst
+
+    @classmethod
+    def cached(cls: Type[DistributionIndexType]) -> DistributionIndexType:
+        """Return an index of the current search path, built once per run.
+
+        The index is rebuilt only if `sys.path` changes.
+
+        Returns:
+            DistributionIndexType: DistributionIndex instance.
+        """
+        inst = DistributionIndex._cached
+        if not isinstance(inst, cls) or inst.path != sys.path:
+            inst = DistributionIndex._cached = cls.from_path()
+        return inst
+
+    @classmethod
+    def load(
+        cls: Type[DistributionIndexType],
+        cache_file: Union[Path, str],
+        path: Optional[Sequence[str]] = None,
+    ) -> DistributionIndexType:
+        """Load a persisted index, rebuilding it if it is out of date.
+
+        The persisted index is out of date if it was built for a different
+        search path, or if any directory on the search path has since been
+        modified, e.g. by installing or removing a distribution.
+
+        Args:
+            cache_file (Union[Path, str]):
+                Name of file containing the persisted index.
+            path (Optional[Sequence[str]]):
+                Search path to index (default: `sys.path`).
+
+        Returns:
+            DistributionIndexType: DistributionIndex instance.
+        """
+        cache_file = Path(cache_file)
+        path = list(sys.path if path is None else path)
+
+        # Load persisted index if it is up to date
+        try:
+            with cache_file.open("rt", encoding="utf-8") as file:
+                content = json.load(file)
+            if content["path"] == path and content["stamps"] == _path_stamps(path):
+                return cls(
+                    path=path,
+                    stamps=content["stamps"],
+                    distributions=content["distributions"],
+                )
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # Rebuild and persist index
+        inst = cls.from_path(path)
+        inst.save(cache_file)
+
+        return inst
+
+    def save(self, cache_file: Union[Path, str]) -> None:
+        """Persist the index to a file.
+
+        Args:
+            cache_file (Union[Path, str]):
+                Name of file to save to.
+        """
+        cache_file = Path(cache_file)
+
+        # Assemble file content
+        content = {
+            "path": self.path,
+            "stamps": self._stamps,
+            "distributions": self._distributions,
+        }
+
+        # Save to file as JSON
+        with cache_file.open("wt", encoding="utf-8") as file:
+            json.dump(content, file)
+
+    def lookup(self, module_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Find the distribution which installs a module.
+
+        Args:
+            module_name (str):
+                Name of the module.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]:
+                Name and version of the distribution, or `None` if not found.
+        """
+
+        # Find distribution by its top-level module, or else by its name
+        top_module_name = module_name.split(".")[0]
+        name = self._by_module.get(top_module_name)
+        if name is None:
+            name = self._by_norm_name.get(_normalize_name(top_module_name))
+        if name is None:
+            return None, None
+
+        return name, self._distributions[name]["version"]
+
+    def distributions(self) -> Dict[str, str]:
+        """Return the names and versions of the indexed distributions.
+
+        Returns:
+            Dict[str, str]: Versions of the distributions, keyed by their names.
+        """
+        return dict(
+            (name, info["version"]) for name, info in self._distributions.items()
+        )
+
+    def distribution(self, dist_name: str) -> importlib.metadata.Distribution:
+        """Return the metadata of an indexed distribution.
+
+        Args:
+            dist_name (str):
+                Name of the distribution.
+
+        Returns:
+            importlib.metadata.Distribution: Metadata of the distribution.
+
+        Raises:
+            importlib.metadata.PackageNotFoundError:
+                If the distribution is not installed.
+        """
+        name = self._by_norm_name.get(_normalize_name(dist_name))
+        if name is None:
+            raise importlib.metadata.PackageNotFoundError(dist_name)
+
+        # Find distribution by its name, or else by scanning the distributions
+        # - the search by name relies on the metadata directory being named
+        #   after the normalised distribution name
+        for dist in itertools.chain(
+            importlib.metadata.distributions(name=name, path=self.path),
+            importlib.metadata.distributions(path=self.path),
+        ):
+            if dist.metadata["Name"] == name:
+                return dist
+        raise importlib.metadata.PackageNotFoundError(dist_name)
+
+    def top_level_modules(self, dist_name: str) -> List[str]:
+        """Return the public top-level modules installed by a distribution.
+
+        Args:
+            dist_name (str):
+                Name of the distribution.
+
+        Returns:
+            List[str]: Names of the top-level modules.
+
+        Raises:
+            importlib.metadata.PackageNotFoundError:
+                If the distribution is not installed.
+        """
+        name = self._by_norm_name.get(_normalize_name(dist_name))
+        if name is None:
+            raise importlib.metadata.PackageNotFoundError(dist_name)
+        return [m for m in self._distributions[name]["modules"] if m[0] != "_"]
@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Rules suppressing known changes to API entries in a diff."""
+
+import fnmatch
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Type, TypeVar, Union
+
+from .index import _glob_prefix
+
+SuppressionRulesType = TypeVar("SuppressionRulesType", bound="SuppressionRules")
+
+_CHANGES: Tuple[str, ...] = ("-", "+")
+
+
+class _TrieNode:
+
+    __slots__ = ("children", "rules", "regex")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = dict()
+        self.rules: List[int] = []
+        self.regex: Optional[re.Pattern] = None
+
+
+class SuppressionRules:
+    """Rules suppressing known changes to API entries in a diff.
+
+    Each rule is a shell-style wildcard pattern matched against the dotted
+    paths of removed and added API entries, as for `APIDump.query()`. A rule
+    prefixed with `-` or `+` suppresses only removed or only added entries
+    respectively; otherwise it suppresses both. An entry matched by several
+    rules is attributed to the first of them.
+
+    Rules are compiled into a single matcher. Rules without wildcards are looked
+    up in a dictionary. Other rules are stored in a trie keyed on the dotted
+    components of their literal prefix, and the rules at each node are combined
+    into one regular expression alternation; matching a path therefore tries
+    only the nodes along the path, with one regular expression each.
+
+    Attributes:
+        rules (List[str]):
+            Suppression rules, in order.
+    """
+
+    rules: List[str]
+
+    def __init__(self, rules: Iterable[str]):
+        """Compile suppression rules.
+
+        Args:
+            rules (Iterable[str]):
+                Suppression rules.
+
+        Raises:
+            ValueError: If a rule has an empty pattern.
+        """
+
+        self.rules = list(rules)
+
+        # Build a matcher for each of removed (`-`) and added (`+`) entries
+        self._exact: Dict[str, Dict[str, int]] = {c: dict() for c in _CHANGES}
+        self._trie: Dict[str, _TrieNode] = {c: _TrieNode() for c in _CHANGES}
+        patterns = []
+        for index, rule in enumerate(self.rules):
+            changes, pattern = _CHANGES, rule
+            if rule[:1] in _CHANGES:
+                changes, pattern = (rule[0],), rule[1:]
+            if not pattern:
+                msg = f"suppression rule has an empty pattern: {rule!r}"
+                raise ValueError(msg)
+            patterns.append(pattern)
+            prefix = _glob_prefix(pattern)
+            for change in changes:
+                if prefix == pattern:
+
+                    # Store rule without wildcards for exact lookup
+                    self._exact[change].setdefault(pattern, index)
+
+                else:
+
+                    # Store rule at the trie node of the complete components of
+                    # its literal prefix
+                    node = self._trie[change]
+                    for component in prefix.split(".")[:-1]:
+                        node = node.children.setdefault(component, _TrieNode())
+                    node.rules.append(index)
+
+        # Combine the rules at each trie node into one regular expression
+        # - each rule is a named group, so that the group name of a match identifies
+        #   the first matching rule at that node; the groups are named, since the
+        #   translated patterns may contain groups of their own, e.g. for patterns
+        #   with several wildcards on Python 3.10
+        for root in self._trie.values():
+            nodes = [root]
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.children.values())
+                if node.rules:
+                    node.regex = re.compile(
+                        "|".join(
+                            f"(?P<r{i}>{fnmatch.translate(patterns[i])})"
+                            for i in node.rules
+                        )
+                    )
+
+    @classmethod
+    def from_file(
+        cls: Type[SuppressionRulesType], file_path: Union[Path, str]
+    ) -> SuppressionRulesType:
+        """Read suppression rules from a file.
+
+        The file contains one rule per line. Blank lines and lines starting with
+        `#` are ignored.
+
+        Args:
+            file_path (Union[Path, str]):
+                Name of file containing suppression rules.
+
+        Returns:
+            SuppressionRulesType: SuppressionRules instance.
+        """
+        with Path(file_path).open("rt", encoding="utf-8") as file:
+            lines = [line.strip() for line in file]
+        return cls(line for line in lines if line and not line.startswith("#"))
+
+    def match(self, path: str, change: str) -> Optional[int]:
+        """Find the first rule suppressing a change to an API entry.
+
+        Args:
+            path (str):
+                Dotted path of the API entry.
+            change (str):
+                `-` if the entry was removed, `+` if it was added.
+
+        Returns:
+            Optional[int]: Index of the first matching rule, or None.
+        """
+
+        # Look up rules without wildcards
+        first = self._exact[change].get(path)
+
+        # Find the trie nodes along the path
+        nodes = [self._trie[change]]
+        for component in path.split("."):
+            node = nodes[-1].children.get(component)
+            if node is None:
+                break
+            nodes.append(node)
+
+        # Try the rules at each trie node with one regular expression each
+        for node in nodes:
+            if node.regex is not None:
+                m = node.regex.match(path)
+                if m is not None and m.lastgroup is not None:
+                    index = int(m.lastgroup[1:])
+                    if first is None or index < first:
+                        first = index
+
+        return first
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Thread-safe silencing of output and importing of modules."""
+
+import contextlib
+import sys
+import threading
+
+# Lock held while modifying the import system, i.e. `sys.modules`, `sys.path`,
+# and `sys.meta_path`, so that contexts which modify it are entered and exited
+# one at a time; imports themselves are made thread-safe by Python
+import_lock = threading.RLock()
+
+_streams_lock = threading.Lock()
+_streams_users = 0
+_silenced = threading.local()
+
+
+class _ThreadLocalStream:
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def write(self, s):
+
+        # Discard output in threads which are silenced
+        if getattr(_silenced, "depth", 0) > 0:
+            return len(s)
+        return self._stream.write(s)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if getattr(_silenced, "depth", 0) == 0:
+            self._stream.flush()
+
+
+@contextlib.contextmanager
+def silenced_output():
+    """Silence output to `sys.stdout` and `sys.stderr` in the current thread only.
+
+    Unlike `contextlib.redirect_stdout()`, which replaces `sys.stdout` for every
+    thread, the streams are replaced once by proxies which discard output
+    written by silenced threads, and pass on output written by other threads.
+    The original streams are restored when no thread is silenced.
+    """
+    global _streams_users
+
+    # Replace streams with proxies, if not already replaced
+    with _streams_lock:
+        if _streams_users == 0:
+            sys.stdout = _ThreadLocalStream(sys.stdout)  # type: ignore[assignment]
+            sys.stderr = _ThreadLocalStream(sys.stderr)  # type: ignore[assignment]
+        _streams_users += 1
+
+    # Silence this thread
+    _silenced.depth = getattr(_silenced, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _silenced.depth -= 1
+
+        # Restore original streams, unless they have since been replaced
+        with _streams_lock:
+            _streams_users -= 1
+            if _streams_users == 0:
+                for name in ("stdout", "stderr"):
+                    stream = getattr(sys, name)
+                    if isinstance(stream, _ThreadLocalStream):
+                        setattr(sys, name, stream._stream)
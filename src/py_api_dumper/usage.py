@@ -0,0 +1,223 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Dotted names of the APIs used by a consumer codebase."""
+
+import ast
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import FrozenSet, Iterable, List, Optional, Set, Type, TypeVar, Union
+
+UsedNamesType = TypeVar("UsedNamesType", bound="UsedNames")
+
+# Number of files scanned by each task of a worker process
+_FILES_PER_TASK = 64
+
+
+class _NameCollector(ast.NodeVisitor):
+
+    # Collect the dotted names of the APIs referenced by a module
+    # - names bound by imports are resolved to the dotted names they import,
+    #   ignoring scopes, and followed through chains of attributes
+
+    def __init__(self) -> None:
+        self.bindings: dict = dict()
+        self.names: Set[str] = set()
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname is not None:
+                self.bindings[alias.asname] = alias.name
+            else:
+                top_module = alias.name.split(".")[0]
+                self.bindings[top_module] = top_module
+            self.names.add(alias.name)
+
+    def visit_ImportFrom(self, node):
+
+        # Skip relative imports, which are of the consumer's own modules
+        if node.level > 0 or node.module is None:
+            return
+        for alias in node.names:
+            if alias.name == "*":
+                self.names.add(node.module + ".*")
+            else:
+                name = node.module + "." + alias.name
+                self.bindings[alias.asname or alias.name] = name
+                self.names.add(name)
+
+    def visit_Attribute(self, node):
+
+        # Resolve the longest chain of attributes of a name
+        attrs = []
+        value = node
+        while isinstance(value, ast.Attribute):
+            attrs.append(value.attr)
+            value = value.value
+        if isinstance(value, ast.Name):
+            bound = self.bindings.get(value.id)
+            if bound is not None:
+                self.names.add(".".join([bound] + attrs[::-1]))
+        else:
+            self.visit(value)
+
+    def visit_Name(self, node):
+        bound = self.bindings.get(node.id)
+        if bound is not None:
+            self.names.add(bound)
+
+
+def _scan_files(file_paths):
+
+    # Return the dotted names referenced by some Python source files, skipping
+    # files which cannot be parsed
+    names = set()
+    for file_path in file_paths:
+        try:
+            tree = ast.parse(Path(file_path).read_bytes(), filename=str(file_path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        collector = _NameCollector()
+        collector.visit(tree)
+        names.update(collector.names)
+    return names
+
+
+class UsedNames:
+    """Dotted names of the APIs used by a consumer codebase.
+
+    Each name is that of a module, class, function, etc. which the consumer
+    imports or references, e.g. `mymod.MyClass.method`; a name `mymod.*` means
+    all names imported by `from mymod import *`. An API dump restricted to the
+    used names contains the entries of the named classes, functions, etc., with
+    all their members, and of the modules and classes which enclose them; see
+    `APIDump.from_modules()`.
+
+    Attributes:
+        names (FrozenSet[str]):
+            Dotted names of the used APIs.
+    """
+
+    names: FrozenSet[str]
+
+    def __init__(self, names: Iterable[str]):
+        """Dotted names of the APIs used by a consumer codebase.
+
+        Args:
+            names (Iterable[str]):
+                Dotted names of the used APIs.
+        """
+        self.names = frozenset(names)
+
+        # Index used names, names imported by `*`, and the names which enclose them
+        self._exact = set()
+        self._star = set()
+        self._enclosing = set()
+        for name in self.names:
+            if name.endswith(".*"):
+                name = name[:-2]
+                self._star.add(name)
+            else:
+                self._exact.add(name)
+            parts = name.split(".")
+            for i in range(1, len(parts) + 1):
+                self._enclosing.add(".".join(parts[:i]))
+
+    @classmethod
+    def from_paths(
+        cls: Type[UsedNamesType],
+        *paths: Union[Path, str],
+        max_workers: Optional[int] = None,
+    ) -> UsedNamesType:
+        """Statically scan the Python source files of a consumer codebase.
+
+        Source files are parsed, but not imported. Names bound by `import` and
+        `from ... import` statements are resolved to the dotted names they
+        import, and followed through chains of attributes, e.g. `np.linalg.norm`
+        after `import numpy as np` is resolved to `numpy.linalg.norm`. Relative
+        imports are skipped. Files are scanned in parallel worker processes.
+
+        Args:
+            *paths (Union[Path, str]):
+                Python source files, and/or directories to search for them.
+            max_workers (Optional[int]):
+                Maximum number of worker processes (default: number of CPUs).
+                If 1, scan all files in the current process.
+
+        Returns:
+            UsedNamesType: UsedNames instance.
+        """
+
+        # Find Python source files
+        file_paths: List[str] = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                file_paths.extend(sorted(str(p) for p in path.rglob("*.py")))
+            else:
+                file_paths.append(str(path))
+
+        # Scan files, in parallel if there is more than one task
+        tasks = [
+            file_paths[i : i + _FILES_PER_TASK]
+            for i in range(0, len(file_paths), _FILES_PER_TASK)
+        ]
+        names = set()
+        if len(tasks) <= 1 or max_workers == 1:
+            for task in tasks:
+                names.update(_scan_files(task))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers or os.cpu_count() or 1, len(tasks)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                for task_names in executor.map(_scan_files, tasks):
+                    names.update(task_names)
+
+        return cls(names)
+
+    def top_level_modules(self) -> List[str]:
+        """Return the top-level modules of the used names.
+
+        Returns:
+            List[str]: Names of the top-level modules, sorted.
+        """
+        return sorted(set(name.split(".")[0] for name in self.names))
+
+    def _scope(self, path):
+
+        # Return whether a member with a dotted path is used with all of its
+        # members (True), encloses a used name (False), or is not used (None)
+        if path in self._exact or any(path.startswith(s + ".") for s in self._star):
+            return True
+        if path in self._enclosing:
+            return False
+        return None
+
+    def _submodules(self, module_name):
+
+        # Return the names which may be submodules of a module enclosing a used
+        # name, in order of depth, excluding private submodules
+        return sorted(
+            (
+                name
+                for name in self._enclosing
+                if name.startswith(module_name + ".")
+                and not any(m.startswith("_") for m in name.split("."))
+            ),
+            key=lambda name: (name.count("."), name),
+        )
+
+    def _keeps(self, names, kinds):
+
+        # Return whether an API entry, given the names and kinds of its elements,
+        # is in the API restricted to the used names
+        for i in range(len(names)):
+            scope = self._scope(".".join(names[: i + 1]))
+            if scope is None:
+                return False
+            if scope and kinds[i] != "MODULE":
+                return True
+        return True
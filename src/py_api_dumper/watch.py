@@ -0,0 +1,455 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Watch the source files of a module, and compare its API as it changes."""
+
+import ast
+import ctypes
+import ctypes.util
+import importlib.util
+import os
+import select
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from . import APIDiff, APIDump, _entry_module
+from .git import _imported_modules, _module_names
+
+# inotify event masks, from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _walk_dirs(root):
+
+    # Yield a directory and all its subdirectories, excluding caches
+    # - directories may be removed while being walked
+    yield root
+    try:
+        paths = sorted(root.iterdir())
+    except OSError:
+        return
+    for path in paths:
+        if path.is_dir() and path.name != "__pycache__":
+            yield from _walk_dirs(path)
+
+
+def _scan_files(root):
+
+    # Return the modification times and sizes of all Python source files
+    # - `root` is either a directory, which is scanned recursively, or a file
+    if root.is_dir():
+        paths = [
+            path for dir_path in _walk_dirs(root) for path in dir_path.glob("*.py")
+        ]
+    else:
+        paths = [root]
+    stamps = dict()
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        stamps[path] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+class _PollingWatcher:
+
+    def __init__(self, root, interval):
+        self._root = root
+        self._interval = interval
+        self._stamps = _scan_files(root)
+
+    def close(self):
+        pass
+
+    def poll(self, timeout):
+
+        # Rescan files until any have changed, or until `timeout` has elapsed
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._interval
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            time.sleep(wait)
+            stamps = _scan_files(self._root)
+            changed = {
+                path
+                for path in self._stamps.keys() | stamps.keys()
+                if self._stamps.get(path) != stamps.get(path)
+            }
+            self._stamps = stamps
+            if len(changed) > 0 or (
+                deadline is not None and time.monotonic() >= deadline
+            ):
+                return changed
+
+
+class _InotifyWatcher:
+
+    def __init__(self, root, libc):
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:  # pragma: no cover
+            raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+        self._root = root
+        self._dirs = dict()
+
+        # Watch a directory recursively, or a file through its parent directory
+        # - watching the directory also sees files replaced by renaming
+        if root.is_dir():
+            self._file = None
+            for dir_path in _walk_dirs(root):
+                self._add_watch(dir_path)
+        else:
+            self._file = root
+            self._add_watch(root.parent)
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_watch(self, dir_path):
+
+        # Watch a directory for files being written, moved, created or deleted
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _IN_MASK)
+        if wd >= 0:
+            self._dirs[wd] = dir_path
+
+    def poll(self, timeout):
+
+        # Wait for events, or until `timeout` has elapsed
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+
+        # Parse events
+        changed = set()
+        data = os.read(self._fd, 1 << 16)
+        i = 0
+        while i < len(data):
+            wd, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, i)
+            i += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[i : i + name_len].rstrip(b"\0"))
+            i += name_len
+            if mask & _IN_Q_OVERFLOW:  # pragma: no cover
+                # Events were lost; assume every file has changed
+                changed.update(_scan_files(self._root))
+                continue
+            dir_path = self._dirs.get(wd)
+            if dir_path is None or name == "":
+                continue
+            path = dir_path / name
+            if self._file is not None and path != self._file:
+                continue
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    for sub_dir_path in _walk_dirs(path):
+                        self._add_watch(sub_dir_path)
+                        changed.update(sub_dir_path.glob("*.py"))
+            elif path.suffix == ".py":
+                changed.add(path)
+
+        return changed
+
+
+def _load_libc_inotify():
+
+    # Return the C library if it supports inotify, else None
+    if not sys.platform.startswith("linux"):  # pragma: no cover
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+    except (OSError, AttributeError):  # pragma: no cover
+        return None
+    return libc
+
+
+def _is_public(module_name):
+
+    # Return True if a module is public, i.e. is dumped
+    return not any(m.startswith("_") for m in module_name.split("."))
+
+
+def _dump_modules_main(argv):
+
+    # Dump the APIs of the given modules (without their submodules) to a file
+    output, *module_names = argv
+    dump = APIDump(api=set(), modules=dict())
+    for module_name in module_names:
+        module = APIDump._import_module(module_name)
+        dump._api.update(APIDump._dump_module(module))
+    dump.save_to_file(output)
+
+
+class APIWatch:
+    """Watch the source files of a module, and compare its API as it changes.
+
+    The source files of the module and its submodules are watched with inotify
+    where available, or else by polling their modification times. Bursts of
+    changes, e.g. from editors which write many files at once, are debounced.
+    After each change, modules whose source files changed, and modules which
+    import them, are re-imported and re-dumped in a fresh subprocess, so that
+    the current process never imports the watched module.
+
+    Attributes:
+        module_name (str):
+            Name of the watched module.
+        root (Path):
+            Directory (for a package) or file (for a module) being watched.
+        baseline (APIDump):
+            Dump of the API to compare against.
+        current (APIDump):
+            Dump of the current API.
+    """
+
+    module_name: str
+    root: Path
+    baseline: APIDump
+    current: APIDump
+
+    def __init__(
+        self,
+        module_name: str,
+        baseline: Optional[Union[APIDump, Path, str]] = None,
+        *,
+        debounce: float = 0.2,
+        poll_interval: float = 0.5,
+        use_inotify: Optional[bool] = None,
+    ):
+        """Watch the source files of a module, and compare its API as it changes.
+
+        Args:
+            module_name (str):
+                Name of the module to watch.
+            baseline (Optional[Union[APIDump, Path, str]]):
+                Dump, or name of file containing dump, of the API to compare
+                against (default: the API when watching starts).
+            debounce (float):
+                Seconds to wait after a change for any further changes.
+            poll_interval (float):
+                Seconds between checks for changes, if not using inotify.
+            use_inotify (Optional[bool]):
+                Whether to use inotify (default: if available).
+        """
+        self.module_name = module_name
+        self._debounce = debounce
+        self._parsed: Dict[Path, Tuple[Tuple[int, int], ast.Module]] = dict()
+
+        # Find source files of module, without importing it
+        spec = importlib.util.find_spec(module_name)
+        if spec is None or spec.origin is None or not spec.has_location:
+            msg = f"cannot find source files of module {module_name}"
+            raise ValueError(msg)
+        self._package: Optional[str]
+        if spec.submodule_search_locations:
+            self.root = Path(spec.submodule_search_locations[0])
+            self._package = module_name
+        else:
+            self.root = Path(spec.origin)
+            self._package = None
+        self._find_modules()
+
+        # Choose how to watch source files
+        # - for a module which is not a package, only its file is watched
+        libc = _load_libc_inotify() if use_inotify is not False else None
+        if libc is not None:
+            self._watcher: Union[_InotifyWatcher, _PollingWatcher] = _InotifyWatcher(
+                self.root, libc
+            )
+        elif use_inotify:
+            msg = "inotify is not available"
+            raise ValueError(msg)
+        else:
+            self._watcher = _PollingWatcher(self.root, poll_interval)
+
+        # Dump current API, and load baseline API
+        self.current = self._dump_in_subprocess(self._public_modules())
+        if baseline is None:
+            self.baseline = self.current
+        elif isinstance(baseline, APIDump):
+            self.baseline = baseline
+        else:
+            self.baseline = APIDump.load_from_file(baseline)
+
+    def close(self) -> None:
+        """Stop watching source files."""
+        self._watcher.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _find_modules(self):
+
+        # Map module names to source files, and find the modules each imports
+        if self._package is not None:
+            files = {
+                path.relative_to(self.root).as_posix(): None
+                for dir_path in _walk_dirs(self.root)
+                for path in dir_path.glob("*.py")
+            }
+            self._modules = {
+                name: (self.root / path, is_package)
+                for name, (path, is_package) in _module_names(
+                    files, self._package
+                ).items()
+            }
+        else:
+            self._modules = {self.module_name: (self.root, False)}
+        self._imports = dict()
+        for name, (path, is_package) in self._modules.items():
+
+            # Parse source file, unless unchanged since last parsed
+            # - if the file cannot be parsed, keep its imports from the last parse;
+            #   the error is reported when the module is dumped
+            stat = path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            parsed = self._parsed.get(path)
+            if parsed is None or parsed[0] != stamp:
+                try:
+                    tree = ast.parse(path.read_bytes())
+                except SyntaxError:
+                    tree = parsed[1] if parsed is not None else ast.Module([], [])
+                parsed = self._parsed[path] = (stamp, tree)
+
+            self._imports[name] = _imported_modules(
+                parsed[1], name, is_package, self._modules
+            )
+
+    def _public_modules(self):
+
+        # Return the names of public modules, in sorted order
+        return sorted(name for name in self._modules if _is_public(name))
+
+    def _dump_in_subprocess(self, module_names):
+
+        # Dump the APIs of modules in a fresh subprocess, using the same search path
+        with tempfile.TemporaryDirectory(prefix="py-api-dumper-") as tmp_dir:
+            output = Path(tmp_dir) / "dump.json"
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+            result = subprocess.run(
+                [sys.executable, "-m", __name__, str(output), *module_names],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            if result.returncode != 0:
+                msg = f"failed to dump modules:\n{result.stderr}"
+                raise RuntimeError(msg)
+            dump = APIDump.load_from_file(output)
+        dump.dump_file = self.root
+        return dump
+
+    def changed_files(self) -> Iterator[Set[Path]]:
+        """Wait for source files to change, and yield the changed files.
+
+        Yields:
+            Set[Path]: Changed source files, once no further changes have been
+            made for the debounce time.
+        """
+        while True:
+            changed = self._watcher.poll(None)
+            while len(changed) > 0:
+                more = self._watcher.poll(self._debounce)
+                if len(more) == 0:
+                    break
+                changed |= more
+            if len(changed) > 0:
+                yield changed
+
+    def update(self, changed_files: Set[Path]) -> Tuple[List[str], APIDiff]:
+        """Re-dump modules affected by changed source files.
+
+        Args:
+            changed_files (Set[Path]):
+                Changed source files.
+
+        Returns:
+            Tuple[List[str], APIDiff]:
+                Names of affected modules, and differences between their APIs in
+                the baseline and current dumps. If no public module is
+                affected, nothing is re-dumped, and the names are empty.
+
+        Raises:
+            RuntimeError: If the affected modules cannot be dumped, e.g. if
+                they fail to import. The current dump is not updated.
+        """
+
+        # Find changed modules, including any added or removed
+        old_modules = self._modules
+        self._find_modules()
+        changed_files = {Path(f).resolve() for f in changed_files}
+        affected = {
+            name
+            for modules in (old_modules, self._modules)
+            for name, (path, _) in modules.items()
+            if path.resolve() in changed_files
+        }
+
+        # Add modules which import affected modules, directly or indirectly
+        pending = list(affected)
+        while len(pending) > 0:
+            name = pending.pop()
+            for importer, imports in self._imports.items():
+                if name in imports and importer not in affected:
+                    affected.add(importer)
+                    pending.append(importer)
+
+        # Nothing to re-dump if only private modules are affected
+        if not any(_is_public(name) for name in affected):
+            empty = APIDump(
+                dump_file=self.root, modules=self.current.modules, api=set()
+            )
+            return [], APIDiff(empty, empty)
+
+        # Re-dump affected modules which still exist
+        dumped = self._dump_in_subprocess(
+            [m for m in self._public_modules() if m in affected]
+        )
+
+        # Replace entries of affected modules in the current dump
+        api = {e for e in self.current._api if _entry_module(e) not in affected}
+        api.update(dumped._api)
+        self.current = APIDump(
+            dump_file=self.root, modules=self.current.modules, api=api
+        )
+
+        # Compare APIs of affected modules only
+        old, new = (
+            APIDump(
+                dump_file=dump.dump_file,
+                modules=dump.modules,
+                api={e for e in dump._api if _entry_module(e) in affected},
+            )
+            for dump in (self.baseline, self.current)
+        )
+
+        return sorted(affected), APIDiff(old, new)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _dump_modules_main(sys.argv[1:])
@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Import modules from wheel files without installing them."""
+
+import hashlib
+import importlib
+import importlib.metadata
+import shutil
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .metadata import DistributionIndex
+from .threadsafe import import_lock
+
+_EXTENSION_SUFFIXES = (".so", ".pyd")
+
+
+def _file_digest(file_path):
+
+    # Return the SHA-256 digest of a file
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_cached(wheel_file, cache_dir):
+
+    # Extract wheel into a cache directory keyed by the hash of its contents
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    extract_dir = cache_dir / f"{wheel_file.stem}-{_file_digest(wheel_file)[:32]}"
+    if not extract_dir.is_dir():
+
+        # Extract to a temporary directory first, so that the cache only ever
+        # contains complete extractions, even if several processes race
+        tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".extract-"))
+        with zipfile.ZipFile(wheel_file) as wheel:
+            wheel.extractall(tmp_dir)
+        try:
+            tmp_dir.rename(extract_dir)
+        except OSError:  # pragma: no cover
+            shutil.rmtree(tmp_dir)
+
+    return extract_dir
+
+
+class WheelImporter:
+    """Import modules from a wheel file without installing it.
+
+    While active, the contents of the wheel are placed first on `sys.path`, and
+    any already-imported modules of the same names are hidden. Pure-Python wheels
+    are imported directly from the archive using `zipimport`. Wheels containing
+    extension modules are extracted, either to a cache directory where they are
+    keyed by the hash of the wheel and reused, or else to a temporary directory.
+    The import system is changed for the whole process, so other threads also
+    import modules from the wheel while it is active.
+
+    Attributes:
+        wheel_file (Path):
+            Wheel file.
+        path (Optional[Path]):
+            Path from which modules in the wheel are imported, while active.
+        distribution (Optional[str]):
+            Name of the distribution in the wheel, while active.
+        version (Optional[str]):
+            Version of the distribution in the wheel, while active.
+        modules (List[str]):
+            Public top-level modules installed by the wheel, while active.
+        dist_index (Optional[DistributionIndex]):
+            Index of the distribution in the wheel, while active.
+    """
+
+    wheel_file: Path
+    path: Optional[Path]
+    distribution: Optional[str]
+    version: Optional[str]
+    modules: List[str]
+    dist_index: Optional[DistributionIndex]
+
+    def __init__(
+        self,
+        wheel_file: Union[Path, str],
+        cache_dir: Optional[Union[Path, str]] = None,
+    ):
+        """Import modules from a wheel file without installing it.
+
+        Args:
+            wheel_file (Union[Path, str]):
+                Wheel file.
+            cache_dir (Optional[Union[Path, str]]):
+                Directory in which to cache extracted wheels (default: extract to
+                a temporary directory).
+        """
+        self.wheel_file = Path(wheel_file)
+        self._cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.path = None
+        self.distribution = None
+        self.version = None
+        self.modules = []
+        self.dist_index = None
+        self._tmp_dir = None
+
+    def __enter__(self):
+
+        # Read distribution metadata and file names from wheel
+        with zipfile.ZipFile(self.wheel_file) as wheel:
+            names = wheel.namelist()
+            dist_info = [n for n in names if n.endswith(".dist-info/METADATA")]
+            if len(dist_info) != 1:
+                msg = f"{self.wheel_file} is not a wheel file"
+                raise ValueError(msg)
+            dist = importlib.metadata.PathDistribution(
+                zipfile.Path(wheel, at=dist_info[0][: -len("METADATA")])
+            )
+            self.distribution = dist.metadata["Name"]
+            self.version = dist.version
+
+        # Choose path from which to import modules in wheel
+        if not any(n.endswith(_EXTENSION_SUFFIXES) for n in names):
+            self.path = self.wheel_file.resolve()
+        elif self._cache_dir is not None:
+            self.path = _extract_cached(self.wheel_file.resolve(), self._cache_dir)
+        else:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="py-api-dumper-")
+            self.path = Path(self._tmp_dir.name)
+            with zipfile.ZipFile(self.wheel_file) as wheel:
+                wheel.extractall(self.path)
+
+        # Index distribution in wheel
+        self.dist_index = DistributionIndex.from_path([str(self.path)])
+        self.modules = self.dist_index.top_level_modules(self.distribution)
+
+        # Hide already-imported modules of the same names as those in the wheel,
+        # and import modules from wheel first, holding the lock on the import
+        # system while modifying it
+        with import_lock:
+            self._saved_path = list(sys.path)
+            self._saved_modules = {
+                name: sys.modules.pop(name)
+                for name in list(sys.modules)
+                if self._in_wheel(name)
+            }
+            sys.path.insert(0, str(self.path))
+            importlib.invalidate_caches()
+
+        return self
+
+    def __exit__(self, *args):
+
+        # Remove modules imported from wheel, and restore hidden modules
+        with import_lock:
+            for name in list(sys.modules):
+                if self._in_wheel(name):
+                    del sys.modules[name]
+            sys.modules.update(self._saved_modules)
+            sys.path[:] = self._saved_path
+            importlib.invalidate_caches()
+
+        # Remove temporary extraction of wheel
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    def _in_wheel(self, module_name):
+
+        # Return whether a module has the same top-level module as one in the wheel
+        assert self.dist_index is not None
+        return self.dist_index.lookup(module_name)[0] == self.distribution
@@ -31,3 +31,6 @@ def pytest_sessionstart(session):
         cwd=Path(__file__).parent,
     )
     sys.stdout.flush()
+
+
+pytest_plugins = ["pytester"]
@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test finding where API entries changed in a series of API dumps."""
+
+import json
+
+import pytest
+
+import py_api_dumper
+from py_api_dumper import APIDiff, APIDump
+from py_api_dumper.cli import cli
+
+
+def _release(i):
+    """Return the API of release `i`, in which `m.foo` loses its argument `x`."""
+    api = {(("MODULE", "a"),), (("MODULE", "a"), ("MEMBER", f"v{i}", "int"))}
+    api |= {(("MODULE", "z"),), (("MODULE", "z"), ("MEMBER", f"v{i}", "int"))}
+    api |= {(("MODULE", "m"),), (("MODULE", "m"), ("MEMBER", f"v{i}", "int"))}
+    foo = (("MODULE", "m"), ("FUNCTION", "foo", "no-return-type"))
+    api.add(foo)
+    api.add(foo + (("REQUIRED", 0, "y", "int"),))
+    if i < 23:
+        api.add(foo + (("OPTIONAL", "x", "int"),))
+    if 11 <= i < 47:
+        api.add((("MODULE", "m"), ("FUNCTION", "bar", "no-return-type")))
+    return APIDump(modules={"m": {"version": f"1.{i}"}}, api=api)
+
+
+@pytest.fixture
+def dump_files(tmp_path):
+    """Save API dumps of a series of 60 releases."""
+    dump_files = []
+    for i in range(60):
+        dump_files.append(tmp_path / f"m-1.{i}.json.gz")
+        _release(i).save_to_file(dump_files[-1])
+    return dump_files
+
+
+def test_bisect(dump_files, monkeypatch):
+    """Test finding the release where API entries changed."""
+    parsed = []
+    entry_as_tuple = py_api_dumper._entry_as_tuple
+    monkeypatch.setattr(
+        py_api_dumper,
+        "_entry_as_tuple",
+        lambda entry: parsed.append(entry) or entry_as_tuple(entry),
+    )
+    result = APIDiff.bisect(dump_files, "m.foo*")
+    assert result["index"] == 23
+    assert result["old_dump"] == dump_files[22]
+    assert result["new_dump"] == dump_files[23]
+    assert result["change"] == "changed"
+    assert result["loaded"] <= 8
+    assert result["diff"].removed == {
+        (
+            ("MODULE", "m"),
+            ("FUNCTION", "foo", "no-return-type"),
+            ("OPTIONAL", "x", "int"),
+        )
+    }
+    assert result["diff"].added == set()
+    assert result["diff"].old_modules == {"m": {"version": "1.22"}}
+
+    # Only entries in module `m` are parsed
+    assert 0 < len(parsed) <= result["loaded"] * 6
+    assert all(entry[0] == ["MODULE", "m"] for entry in parsed)
+
+    # Entries which were added and removed
+    assert APIDiff.bisect(dump_files, "m.bar") is None
+    result = APIDiff.bisect(dump_files[:40], "m.bar", kinds=["FUNCTION"])
+    assert (result["index"], result["change"]) == (11, "added")
+    result = APIDiff.bisect(dump_files[11:], "m.bar")
+    assert (result["index"], result["change"]) == (47 - 11, "removed")
+    result = APIDiff.bisect(dump_files, "m.foo", kinds=["MEMBER"])
+    assert result is None
+    assert APIDiff.bisect(dump_files, "m.foo.y") is None
+    with pytest.raises(ValueError, match="at least two"):
+        APIDiff.bisect(dump_files[:1], "m.foo")
+
+
+def test_bisect_formats(dump_files, tmp_path):
+    """Test finding where API entries changed in dumps of all formats."""
+
+    # Dumps saved as deltas, as single JSON documents, and unsorted
+    series = list(dump_files[:20])
+    series.append(tmp_path / "delta.json")
+    _release(20).save_to_file(series[-1], base=series[19])
+    series.append(tmp_path / "document.json")
+    dump = _release(30)
+    content = {"modules": dump.modules, "api": sorted(dump.api)}
+    series[-1].write_text(json.dumps(content, indent=2))
+    series.append(tmp_path / "unsorted.json")
+    with APIDump._open_dump_file(series[-1], "wt") as file:
+        py_api_dumper._save_dump_content(
+            file, {"modules": dump.modules, "api": list(dump.api)}
+        )
+    for i, dump_file in enumerate(series[19:]):
+        result = APIDiff.bisect([series[0], dump_file], "m.foo*")
+        assert (result is None) == (i < 2)
+
+    # Patterns which do not name a top-level module
+    result = APIDiff.bisect(series, "*.foo.x")
+    assert (result["index"], result["change"]) == (21, "removed")
+
+
+def test_bisect_cli(dump_files, capsys):
+    """Test finding where API entries changed using the command-line interface."""
+    assert cli("bisect", "--entry", "m.foo*", *dump_files) == 0
+    out, err = capsys.readouterr()
+    assert err.startswith(
+        f"m.foo*: changed in {dump_files[23]} (after {dump_files[22]}); loaded "
+    )
+    assert err.endswith(" of 60 API dumps\n")
+    assert out.splitlines()[2:] == [
+        "-MODULE : m",
+        "-\tFUNCTION : foo : no-return-type",
+        "-\t\tOPTIONAL : x : int",
+    ]
+    assert cli("bisect", "-e", "m.foo", "-k", "MEMBER", *dump_files) == 1
+    out, err = capsys.readouterr()
+    assert err == "m.foo: unchanged in 60 API dumps\n"
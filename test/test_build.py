@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test building wheels which embed an API manifest."""
+
+import csv
+import importlib.metadata
+import io
+import shutil
+import sys
+import zipfile
+
+import pytest
+from setuptools import build_meta
+
+import py_api_dumper.metadata
+from py_api_dumper import APIDump, DistributionIndex, UsedNames, build
+from py_api_dumper.cli import cli
+from py_api_dumper.metadata import API_MANIFEST, _record_digest
+
+_PYPROJECT = """
+[build-system]
+requires = ["setuptools>=64.0", "py-api-dumper"]
+build-backend = "py_api_dumper.build"
+
+[project]
+name = "bld-dist"
+version = "1.3"
+
+[tool.setuptools]
+packages = ["bld_mod"]
+"""
+
+
+@pytest.fixture(scope="module")
+def built_wheel(tmp_path_factory):
+    """Build a wheel of distribution `bld-dist` with the build backend."""
+    project_dir = tmp_path_factory.mktemp("project")
+    (project_dir / "pyproject.toml").write_text(_PYPROJECT)
+    (project_dir / "bld_mod").mkdir()
+    (project_dir / "bld_mod" / "__init__.py").write_text("def f(a, b=1): pass\n")
+    (project_dir / "bld_mod" / "sub.py").write_text("class C:\n    x = 1\n")
+    wheel_dir = tmp_path_factory.mktemp("wheels")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(project_dir)
+        wheel_name = build.build_wheel(str(wheel_dir))
+    return wheel_dir / wheel_name
+
+
+@pytest.fixture
+def site_dir(built_wheel, tmp_path, monkeypatch):
+    """Install the built wheel by extracting it to a site directory."""
+    site_dir = tmp_path / "site"
+    with zipfile.ZipFile(built_wheel) as wheel:
+        wheel.extractall(site_dir)
+    yield site_dir
+    for name in list(sys.modules):
+        if name.partition(".")[0] == "bld_mod":
+            del sys.modules[name]
+
+
+def test_build_wheel(built_wheel):
+    """Test that built wheels embed an API manifest listed in their RECORD."""
+    with zipfile.ZipFile(built_wheel) as wheel:
+        manifest_name = f"bld_dist-1.3.dist-info/{API_MANIFEST}"
+        data = wheel.read(manifest_name)
+        record = wheel.read("bld_dist-1.3.dist-info/RECORD").decode()
+    rows = {row[0]: row[1:] for row in csv.reader(io.StringIO(record))}
+    assert rows[manifest_name] == [f"sha256={_record_digest(data)}", str(len(data))]
+    assert len(rows) == len(record.splitlines())
+
+    # Manifest has the API of the wheel's modules, and does not change if the
+    # wheel is rebuilt or its manifest is embedded again
+    manifest = APIDump.from_wheel(built_wheel)
+    assert manifest == APIDump.from_wheel(built_wheel, use_manifests=False)
+    assert manifest.modules["bld_mod"]["version"] == "1.3"
+    assert len(manifest.query("bld_mod.sub.C.x")) == 1
+    build.embed_manifest(built_wheel)
+    with zipfile.ZipFile(built_wheel) as wheel:
+        assert wheel.read(manifest_name) == data
+        assert wheel.read("bld_dist-1.3.dist-info/RECORD").decode() == record
+
+    # Other hooks are those of setuptools
+    assert build.build_sdist is build_meta.build_sdist
+    assert build.get_requires_for_build_wheel is build_meta.get_requires_for_build_wheel
+
+
+def test_build_from_manifest(built_wheel, site_dir, monkeypatch):
+    """Test reading the API of an installed distribution from its manifest."""
+    dist_index = DistributionIndex.from_path([str(site_dir)])
+    manifest = APIDump.from_manifest("bld-dist", dist_index)
+    assert manifest == APIDump.from_wheel(built_wheel, use_manifests=False)
+    assert manifest.modules["bld_mod"]["path"] == str(
+        site_dir / "bld_mod" / "__init__.py"
+    )
+
+    # Modules are read from the manifest without importing them, even though
+    # they are not on the search path
+    api_dump = APIDump.from_modules("bld_mod", dist_index=dist_index)
+    assert "bld_mod" not in sys.modules
+    assert api_dump == manifest
+    assert api_dump.modules == manifest.modules
+
+    # Installed files are hashed again only if they, or the RECORD, change
+    hashed = []
+    record_digest = _record_digest
+    monkeypatch.setattr(
+        py_api_dumper.metadata,
+        "_record_digest",
+        lambda *args: hashed.append(args) or record_digest(*args),
+    )
+    assert APIDump.from_manifest("bld-dist", dist_index) == manifest
+    assert hashed == []
+
+    # Modules are imported if the installed files do not match the RECORD
+    monkeypatch.syspath_prepend(str(site_dir))
+    (site_dir / "bld_mod" / "sub.py").write_text("class C:\n    y = 1\n")
+    assert APIDump.from_manifest("bld-dist", dist_index) is None
+    api_dump = APIDump.from_modules("bld_mod", dist_index=dist_index)
+    assert "bld_mod" in sys.modules
+    assert len(api_dump.query("bld_mod.sub.C.y")) == 1
+    (site_dir / "bld_mod" / "sub.py").unlink()
+    assert APIDump.from_manifest("bld-dist", dist_index) is None
+
+    # Distributions without a manifest, or not installed
+    dist_info = site_dir / "bld_dist-1.3.dist-info"
+    (dist_info / API_MANIFEST).unlink()
+    record = (dist_info / "RECORD").read_text().splitlines()
+    (dist_info / "RECORD").write_text(
+        "\n".join(line for line in record if not line.startswith("bld_mod/sub.py"))
+    )
+    assert APIDump.from_manifest("bld-dist", dist_index) is None
+    assert hashed != []
+    with pytest.raises(importlib.metadata.PackageNotFoundError):
+        APIDump.from_manifest("not-bld-dist", dist_index)
+    shutil.rmtree(dist_info)
+    with pytest.raises(importlib.metadata.PackageNotFoundError):
+        APIDump.from_manifest("bld-dist", dist_index)
+
+
+def test_build_used_names(built_wheel, site_dir, monkeypatch):
+    """Test restricting the API read from a manifest to used names."""
+    dist_index = DistributionIndex.from_path([str(site_dir)])
+    for names in (["bld_mod.sub.C"], ["bld_mod.f", "bld_mod.sub"], ["bld_mod.x"]):
+        used_names = UsedNames(names)
+        api_dump = APIDump.from_modules(
+            "bld_mod", dist_index=dist_index, used_names=used_names
+        )
+        assert "bld_mod" not in sys.modules
+        monkeypatch.syspath_prepend(str(site_dir))
+        assert api_dump == APIDump.from_modules(
+            "bld_mod",
+            dist_index=dist_index,
+            use_manifests=False,
+            used_names=used_names,
+        )
+        del sys.modules["bld_mod"]
+        sys.modules.pop("bld_mod.sub", None)
+
+
+def test_build_compact_tables(built_wheel, site_dir, monkeypatch):
+    """Test compacting tables of members of the API read from a manifest."""
+    dist_index = DistributionIndex.from_path([str(site_dir)])
+    api_dump = APIDump.from_modules("bld_mod", dist_index=dist_index, compact_tables=1)
+    assert "bld_mod" not in sys.modules
+    (entry,) = api_dump.query("bld_mod.sub.C.int")
+    assert entry[-1][:3] == ("MEMBERS", "int", 1)
+    monkeypatch.syspath_prepend(str(site_dir))
+    imported = APIDump.from_modules(
+        "bld_mod", dist_index=dist_index, use_manifests=False, compact_tables=1
+    )
+    assert api_dump == imported
+    assert api_dump.tables == imported.tables
+
+
+def test_build_cli(built_wheel, site_dir, tmp_path, monkeypatch):
+    """Test dumping a distribution with a manifest using the command-line interface."""
+    monkeypatch.syspath_prepend(str(site_dir))
+    api_dump_file = tmp_path / "dump.json"
+    cli("dump", "--dist", "bld-dist", "-o", api_dump_file)
+    assert "bld_mod" not in sys.modules
+    manifest = APIDump.from_manifest("bld-dist")
+    assert APIDump.load_from_file(api_dump_file) == manifest
+    cli("dump", "--no-manifests", "--dist", "bld-dist", "-o", api_dump_file)
+    assert "bld_mod" in sys.modules
+    assert APIDump.load_from_file(api_dump_file) == manifest
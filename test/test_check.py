@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test checking APIs against a baseline."""
+
+import importlib
+import sys
+import types
+import zipfile
+
+import pytest
+
+import py_api_dumper
+from py_api_dumper import APIDump, _module_digest
+from py_api_dumper.cli import cli
+
+
+@pytest.fixture
+def checked_pkg(tmp_path, monkeypatch):
+    """Create modules to check, and a baseline dump of their APIs."""
+    pkg_dir = tmp_path / "cpkg"
+    pkg_dir.mkdir()
+    for name, content in (
+        ("__init__.py", "def f(a):\n    pass\n"),
+        ("a.py", "def g():\n    pass\n"),
+        ("b.py", "class B:\n    x = 1\n"),
+    ):
+        (pkg_dir / name).write_text(content)
+    (tmp_path / "csingle.py").write_text("def s(x):\n    pass\n")
+    monkeypatch.syspath_prepend(tmp_path)
+    monkeypatch.setattr(sys, "modules", dict(sys.modules))
+    baseline_file = tmp_path / "baseline.json"
+    cli("dump", "--digests", "-o", baseline_file, "cpkg", "csingle")
+    _unimport()
+    return pkg_dir, baseline_file
+
+
+def _unimport():
+
+    # Remove imported test modules, so that they are imported again
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("cpkg", "csingle"):
+            del sys.modules[name]
+    importlib.invalidate_caches()
+
+
+def test_check_unchanged(checked_pkg, monkeypatch):
+    """Test checking unchanged modules, which are skipped by digest."""
+    pkg_dir, baseline_file = checked_pkg
+    baseline = APIDump.load_from_file(baseline_file)
+    assert baseline.modules["cpkg"]["digest"] == _module_digest("cpkg.a")
+    assert baseline.modules["csingle"]["digest"] == _module_digest("csingle")
+
+    def import_module(module_name):
+        raise AssertionError(module_name)
+
+    with monkeypatch.context() as m:
+        m.setattr(APIDump, "_import_module", import_module)
+        assert APIDump.matches(baseline_file)
+        assert APIDump.check(baseline, "cpkg", max_differences=None) == []
+
+    # Modules are walked if the baseline has no digests, as by default
+    baseline = APIDump.from_modules("cpkg", "csingle")
+    assert all("digest" not in info for info in baseline.modules.values())
+    _unimport()
+    assert APIDump.check(baseline, max_differences=None) == []
+    _unimport()
+    assert APIDump.matches(baseline, importlib.import_module("cpkg"), "cpkg.a")
+
+
+def test_check_changed(checked_pkg):
+    """Test checking changed modules, stopping at the first difference."""
+    pkg_dir, baseline_file = checked_pkg
+    (pkg_dir / "a.py").write_text("def g():\n    pass\ndef h():\n    pass\n")
+    (pkg_dir / "b.py").write_text("class B:\n    y = 1\n")
+
+    # Walking stops at the first difference, before importing `cpkg.b`
+    differences = APIDump.check(baseline_file)
+    assert differences == [
+        (
+            "+",
+            (("MODULE", "cpkg"), ("MODULE", "a"), ("FUNCTION", "h", "no-return-type")),
+        )
+    ]
+    assert "cpkg.b" not in sys.modules
+    _unimport()
+    assert not APIDump.matches(baseline_file, "cpkg")
+    _unimport()
+
+    # Find all differences
+    differences = APIDump.check(baseline_file, max_differences=None)
+    assert [(p, e[-1][:2]) for p, e in differences] == [
+        ("+", ("FUNCTION", "h")),
+        ("+", ("MEMBER", "y")),
+        ("-", ("MEMBER", "x")),
+    ]
+
+
+def test_check_removed(checked_pkg):
+    """Test checking modules which have been removed."""
+    pkg_dir, baseline_file = checked_pkg
+    (pkg_dir / "b.py").unlink()
+    differences = APIDump.check(baseline_file, "cpkg", "cpkg.a", max_differences=None)
+    assert differences[0] == ("-", (("MODULE", "cpkg"), ("MODULE", "b")))
+    assert all(p == "-" and e[1] == ("MODULE", "b") for p, e in differences)
+    assert ("-", ("MEMBER", "x")) in [(p, e[-1][:2]) for p, e in differences]
+    _unimport()
+    differences = APIDump.check(baseline_file, "cpkg", max_differences=2)
+    assert len(differences) == 2
+
+
+def test_module_digest(tmp_path, monkeypatch):
+    """Test digests of module source files, and of those which cannot be found."""
+    (tmp_path / "dsingle.py").write_text("X = 1\n")
+    monkeypatch.syspath_prepend(tmp_path)
+    digest = _module_digest("dsingle")
+    monkeypatch.setattr(py_api_dumper, "__version__", "0.0.0")
+    other_digest = _module_digest("dsingle")
+    assert other_digest != digest
+    monkeypatch.setattr(sys, "version_info", (3, 0, 0, "final", 0))
+    assert _module_digest("dsingle") not in (digest, other_digest)
+    assert _module_digest("not_a_module") is None
+    assert _module_digest("sys") is None
+    monkeypatch.setitem(sys.modules, "nospec_mod", types.ModuleType("nospec_mod"))
+    assert _module_digest("nospec_mod") is None
+    zip_file = tmp_path / "modules.zip"
+    with zipfile.ZipFile(zip_file, "w") as zf:
+        zf.writestr("zpkg/__init__.py", "")
+        zf.writestr("zsingle.py", "")
+    monkeypatch.syspath_prepend(zip_file)
+    assert _module_digest("zpkg") is None
+    assert _module_digest("zsingle") is None
+
+
+def test_check_cli(checked_pkg, capsys):
+    """Test checking APIs using the command-line interface."""
+    pkg_dir, baseline_file = checked_pkg
+    assert cli("check", baseline_file) == 0
+    assert capsys.readouterr().out == ""
+    (pkg_dir / "b.py").write_text("class B:\n    y = 1\n")
+    assert cli("check", baseline_file, "cpkg") == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[-1] == "+\t\t\tMEMBER : y : int"
+    assert "stopped after 1 difference" in captured.err
+    _unimport()
+    assert cli("check", "-n", "0", baseline_file, "cpkg") == 1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[0] == "-MODULE : cpkg"
+    assert captured.err == ""
+    assert cli("check", baseline_file.with_name("missing.json")) == 2
+    assert cli("check", baseline_file, "not_a_module") == 2
+    assert "error:" in capsys.readouterr().err
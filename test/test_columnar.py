@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test the columnar engine for API diffs."""
+
+import json
+
+import api_ref
+import numpy as np
+import pytest
+
+from py_api_dumper import APIDiff, APIDump, _load_dump_content, columnar
+from py_api_dumper.cli import cli
+
+
+def _entry(i, v=0):
+    return (
+        ("MODULE", "m"),
+        ("CLASS", f"C{i // 10}"),
+        ("FUNCTION", f"f{i}"),
+        ("REQUIRED", 0, "x", f"t{v}"),
+    )
+
+
+@pytest.fixture
+def dump_files(tmp_path):
+    """Write dumps of an old and new API to files."""
+    old = APIDump(
+        modules={"m": {"version": "1.0"}},
+        api={_entry(i) for i in range(100)} | {(("MODULE", "m"),)},
+    )
+    new = APIDump(
+        modules={"m": {"version": "2.0"}},
+        api={_entry(i, int(i % 7 == 0)) for i in range(3, 105)} | {(("MODULE", "m"),)},
+    )
+    old.save_to_file(tmp_path / "old.json")
+    new.save_to_file(tmp_path / "new.json")
+    return tmp_path / "old.json", tmp_path / "new.json"
+
+
+def _check_parity(old_dump_file, new_dump_file, **kwargs):
+    """Check that API diffs using the Python and NumPy engines are equal."""
+    python = APIDiff.from_files(old_dump_file, new_dump_file, engine="python", **kwargs)
+    numpy = APIDiff.from_files(old_dump_file, new_dump_file, engine="numpy", **kwargs)
+    for key in ("old_dump_file", "old_modules", "new_dump_file", "new_modules"):
+        assert getattr(python, key) == getattr(numpy, key)
+    for key in ("removed", "added", "moved", "renamed"):
+        assert getattr(python, key) == getattr(numpy, key)
+    return numpy
+
+
+def test_columnar_parity(dump_files, tmp_path, monkeypatch):
+    """Test that the columnar engine finds the same differences as Python."""
+    api_diff = _check_parity(*dump_files)
+    assert len(api_diff.removed) == 3 + 14 and len(api_diff.added) == 14 + 5
+    _check_parity(*dump_files, detect_moves=True)
+    _check_parity(*reversed(dump_files))
+    _check_parity(dump_files[0], dump_files[0])
+
+    # Dumps of real modules, and empty dumps
+    APIDump.from_modules(api_ref).save_to_file(tmp_path / "api_ref.json")
+    monkeypatch.setattr(api_ref, "new1", 42, raising=False)
+    APIDump.from_modules(api_ref).save_to_file(tmp_path / "api_ref_new.json")
+    assert _check_parity(tmp_path / "api_ref.json", tmp_path / "api_ref_new.json").added
+    APIDump(modules={}, api=set()).save_to_file(tmp_path / "empty.json")
+    _check_parity(tmp_path / "empty.json", tmp_path / "empty.json")
+    _check_parity(tmp_path / "empty.json", dump_files[1])
+
+    # Dumps saved as a single JSON document by previous versions
+    content = _load_dump_content(dump_files[0])
+    (tmp_path / "single.json").write_text(json.dumps(content))
+    _check_parity(tmp_path / "single.json", dump_files[1])
+    assert not _check_parity(tmp_path / "single.json", dump_files[0]).removed
+
+
+@pytest.mark.parametrize("buckets", [1, 2, 64])
+def test_columnar_collisions(dump_files, monkeypatch, buckets):
+    """Test that the columnar engine resolves colliding keys exactly."""
+    line_keys = columnar._line_keys
+    monkeypatch.setattr(
+        columnar,
+        "_line_keys",
+        lambda *args: line_keys(*args) % np.uint64(buckets),
+    )
+    _check_parity(*dump_files)
+    assert columnar.differences(['"a"\n', '"b"\n'], []) == ([0, 1], [])
+    assert columnar.differences(['"a"\n'], ['"b"\n']) == ([0], [0])
+    assert columnar.differences(['"a"\n'], ['"a"']) == ([], [])
+
+
+def test_columnar_lines(dump_files, monkeypatch):
+    """Test comparing lines in runs of bytes, and lines of different lengths."""
+    monkeypatch.setattr(columnar, "_CHUNK_BYTES", 64)
+    _check_parity(*dump_files)
+    assert columnar.differences(['"a"\n', '"ab"\n'], ['"ab"\n', '"a"']) == ([], [])
+    assert columnar.differences(['"a"\n', "[" * 100 + "]" * 100], []) == ([0, 1], [])
+
+    # Equal entries saved as different lines
+    old_lines = ['["a", "b"]\n', '["c"]\n']
+    new_lines = ['["a","b"]\n', '["c"]\n']
+    assert columnar.differences(old_lines, new_lines) == ([0], [0])
+
+
+def test_columnar_engine_choice(dump_files, tmp_path, monkeypatch):
+    """Test choosing the engine for API diffs."""
+    calls = []
+    differences = columnar.differences
+    monkeypatch.setattr(
+        columnar, "differences", lambda *args: calls.append(1) or differences(*args)
+    )
+    monkeypatch.setattr(columnar, "CROSSOVER_ENTRIES", 100)
+    APIDiff.from_files(*dump_files)
+    assert len(calls) == 1
+    monkeypatch.setattr(columnar, "CROSSOVER_ENTRIES", 1000)
+    APIDiff.from_files(*dump_files)
+    assert len(calls) == 1
+
+    # Dumps saved as deltas are compared using Python
+    APIDump.load_from_file(dump_files[1]).save_to_file(
+        tmp_path / "delta.json", base=dump_files[0]
+    )
+    api_diff = APIDiff.from_files(
+        dump_files[0], tmp_path / "delta.json", engine="numpy"
+    )
+    assert len(calls) == 1
+    assert api_diff.added == APIDiff.from_files(*dump_files).added
+
+    # Unknown engines, and NumPy not installed
+    with pytest.raises(ValueError, match="unknown API diff engine"):
+        APIDiff.from_files(*dump_files, engine="fortran")
+    monkeypatch.setattr(columnar, "_numpy", lambda: None)
+    assert not columnar.available()
+    with pytest.raises(ImportError, match="requires NumPy"):
+        APIDiff.from_files(*dump_files, engine="numpy")
+    monkeypatch.setattr(columnar, "CROSSOVER_ENTRIES", 0)
+    APIDiff.from_files(*dump_files)
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_columnar_cli(dump_files, tmp_path, engine):
+    """Test choosing the engine for API diffs using the command-line interface."""
+    api_diff_file = tmp_path / f"diff-{engine}.json"
+    cli("diff", "--engine", engine, *dump_files, "-o", api_diff_file)
+    api_diff_json = json.load(api_diff_file.open("rt"))
+    api_diff = APIDiff.from_files(*dump_files)
+    assert len(api_diff_json["removed"]) == len(api_diff.removed)
+    assert len(api_diff_json["added"]) == len(api_diff.added)
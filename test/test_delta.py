@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test API dumps saved as deltas from base dumps."""
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDiff, APIDump, _load_dump_content
+from py_api_dumper.cli import cli
+
+
+def _changed(dump, n):
+
+    # Return a copy of an API dump with entries removed and added
+    entries = sorted(dump.api)
+    api = set(entries[n:]) | {(("MODULE", "api_ref"), ("MEMBER", f"new{n}", "int"))}
+    return APIDump(modules=dict(dump.modules), api=api)
+
+
+@pytest.fixture
+def base_file(tmp_path):
+    """Save a base API dump."""
+    base_file = tmp_path / "base.json.gz"
+    APIDump.from_modules(api_ref).save_to_file(base_file)
+    return base_file
+
+
+def test_delta(base_file, tmp_path):
+    """Test saving and loading API dumps as deltas."""
+    base = APIDump.load_from_file(base_file)
+    new = _changed(base, 3)
+    delta_file = tmp_path / "sub" / "delta1.json"
+    delta_file.parent.mkdir()
+    new.save_to_file(delta_file, base=base_file)
+    content = _load_dump_content(delta_file)
+    assert "api" not in content
+    assert content["delta"]["base"] == "../base.json.gz"
+    assert content["delta"]["depth"] == 1
+    assert len(content["removed"]) == 3
+    assert len(content["added"]) == 1
+    delta = APIDump.load_from_file(delta_file)
+    assert delta == new
+    assert delta.modules == new.modules
+    assert delta._delta_depth == 1
+
+    # Chains of deltas are followed, up to the maximum depth
+    newer = _changed(new, 5)
+    newer.save_to_file(tmp_path / "delta2.json", base=delta, max_delta_depth=2)
+    delta2 = APIDump.load_from_file(tmp_path / "delta2.json")
+    assert delta2 == newer
+    assert delta2._delta_depth == 2
+    newer.save_to_file(tmp_path / "delta3.json", base=delta2, max_delta_depth=2)
+    content = _load_dump_content(tmp_path / "delta3.json")
+    assert "delta" not in content
+    assert set(content["api"]) == newer._api
+
+    # Deltas are invalid if their base changes, but not if it is repacked
+    assert cli("repack", base_file) == 0
+    assert APIDump.load_from_file(delta_file) == new
+    _changed(base, 1).save_to_file(base_file)
+    with pytest.raises(ValueError, match="has changed"):
+        APIDump.load_from_file(delta_file)
+
+
+def test_delta_diff(base_file, tmp_path):
+    """Test using deltas as API diffs, without loading their base."""
+    base = APIDump.load_from_file(base_file)
+    new = _changed(base, 3)
+    delta_file = tmp_path / "delta.json"
+    new.save_to_file(delta_file, base=base)
+    new.save_to_file(base_file.with_name("full.json"))
+    base_file.unlink()
+    diff = APIDiff.from_delta(delta_file)
+    expected = APIDiff(base, new)
+    assert diff.removed == expected.removed
+    assert diff.added == expected.added
+    assert diff.old_dump_file == base_file
+    assert diff.old_modules == base.modules
+    assert diff.new_dump_file == delta_file
+    with pytest.raises(ValueError, match="not an API dump saved as a delta"):
+        APIDiff.from_delta(base_file.with_name("full.json"))
+
+
+def test_delta_errors(base_file, tmp_path):
+    """Test errors in saving and loading API dumps as deltas."""
+    base = APIDump.load_from_file(base_file)
+    with pytest.raises(ValueError, match="not loaded from a file"):
+        base.save_to_file(base_file, base=_changed(base, 1))
+    with pytest.raises(ValueError, match="delta from itself"):
+        _changed(base, 1).save_to_file(base_file, base=base)
+
+    # Chains of deltas cannot loop back on themselves
+    delta1_file, delta2_file = tmp_path / "delta1.json", tmp_path / "delta2.json"
+    _changed(base, 1).save_to_file(delta1_file, base=base)
+    _changed(base, 2).save_to_file(delta2_file, base=delta1_file)
+    with pytest.raises(ValueError, match="itself a delta from"):
+        base.save_to_file(base_file, base=delta2_file)
+    with pytest.raises(ValueError, match="itself a delta from"):
+        cli("repack", "--base", delta2_file, base_file)
+    loop_file = tmp_path / "loop.json.gz"
+    _changed(base, 3).save_to_file(loop_file, base=delta2_file)
+    loop_file.replace(base_file)
+    for load in (APIDump.load_from_file, lambda f: APIDump.load_many([f])[0]):
+        with pytest.raises(ValueError, match="loops back to .*delta2.json"):
+            load(delta2_file)
+
+
+def test_delta_cli(base_file, tmp_path):
+    """Test saving and repacking deltas using the command-line interface."""
+    delta_file = tmp_path / "delta.json"
+    cli("dump", "-o", delta_file, "--base", base_file, "api_ref")
+    content = _load_dump_content(delta_file)
+    assert content["removed"] == content["added"] == []
+    assert cli("repack", delta_file) == 0
+    assert "delta" not in _load_dump_content(delta_file)
+    assert cli("repack", "--base", base_file, delta_file) == 0
+    assert "delta" in _load_dump_content(delta_file)
+    assert APIDump.load_from_file(delta_file) == APIDump.load_from_file(base_file)
@@ -12,6 +12,7 @@ from pathlib import Path
 import api_ref
 import pytest
 
+import py_api_dumper
 from py_api_dumper import APIDiff, APIDump
 from py_api_dumper.cli import cli
 
@@ -387,3 +388,358 @@ def test_diff_cli_json(api_dump_file, api_dump_new_file, request):
     assert api_diff.added == set(
         tuple(tuple(e) for e in entry) for entry in api_diff_json["added"]
     )
+
+
+def test_diff_moves(api_dump, monkeypatch, tmp_path):
+    """Test API diff with moved and renamed subtrees."""
+    monkeypatch.setattr(api_ref, "__version__", "0.2", raising=False)
+
+    def F1(b):
+        pass
+
+    monkeypatch.setattr(api_ref, "F1", F1)
+    monkeypatch.setattr(api_ref.F1, "__module__", api_ref.__name__)
+    monkeypatch.setattr(api_ref, "F5", api_ref.F4, raising=False)
+    monkeypatch.delattr(api_ref, "F4")
+    monkeypatch.setattr(api_ref.pub_mod, "C2", api_ref.pub_mod.C1.C2, raising=False)
+    monkeypatch.delattr(api_ref.pub_mod.C1, "C2")
+    monkeypatch.setattr(api_ref.pub_mod, "d4", 5, raising=False)
+    api_dump_new = APIDump.from_modules(api_ref)
+    api_diff = APIDiff(api_dump, api_dump_new, detect_moves=True)
+    assert not api_diff.equal()
+    _check_diff(
+        api_diff,
+        """
+        --- /dev/null api_ref=0.1
+        +++ /dev/null api_ref=0.2
+        +MODULE : api_ref
+        +    MODULE : pub_mod
+        +        MEMBER : d4 : int
+        ~MOVED : CLASS : api_ref.pub_mod.C1.C2 -> api_ref.pub_mod.C2
+        ~RENAMED : REQUIRED : api_ref.F1.a -> api_ref.F1.b
+        ~RENAMED : FUNCTION : api_ref.F4 -> api_ref.F5
+        """,
+    )
+    api_diff_file = tmp_path / "test_diff.tmp"
+    api_diff.save_as_json(api_diff_file)
+    api_diff_json = json.load(api_diff_file.open("rt"))
+    assert [[e[-1] for e in pair] for pair in api_diff_json["renamed"]] == [
+        [["REQUIRED", 0, "a", "no-type"], ["REQUIRED", 0, "b", "no-type"]],
+        [["FUNCTION", "F4", "None"], ["FUNCTION", "F5", "None"]],
+    ]
+    api_diff_no_moves = APIDiff(api_dump, api_dump_new)
+    assert len(api_diff_no_moves.moved) == 0
+    assert len(api_diff_no_moves.renamed) == 0
+    assert len(api_diff_no_moves.removed) == 1 + 3 + 10
+    assert len(api_diff_no_moves.added) == len(api_diff_no_moves.removed) + 1
+
+
+def test_diff_moves_ambiguous():
+    """Test API diff with moved subtrees which match more than one candidate."""
+    old = APIDump(
+        modules={},
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("CLASS", "A")),
+            (("MODULE", "m"), ("CLASS", "A"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("CLASS", "B")),
+            (("MODULE", "m"), ("CLASS", "B"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("CLASS", "E")),
+            (("MODULE", "m"), ("CLASS", "E"), ("MEMBER", "x", "int")),
+        },
+    )
+    new = APIDump(
+        modules={},
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("CLASS", "C")),
+            (("MODULE", "m"), ("CLASS", "C"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("CLASS", "D")),
+            (("MODULE", "m"), ("CLASS", "D"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("MEMBER", "y", "int")),
+            (("MODULE", "m"), ("MODULE", "n")),
+            (("MODULE", "m"), ("MODULE", "n"), ("MEMBER", "x", "int")),
+        },
+    )
+    api_diff = APIDiff(old, new, detect_moves=True)
+    assert api_diff.renamed == {
+        ((("MODULE", "m"), ("CLASS", "A")), (("MODULE", "m"), ("CLASS", "C"))),
+        ((("MODULE", "m"), ("CLASS", "B")), (("MODULE", "m"), ("CLASS", "D"))),
+    }
+    assert api_diff.moved == {
+        (
+            (("MODULE", "m"), ("CLASS", "E"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("MEMBER", "x", "int")),
+        ),
+    }
+    assert api_diff.removed == {(("MODULE", "m"), ("CLASS", "E"))}
+    assert api_diff.added == {
+        (("MODULE", "m"), ("MEMBER", "y", "int")),
+        (("MODULE", "m"), ("MODULE", "n")),
+        (("MODULE", "m"), ("MODULE", "n"), ("MEMBER", "x", "int")),
+    }
+
+
+def test_diff_moves_cli(api_dump_file, api_dump_new_file, request):
+    """Test detecting moved and renamed subtrees using the command-line interface."""
+    api_diff = APIDiff.from_files(api_dump_file, api_dump_new_file, detect_moves=True)
+    api_diff_file = request.path.parent / "test_diff.tmp"
+    cli("diff", "--detect-moves", api_dump_file, api_dump_new_file, "-o", api_diff_file)
+    api_diff_json = json.load(api_diff_file.open("rt"))
+    for key in ("moved", "renamed"):
+        assert getattr(api_diff, key) == set(
+            tuple(tuple(tuple(e) for e in entry) for entry in pair)
+            for pair in api_diff_json[key]
+        )
+
+
+@pytest.mark.parametrize("max_workers", [1, None])
+def test_diff_batch(api_dump, api_dump_file, api_dump_new_file, tmp_path, max_workers):
+    """Test comparing many pairs of API dumps."""
+    api_dump_copy_file = tmp_path / "test_dump_copy.tmp"
+    api_dump.save_to_file(api_dump_copy_file)
+    pairs = [
+        (api_dump_file, api_dump_new_file, tmp_path / "test_diff_1.tmp"),
+        (api_dump_copy_file, api_dump_copy_file),
+        (api_dump_new_file, api_dump_file, None),
+    ]
+    summary = APIDiff.batch(pairs, max_workers=max_workers)
+    assert not summary["equal"]
+    assert [s["equal"] for s in summary["pairs"]] == [False, True, False]
+    counts = {"removed": 17, "added": 13, "moved": 0, "renamed": 0}
+    assert summary["pairs"][0]["packages"] == {"api_ref": counts}
+    assert summary["pairs"][1]["packages"] == {}
+    counts = {"removed": 13, "added": 17, "moved": 0, "renamed": 0}
+    assert summary["pairs"][2]["packages"] == {"api_ref": counts}
+    counts = {"removed": 30, "added": 30, "moved": 0, "renamed": 0}
+    assert summary["packages"] == {"api_ref": counts}
+    api_diff_json = json.load((tmp_path / "test_diff_1.tmp").open("rt"))
+    assert api_diff_json["old_dump"] == str(api_dump_file)
+    summary = APIDiff.batch(pairs[1:2], max_workers=max_workers)
+    assert summary["equal"]
+
+
+def test_diff_batch_groups(api_dump, api_dump_file, tmp_path, monkeypatch):
+    """Test loading each API dump once in a batch of pairs which share dump files."""
+    dump_files = [api_dump_file] + [tmp_path / f"{n}.json" for n in "bcd"]
+    for dump_file in dump_files[1:]:
+        api_dump.save_to_file(dump_file)
+    loaded = []
+    load_many = APIDump._load_many.__func__
+    monkeypatch.setattr(
+        APIDump,
+        "_load_many",
+        classmethod(
+            lambda cls, files, workers, progress, pool: loaded.append(
+                ([f.name for f in files], workers, pool)
+            )
+            or load_many(cls, files, workers, progress, pool)
+        ),
+    )
+    a, b, c, d = dump_files
+    pairs = [(a, b), (d, d), (a, c), (b, a, tmp_path / "b-a.json"), (d, d)]
+    assert py_api_dumper._batch_groups([(*p[:2], None) for p in pairs]) == [
+        [0, 2, 3],
+        [1, 4],
+    ]
+    summary = APIDiff.batch(pairs, max_workers=1)
+    assert summary["equal"]
+    assert [(names, workers) for names, workers, _ in loaded] == [
+        (["test_dump.tmp", "b.json"], None),
+        (["c.json"], None),
+        ([], None),
+        (["d.json"], None),
+        ([], None),
+    ]
+
+    # Pairs in a group share an intern pool
+    pools = [pool for _, _, pool in loaded]
+    assert pools[0] is pools[1] is pools[2]
+    assert pools[3] is pools[4] is not pools[0]
+    line = '[["MODULE", "m"], ["FUNCTION", "f"]]\n'
+    entry = pools[0].parse(line)
+    assert entry == (("MODULE", "m"), ("FUNCTION", "f"))
+    assert pools[0].parse(line[:-1] + "\n") is entry
+    assert line not in pools[0]._entries
+
+    # Diffs are labelled with the dump files of their pair
+    assert [(s["old_dump"], s["new_dump"]) for s in summary["pairs"]] == [
+        (str(old), str(new)) for old, new, *_ in pairs
+    ]
+    api_diff_json = json.load((tmp_path / "b-a.json").open("rt"))
+    assert (api_diff_json["old_dump"], api_diff_json["new_dump"]) == (str(b), str(a))
+
+    # Worker processes read dump files in one thread
+    loaded.clear()
+    group = [(0, (a, b, None)), (1, (b, b, None))]
+    results = py_api_dumper._batch_diff_group(APIDiff, False, {}, 1, group)
+    assert [i for i, _ in results] == [0, 1]
+    assert [(names, workers) for names, workers, _ in loaded] == [
+        (["test_dump.tmp", "b.json"], 1),
+        ([], 1),
+    ]
+
+
+def test_diff_batch_moves(tmp_path):
+    """Test counting moved and renamed API entries in a batch of pairs."""
+    old_file, new_file = tmp_path / "old.json", tmp_path / "new.json"
+    for dump_file, name in ((old_file, "A"), (new_file, "B")):
+        module = ("MODULE", "m")
+        APIDump(
+            modules={},
+            api={
+                (module,),
+                (module, ("CLASS", name)),
+                (module, ("CLASS", name), ("MEMBER", "x", "int")),
+            },
+        ).save_to_file(dump_file)
+    summary = APIDiff.batch([(old_file, new_file)], detect_moves=True)
+    assert not summary["equal"]
+    counts = {"removed": 0, "added": 0, "moved": 0, "renamed": 1}
+    assert summary["pairs"][0]["packages"] == {"m": counts}
+    assert summary["packages"] == {"m": counts}
+
+
+def test_diff_batch_cli(api_dump_file, api_dump_new_file, tmp_path, monkeypatch, capfd):
+    """Test comparing many pairs of API dumps using the command-line interface."""
+    monkeypatch.chdir(tmp_path)
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(f"""
+        # old new [output]
+        {api_dump_file} {api_dump_new_file} test_diff_1.tmp
+        {api_dump_file} {api_dump_file}
+        """)
+    summary_file = tmp_path / "summary.tmp"
+    assert (
+        cli("diff-batch", "-j", "1", "-o", summary_file, "-t", "-d", "out", manifest)
+        == 1
+    )
+    out = capfd.readouterr().out
+    assert out.splitlines() == [
+        "PACKAGE  REMOVED    ADDED    MOVED  RENAMED",
+        "api_ref       17       13        0        0",
+    ]
+    summary = json.load(summary_file.open("rt"))
+    assert [s["output"] for s in summary["pairs"]] == [
+        str(tmp_path / "test_diff_1.tmp"),
+        str(Path("out") / "test_dump--test_dump.txt"),
+    ]
+    assert (tmp_path / "test_diff_1.tmp").read_text().startswith("---")
+    assert Path("out", "test_dump--test_dump.txt").is_file()
+    manifest.write_text(f"{api_dump_file} {api_dump_file}\n")
+    assert cli("diff-batch", "--detect-moves", manifest) == 0
+    for line in (f"{api_dump_file} {api_dump_file} a b", f"{api_dump_file}"):
+        manifest.write_text(f"{line}\n")
+        with pytest.raises(SystemExit, match="2"):
+            cli("diff-batch", manifest)
+        assert f"invalid line in manifest {manifest}: {line}" in capfd.readouterr().err
+
+
+def test_diff_perf(api_dump, tmp_path):
+    """Test API diff with import cost regressions."""
+
+    def imports(t, m):
+        metrics = {"self_time": t / 2, "cumulative_time": t}
+        metrics.update({"self_memory": m // 2, "cumulative_memory": m})
+        return {"imports": {"api_ref": metrics}}
+
+    api_dumps = []
+    for i, (t, m) in enumerate(((0.5, 1000), (0.52, 1500), (0.6, 1000))):
+        api_dumps.append(APIDump(modules={"api_ref": imports(t, m)}, api=api_dump.api))
+        api_dumps[-1].modules["api_ref"]["version"] = f"0.{i}"
+    api_dumps.append(APIDump(modules={"api_ref": {"version": None}}, api=api_dump.api))
+    api_diff = APIDiff(api_dumps[0], api_dumps[1], perf_threshold=0.1)
+    assert api_diff.equal()
+    assert api_diff.perf_regressions == [
+        ("api_ref", "cumulative_memory", 1000, 1500),
+    ]
+    api_diff = APIDiff(api_dumps[0], api_dumps[2], perf_threshold=0.1)
+    _check_diff(
+        api_diff,
+        """
+        --- /dev/null api_ref=0.0
+        +++ /dev/null api_ref=0.2
+        !PERF : api_ref : cumulative_time : 0.5 -> 0.6
+        """,
+    )
+    assert APIDiff(api_dumps[0], api_dumps[2]).perf_regressions == []
+    assert APIDiff(api_dumps[3], api_dumps[0], perf_threshold=0).perf_regressions == []
+    for i, api_dump_i in enumerate(api_dumps):
+        api_dump_i.save_to_file(tmp_path / f"test_dump_{i}.tmp")
+    api_diff_file = tmp_path / "test_diff.tmp"
+    args = ("diff", tmp_path / "test_dump_0.tmp", tmp_path / "test_dump_2.tmp")
+    assert cli(*args, "--perf", "-o", api_diff_file) == 1
+    api_diff_json = json.load(api_diff_file.open("rt"))
+    assert api_diff_json["perf_regressions"] == [
+        ["api_ref", "cumulative_time", 0.5, 0.6]
+    ]
+    assert cli(*args, "--perf", "0.5", "-o", api_diff_file) == 0
+    assert cli(*args, "-o", api_diff_file) == 0
+
+
+@pytest.mark.parametrize("file_name", ["test_diff.tmp", "test_diff.tmp.gz"])
+def test_diff_cli_json_lines(api_dump_file, api_dump_new_file, tmp_path, file_name):
+    """Test writing API diffs in JSON Lines format using the command-line interface."""
+    api_diff = APIDiff.from_files(api_dump_file, api_dump_new_file)
+    api_diff_file = tmp_path / file_name
+    cli("diff", api_dump_file, api_dump_new_file, "-o", api_diff_file, "-l")
+    records = APIDiff.read_json_lines(api_diff_file)
+    header = next(records)
+    assert header["change"] == "header"
+    assert api_diff.old_dump_file == Path(header["old_dump"])
+    assert api_diff.new_modules["api_ref"] == header["new_modules"]["api_ref"]
+    records = list(records)
+    for key in ("removed", "added"):
+        entries = [r["entry"] for r in records if r["change"] == key]
+        assert entries == sorted(getattr(api_diff, key))
+    assert set(r["module"] for r in records) == {"api_ref", "api_ref.pub_mod"}
+    assert len(records) == len(api_diff.removed) + len(api_diff.added)
+    api_diff_file = tmp_path / ("test_diff_all" + Path(file_name).suffix)
+    cli("diff", api_dump_file, api_dump_new_file, "-o", api_diff_file)
+    with APIDump._open_dump_file(api_diff_file, "rt") as file:
+        api_diff_json = json.load(file)
+    assert len(api_diff_json["removed"]) == len(api_diff.removed)
+
+
+def test_diff_json_lines_moves(tmp_path):
+    """Test writing API diffs with moves and import costs in JSON Lines format."""
+
+    def imports(t):
+        metrics = {"self_time": t, "cumulative_time": t}
+        metrics.update({"self_memory": 0, "cumulative_memory": 0})
+        return {"m": {"version": None, "imports": {"m": metrics}}}
+
+    old = APIDump(
+        modules=imports(1.0),
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("MEMBER", "x", "int")),
+        },
+    )
+    new = APIDump(
+        modules=imports(2.0),
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("MEMBER", "y", "int")),
+        },
+    )
+    api_diff = APIDiff(old, new, detect_moves=True, perf_threshold=0.1)
+    api_diff_file = tmp_path / "test_diff.tmp"
+    api_diff.save_as_json_lines(api_diff_file)
+    records = list(APIDiff.read_json_lines(api_diff_file))
+    assert records[1:] == [
+        {
+            "change": "renamed",
+            "module": "m",
+            "old": (("MODULE", "m"), ("MEMBER", "x", "int")),
+            "new": (("MODULE", "m"), ("MEMBER", "y", "int")),
+        },
+        {
+            "change": "perf_regression",
+            "module": "m",
+            "metric": "cumulative_time",
+            "old": 1.0,
+            "new": 2.0,
+        },
+    ]
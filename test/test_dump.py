@@ -4,13 +4,22 @@
 
 """Test API dumps."""
 
+import importlib
+import io
+import json
+import sys
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import api_ref
 import pytest
 
-from py_api_dumper import APIDump
+import py_api_dumper
+from py_api_dumper import APIDump, ImportProfiler, _entry_sort_key
 from py_api_dumper.cli import cli
+from py_api_dumper.threadsafe import import_lock, silenced_output
 
 
 def _compare_dumps(api_dump_text):
@@ -70,3 +79,209 @@ def test_cli():
     with pytest.raises(SystemExit):
         cli("--help")
     cli("dump", "api_ref")
+
+
+@pytest.fixture
+def unimported_api_ref(monkeypatch):
+    """Remove `api_ref` from the imported modules, restoring it afterwards."""
+    for module_name in list(sys.modules):
+        if module_name.split(".")[0] == "api_ref":
+            monkeypatch.delitem(sys.modules, module_name)
+
+
+def test_dump_profile_imports(unimported_api_ref):
+    """Test measuring the import costs of dumped modules."""
+    api_dump = APIDump.from_modules("api_ref", profile_imports=True)
+    assert api_dump == APIDump.from_modules(api_ref)
+    imports = api_dump.modules["api_ref"]["imports"]
+    assert list(imports) == [
+        "api_ref",
+        "api_ref._priv_mod",
+        "api_ref.ext_mod",
+        "api_ref.pub_mod",
+    ]
+    for metrics in imports.values():
+        assert 0 <= metrics["self_time"] <= metrics["cumulative_time"]
+        assert isinstance(metrics["self_memory"], int)
+        assert isinstance(metrics["cumulative_memory"], int)
+    assert (
+        imports["api_ref"]["cumulative_time"]
+        >= imports["api_ref"]["self_time"] + imports["api_ref.pub_mod"]["self_time"]
+    )
+
+
+def test_import_profiler(unimported_api_ref):
+    """Test measuring the import costs of modules."""
+    tracemalloc.start()
+    try:
+        with ImportProfiler() as profiler:
+            spec = profiler.find_spec("api_ref", None)
+            assert spec.loader.get_filename() == api_ref.__file__
+            with pytest.raises(ModuleNotFoundError):
+                importlib.import_module("not_a_module")
+            importlib.import_module("api_ref.pub_mod")
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert set(profiler.metrics) == {"api_ref", "api_ref._priv_mod", "api_ref.pub_mod"}
+    for module_name in profiler.metrics:
+        module = sys.modules[module_name]
+        assert type(module.__loader__) is type(spec.loader._loader)
+        assert module.__spec__.loader is module.__loader__
+
+
+def test_dump_profile_imports_cli(unimported_api_ref, tmp_path):
+    """Test measuring the import costs of dumped modules using the command-line interface."""
+    api_dump_file = tmp_path / "test_dump.tmp"
+    cli("dump", "--profile-imports", "--output", api_dump_file, "api_ref")
+    api_dump = APIDump.load_from_file(api_dump_file)
+    assert "api_ref.pub_mod" in api_dump.modules["api_ref"]["imports"]
+
+
+def test_dump_executor(unimported_api_ref):
+    """Test dumping modules in parallel threads."""
+    api_dump_serial = APIDump.from_modules("api_ref", "other_mod")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        api_dump = APIDump.from_modules("api_ref", "other_mod", executor=executor)
+    assert api_dump == api_dump_serial
+    assert api_dump.modules == api_dump_serial.modules
+
+
+def test_import_lock():
+    """Test that the import lock is held only while modifying the import system."""
+    with ImportProfiler():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(import_lock.acquire, blocking=False).result()
+            executor.submit(import_lock.release).result()
+
+
+def test_silenced_output(capsys):
+    """Test silencing output in one thread only."""
+    silenced = threading.Event()
+    done = threading.Event()
+
+    def print_silenced():
+        with silenced_output():
+            print("silenced")
+            sys.stdout.writelines(["silenced\n"])
+            sys.stdout.flush()
+            silenced.set()
+            done.wait()
+
+    thread = threading.Thread(target=print_silenced)
+    thread.start()
+    silenced.wait()
+    print("not silenced")
+    sys.stdout.writelines(["not silenced\n"])
+    sys.stdout.flush()
+    assert sys.stdout.encoding is not None
+    done.set()
+    thread.join()
+    assert capsys.readouterr().out == "not silenced\nnot silenced\n"
+    assert not hasattr(sys.stdout, "_stream")
+
+
+def test_silenced_output_replaced(monkeypatch):
+    """Test silencing output when the output streams are replaced meanwhile."""
+    stdout = io.StringIO()
+    with silenced_output():
+        monkeypatch.setattr(sys, "stdout", stdout)
+    assert sys.stdout is stdout
+
+
+def test_entry_sort_key():
+    """Test that byte sort keys preserve the order of API entries."""
+    entries = list(APIDump.from_modules(api_ref).api) + [
+        (("MODULE", "a"),),
+        (("MODULE", "a"), ("MEMBER", "b", "int")),
+        (("MODULE", "a"), ("MEMBER", "b\x00", "int")),
+        (("MODULE", "a"), ("MEMBER", "b\x00c", "int")),
+        (("MODULE", "a"), ("MEMBER", "b", "int", "x")),
+        (("MODULE", "a"), ("REQUIRED", -1, "c", "int")),
+        (("MODULE", "a"), ("REQUIRED", 10, "c", "int")),
+        (("MODULE", "a\u00e9"),),
+        (("MODULE", "a\U0001f600"),),
+    ]
+    element_keys = dict()
+    keys = [_entry_sort_key(entry, element_keys) for entry in entries]
+    assert [entries[i] for i in sorted(range(len(keys)), key=keys.__getitem__)] == (
+        sorted(entries)
+    )
+    assert _entry_sort_key((("A", 1),), {}) < _entry_sort_key((("A", "1"),), {})
+
+
+def test_dump_file_sorted(request, monkeypatch):
+    """Test that API dumps saved in sorted order are not sorted when loaded."""
+    api_dump = APIDump.from_modules(api_ref)
+    api_dump_file = request.path.parent / "test_dump.tmp"
+    api_dump.save_to_file(api_dump_file)
+    api_dump_text = request.path.parent / "test_dump.txt.tmp"
+    with monkeypatch.context() as m:
+        m.setattr(py_api_dumper, "_sorted_entries", None)
+        api_dump_from_file = APIDump.load_from_file(api_dump_file)
+        api_dump_from_file.print_as_text(api_dump_text.open("w"))
+    _compare_dumps(api_dump_text)
+
+    # Dumps saved without sorted order are sorted when loaded
+    content = py_api_dumper._load_dump_content(api_dump_file)
+    del content["sorted"]
+    content["api"].reverse()
+    api_dump_file.write_text(json.dumps(content))
+    api_dump_from_file = APIDump.load_from_file(api_dump_file)
+    api_dump_from_file.print_as_text(api_dump_text.open("w"))
+    _compare_dumps(api_dump_text)
+
+
+def test_dump_frozen(request):
+    """Test that API dumps are frozen, and that their APIs are not copied."""
+    api_dump = APIDump.from_modules(api_ref)
+    assert api_dump.frozen
+    assert api_dump.api is api_dump.api
+    api_dump_file = request.path.parent / "test_dump.tmp"
+    api_dump.save_to_file(api_dump_file)
+    assert APIDump.load_from_file(api_dump_file).frozen
+
+    # Dumps created with mutable APIs can be frozen
+    mutable = APIDump(modules={}, api=set(api_dump.api))
+    assert not mutable.frozen
+    assert mutable.api is not mutable.api
+    assert mutable.freeze() is mutable
+    assert mutable.frozen
+    assert mutable.freeze().api is mutable.api
+
+
+def test_dump_set_operations():
+    """Test set operations on API dumps."""
+    api_dump = APIDump.from_modules(api_ref)
+    pub_mod = api_dump.restrict_to("api_ref.pub_mod")
+    assert pub_mod.frozen
+    assert len(pub_mod.api) > 0
+    assert all(
+        e[:2] == (("MODULE", "api_ref"), ("MODULE", "pub_mod")) for e in pub_mod.api
+    )
+    assert set(pub_mod.modules) == {"api_ref"}
+    rest = api_dump - pub_mod
+    assert rest.frozen
+    assert (rest | pub_mod) == api_dump
+    assert (rest & pub_mod).api == frozenset()
+    assert (api_dump & pub_mod) == pub_mod
+    other = APIDump.from_modules("other_mod")
+    assert set((api_dump | other).modules) == {"api_ref", "other_mod"}
+    assert api_dump.restrict_to("api_ref") == api_dump
+    assert api_dump.restrict_to("other_mod").api == frozenset()
+    assert api_dump.restrict_to("other_mod").modules == {}
+    for operand in (api_dump.__or__, api_dump.__and__, api_dump.__sub__):
+        assert operand(1) is NotImplemented
+    assert (APIDump(modules={}, api=set(api_dump.api)) - pub_mod) == rest
+
+
+def test_dump_restrict_to_sorted(request):
+    """Test restricting sorted API dumps to modules by binary search."""
+    api_dump = APIDump.from_modules(api_ref)
+    api_dump_file = request.path.parent / "test_dump.tmp"
+    api_dump.save_to_file(api_dump_file)
+    api_dump_sorted = APIDump.load_from_file(api_dump_file)
+    for module_prefix in ("api_ref", "api_ref.pub_mod", "api_ref.pub", "other_mod"):
+        restricted = api_dump_sorted.restrict_to(module_prefix)
+        assert restricted == api_dump.restrict_to(module_prefix)
+        assert restricted._sorted_api == sorted(restricted.api)
@@ -0,0 +1,95 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test extractors of API entries registered by member type."""
+
+import enum
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDump
+
+
+class Colour(enum.Enum):
+    """Enumeration dumped as part of `api_ref`."""
+
+    __module__ = "api_ref"
+
+    RED = 1
+    GREEN = 2
+
+
+class Descriptor:
+    """Callable method descriptor dumped as part of `api_ref`."""
+
+    __module__ = "api_ref"
+
+    def __get__(self, obj, objtype=None):
+        return self
+
+    def __call__(self, x):
+        """Call the descriptor."""
+
+
+def _extract_enum_member(dump, prefix, struct, name, member):
+    dump.add_api_entry(prefix + [("ENUM", name, repr(member.value))])
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Restore the extractors registered on `APIDump` after each test."""
+    monkeypatch.setattr(APIDump, "_extractors", dict(APIDump._extractors))
+    monkeypatch.setattr(APIDump, "_extractor_cache", dict())
+    monkeypatch.setattr(api_ref, "Colour", Colour, raising=False)
+    monkeypatch.setattr(api_ref, "descriptor", Descriptor(), raising=False)
+
+
+def _colour_entries(dump):
+    prefix = (("MODULE", "api_ref"), ("CLASS", "Colour"))
+    return {
+        e[2] for e in dump.api if e[:2] == prefix and len(e) == 3 and e[2][1] == "RED"
+    }
+
+
+def test_extractors_default(registry):
+    """Test that members are classified once per type by default."""
+    dump = APIDump.from_modules(api_ref)
+    assert _colour_entries(dump) == {("MEMBER", "RED", "Colour")}
+    assert APIDump._extractor_cache[Colour] is APIDump._extract_member
+    assert (("MODULE", "api_ref"), ("FUNCTION", "descriptor", "no-signature")) in (
+        dump.api
+    )
+    assert APIDump._extractor_cache[Descriptor] is APIDump._extract_routine
+    assert APIDump._extractor_cache[type(api_ref.pub_mod.C1.M1)] is (
+        APIDump._extract_routine
+    )
+
+
+def test_extractors_register(registry):
+    """Test registering extractors on `APIDump` and its subclasses."""
+
+    class EnumDump(APIDump):
+        pass
+
+    # Extractor registered on a subclass is found by the base class of the
+    # member's type, and is not used by the base dumper
+    APIDump.from_modules(api_ref)
+    EnumDump.register_extractor(enum.Enum, _extract_enum_member)
+    assert "_extractors" in EnumDump.__dict__
+    assert _colour_entries(EnumDump.from_modules(api_ref)) == {("ENUM", "RED", "1")}
+    assert _colour_entries(APIDump.from_modules(api_ref)) == {
+        ("MEMBER", "RED", "Colour")
+    }
+    assert EnumDump._extractor_cache[Colour] is _extract_enum_member
+
+    # Extractor registered on the base class clears cached extractors of its
+    # subclasses, and extractors for more derived member types take precedence
+    APIDump.register_extractor(Colour, APIDump._extract_member)
+    assert EnumDump._extractor_cache == {} and APIDump._extractor_cache == {}
+    assert _colour_entries(EnumDump.from_modules(api_ref)) == {
+        ("MEMBER", "RED", "Colour")
+    }
+    EnumDump.register_extractor(Colour, _extract_enum_member)
+    assert _colour_entries(EnumDump.from_modules(api_ref)) == {("ENUM", "RED", "1")}
@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test dumping and comparing APIs from git revisions."""
+
+import subprocess
+import sys
+
+import pytest
+
+from py_api_dumper import APIDiff, APIDump, GitImporter, GitObjectReader
+from py_api_dumper.cli import cli
+
+REVISIONS = (
+    {
+        "src/gmod/__init__.py": "from .util import helper\n",
+        "src/gmod/util.py": "def helper(a):\n    pass\n",
+        "src/gmod/dep.py": "from . import util\nclass D:\n    x = util\n",
+        "src/gmod/stable.py": "import gmod._priv\nclass S:\n    def m(self): pass\n",
+        "src/gmod/_priv.py": "",
+        "src/gmod/sub/__init__.py": "from .leaf import f\n",
+        "src/gmod/sub/leaf.py": "import gmod.sub\nfrom ..stable import S as T\n"
+        "def f(): pass\n",
+        "src/gmod/data.txt": "",
+        "src/gmod/not-a-module.py": "",
+        "src/nopkg/mod.py": "",
+        "README": "",
+    },
+    {
+        "src/gmod/util.py": "def helper(a, b):\n    pass\n",
+    },
+)
+
+
+def _git(repo_dir, *args):
+    """Run a git command."""
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        cwd=repo_dir,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Create a git repository with two revisions, tagged `v1` and `v2`."""
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    _git(repo_dir, "init", "-q")
+    for i, files in enumerate(REVISIONS, start=1):
+        for name, content in files.items():
+            (repo_dir / name).parent.mkdir(parents=True, exist_ok=True)
+            (repo_dir / name).write_text(content)
+        _git(repo_dir, "add", ".")
+        _git(repo_dir, "commit", "-q", "-m", f"v{i}")
+        _git(repo_dir, "tag", f"v{i}")
+    return repo_dir
+
+
+def test_git_reader(git_repo):
+    """Test reading objects from a git repository."""
+    with GitObjectReader(git_repo) as reader:
+        _, obj_type, content = reader.read("v1:./src/gmod/util.py")
+        assert (obj_type, content) == ("blob", b"def helper(a):\n    pass\n")
+        files = reader.read_tree("v1:./src")
+        assert set(files) == {
+            n[len("src/") :] for n in REVISIONS[0] if n.startswith("src/")
+        }
+        with pytest.raises(KeyError):
+            reader.read("v1:./not-a-file")
+        with pytest.raises(KeyError):
+            reader.read_tree("v1:./README")
+
+
+def test_git_importer(git_repo, monkeypatch):
+    """Test importing modules from a git revision."""
+    monkeypatch.setitem(sys.modules, "gmod", sys)
+    with GitObjectReader(git_repo) as reader:
+        with GitImporter(reader, "v1", "src") as importer:
+            assert importer.modules == [
+                "gmod",
+                "gmod.dep",
+                "gmod.stable",
+                "gmod.sub",
+                "gmod.sub.leaf",
+                "gmod.util",
+            ]
+            import gmod.sub.leaf
+
+            assert gmod.sub.leaf.T is gmod.stable.S
+            assert gmod.__file__ == "v1:src/gmod/__init__.py"
+            assert "def f" in importer.get_source("gmod.sub.leaf")
+            assert importer.find_spec("not_gmod", None) is None
+        assert sys.modules["gmod"] is sys
+        assert "gmod.sub.leaf" not in sys.modules
+
+        # Importing a package directory
+        with GitImporter(reader, "v1", "src/gmod") as importer:
+            assert importer.modules[0:2] == ["gmod", "gmod.dep"]
+
+
+def test_git_dump(git_repo):
+    """Test dumping the API of a git revision."""
+    api_dump = APIDump.from_git("v1", "src", repo_dir=git_repo)
+    assert api_dump.modules["gmod"]["version"] == "v1"
+    assert str(api_dump.dump_file) == "v1:src"
+    assert len(api_dump.query("gmod.util.helper.a")) == 1
+    assert len(api_dump.query("gmod.sub.leaf.f")) == 1
+    assert "nopkg" not in api_dump.modules
+
+
+def test_git_diff(git_repo, monkeypatch):
+    """Test comparing the APIs of two git revisions."""
+
+    # Record modules imported
+    imported = []
+    import_module = APIDump._import_module
+
+    def spy_import_module(module_name):
+        imported.append(module_name)
+        return import_module(module_name)
+
+    monkeypatch.setattr(APIDump, "_import_module", staticmethod(spy_import_module))
+
+    # Modules whose source code and imports are unchanged are dumped only once
+    diff = APIDiff.from_git("v1", "v2", "src", repo_dir=git_repo)
+    assert imported.count("gmod.stable") == 1
+    assert imported.count("gmod.sub.leaf") == 1
+    assert imported.count("gmod.util") == 2
+    assert imported.count("gmod.dep") == 2
+    assert [e[-1][:2] for e in diff.added] == [("REQUIRED", 1)]
+    assert diff.removed == frozenset()
+    assert diff.new_modules["gmod"]["version"] == "v2"
+
+    # Dumps of unchanged modules are the same as dumping them afresh
+    new = APIDump.from_git("v2", "src", repo_dir=git_repo)
+    old = APIDump.from_git("v1", "src", repo_dir=git_repo)
+    assert diff.added == new.api - old.api
+
+
+def test_git_diff_cli(git_repo, monkeypatch, capsys):
+    """Test comparing the APIs of two git revisions using the command-line interface."""
+    monkeypatch.chdir(git_repo / "src")
+    assert cli("diff", "--git", "v1", "v2") == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0:2] == ["--- v1:. gmod=v1", "+++ v2:. gmod=v2"]
+    assert lines[-1] == "+\t\t\tREQUIRED : 1 : b : no-type"
+    monkeypatch.chdir(git_repo)
+    assert cli("diff", "--git", "v1", "v1", "src/gmod") == 0
+    assert capsys.readouterr().out.splitlines()[2:] == []
+    with pytest.raises(SystemExit, match="2"):
+        cli("diff", "old.dump", "new.dump", "src")
+    assert "PATH is only valid with --git" in capsys.readouterr().err
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test querying API dumps."""
+
+import io
+import os
+import sys
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDump, DumpIndex
+from py_api_dumper.cli import cli
+
+QUERIES = (
+    ("api_ref.pub_mod.C1", None, [("CLASS", "C1")]),
+    ("api_ref.*", ["CLASS"], [("CLASS", "C1"), ("CLASS", "C2")]),
+    ("api_ref.F?", None, [("FUNCTION", f"F{i}") for i in range(1, 5)]),
+    ("api_ref.*.C2.N1.*", ["OPTIONAL"], [("OPTIONAL", "hh")]),
+    ("*.__init__", ["FUNCTION"], [("FUNCTION", "__init__")] * 2),
+    ("api_ref.[ev]*", ["MODULE", "MEMBER"], None),
+    ("api_ref.ext", None, []),
+    ("zzz*", None, []),
+)
+
+
+@pytest.mark.parametrize("pattern,kinds,expected", QUERIES)
+def test_query(pattern, kinds, expected):
+    """Test querying API entries by dotted path."""
+    api_dump = APIDump.from_modules(api_ref)
+    entries = api_dump.query(pattern, kinds=kinds)
+    if expected is not None:
+        assert [e[-1][0 : len(x)] for e, x in zip(entries, expected)] == expected
+        assert len(entries) == len(expected)
+    else:
+        assert {e[-1][1] for e in entries} == {"ext_mod", "v1", "v2"}
+    assert len(api_dump.query("*")) == len(api_dump.api)
+
+
+@pytest.mark.parametrize("pattern,kinds,expected", QUERIES)
+def test_query_index(pattern, kinds, expected, tmp_path):
+    """Test querying API entries using an index of an API dump file."""
+    api_dump_file = tmp_path / "test_dump.json"
+    api_dump = APIDump.from_modules(api_ref)
+    api_dump.save_to_file(api_dump_file)
+    with DumpIndex.for_dump_file(api_dump_file) as index:
+        assert len(index) == len(api_dump.api)
+        assert index.query(pattern, kinds=kinds) == api_dump.query(pattern, kinds)
+
+
+def test_index_rebuild(tmp_path):
+    """Test rebuilding the index of a modified API dump file."""
+    api_dump_file = tmp_path / "test_dump.json"
+    index_file = tmp_path / "test_dump.json.idx"
+    APIDump.from_modules(api_ref).save_to_file(api_dump_file)
+
+    # Index is built once, and reused while the dump file is unchanged
+    DumpIndex.for_dump_file(api_dump_file).close()
+    mtime_ns = index_file.stat().st_mtime_ns
+    os.utime(index_file, ns=(mtime_ns - 10**9, mtime_ns - 10**9))
+    with DumpIndex.for_dump_file(api_dump_file) as index:
+        assert index.query("api_ref.F1") != []
+    assert index_file.stat().st_mtime_ns == mtime_ns - 10**9
+
+    # Index is rebuilt when the dump file changes
+    APIDump.from_modules("other_mod").save_to_file(api_dump_file)
+    with DumpIndex.for_dump_file(api_dump_file) as index:
+        assert index.query("api_ref.F1") == []
+        assert len(index) == len(APIDump.from_modules("other_mod").api)
+
+    # Index is rebuilt when the base dump file of a delta changes
+    base_file = tmp_path / "base.json"
+    APIDump.from_modules(api_ref).save_to_file(base_file)
+    APIDump.from_modules(api_ref).save_to_file(api_dump_file, base=base_file)
+    with DumpIndex.for_dump_file(api_dump_file) as index:
+        assert index.query("api_ref.F1") != []
+    APIDump.from_modules("other_mod").save_to_file(base_file)
+    with pytest.raises(ValueError, match="has changed"):
+        DumpIndex.for_dump_file(api_dump_file)
+    base_file.unlink()
+    with pytest.raises(FileNotFoundError):
+        DumpIndex.for_dump_file(api_dump_file)
+
+    # Index is rebuilt when the index file is invalid
+    APIDump.from_modules("other_mod").save_to_file(api_dump_file)
+    index_file.write_text("not an index\n")
+    with pytest.raises(ValueError):
+        DumpIndex(index_file)
+    with DumpIndex.for_dump_file(api_dump_file) as index:
+        assert len(index) > 0
+
+
+def test_show_cli(tmp_path, capsys, monkeypatch):
+    """Test querying API entries using the command-line interface."""
+    api_dump_file = tmp_path / "test_dump.json"
+    APIDump.from_modules(api_ref).save_to_file(api_dump_file)
+    assert cli("show", api_dump_file, "api_ref.pub_mod.C1.M*", "-k", "FUNCTION") == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "MODULE : api_ref",
+        "\tMODULE : pub_mod",
+        "\t\tCLASS : C1",
+        "\t\t\tFUNCTION : M1 : no-return-type",
+        "\t\t\tFUNCTION : M2 : no-return-type",
+        "\t\t\tFUNCTION : M3 : no-return-type",
+    ]
+    assert (tmp_path / "test_dump.json.idx").is_file()
+    assert cli("show", api_dump_file, "api_ref.nothing") == 1
+    assert capsys.readouterr().out == ""
+
+    # API dumps are loaded if the index cannot be saved, or from standard input
+    cli("show", api_dump_file, "api_ref.pub_mod.C1.M*", "-k", "FUNCTION")
+    expected = capsys.readouterr().out
+
+    def build(*args):
+        raise PermissionError
+
+    monkeypatch.setattr(DumpIndex, "build", build)
+    (tmp_path / "test_dump.json.idx").unlink()
+    assert cli("show", api_dump_file, "api_ref.pub_mod.C1.M*", "-k", "FUNCTION") == 0
+    assert capsys.readouterr().out == expected
+    assert not (tmp_path / "test_dump.json.idx").exists()
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(api_dump_file.open("rb")))
+    assert cli("show", "-", "api_ref.pub_mod.C1.M*", "-k", "FUNCTION") == 0
+    assert capsys.readouterr().out == expected
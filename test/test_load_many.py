@@ -0,0 +1,96 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test loading many API dump files at once."""
+
+import json
+
+import pytest
+
+from py_api_dumper import APIDump
+
+
+def _release(i):
+    """Return the API of release `i`, which adds a function `f{i}`."""
+    api = {(("MODULE", "m"),), (("MODULE", "m"), ("MEMBER", "v", "int"))}
+    for j in range(i + 1):
+        api.add((("MODULE", "m"), ("FUNCTION", f"f{j}", "no-return-type")))
+        api.add(
+            (
+                ("MODULE", "m"),
+                ("FUNCTION", f"f{j}", "no-return-type"),
+                ("REQUIRED", 0, "x", "int"),
+            )
+        )
+    return APIDump(modules={"m": {"version": f"1.{i}"}}, api=api)
+
+
+@pytest.fixture
+def dump_files(tmp_path):
+    """Save API dumps of a series of releases, in all formats."""
+    dump_files = []
+    for i, suffix in enumerate((".json", ".json.gz", ".json.bz2", ".json.xz") * 2):
+        dump_files.append(tmp_path / f"m-1.{i}{suffix}")
+        _release(i).save_to_file(dump_files[-1])
+    return dump_files
+
+
+def test_load_many(dump_files):
+    """Test loading many API dumps, sharing their identical entries."""
+    progress = []
+    dumps = APIDump.load_many(
+        map(str, dump_files),
+        max_workers=1,
+        progress=lambda *args: progress.append(args),
+    )
+    assert progress == [(i + 1, 8, f) for i, f in enumerate(dump_files)]
+    for dump, dump_file in zip(dumps, dump_files):
+        expected = APIDump.load_from_file(dump_file)
+        assert dump == expected
+        assert dump.modules == expected.modules
+        assert dump.dump_file == dump_file
+        assert dump._sorted() == expected._sorted()
+
+    # Identical entries, and identical elements of entries, are shared
+    entries = [dict((e, e) for e in dump.api) for dump in dumps]
+    module = (("MODULE", "m"),)
+    assert all(e[module] is entries[0][module] for e in entries)
+    f7 = [e for e in dumps[7].api if e[-1][:2] == ("FUNCTION", "f7")]
+    assert f7[0][0] is entries[0][module][0]
+    assert APIDump.load_many([]) == []
+
+
+def test_load_many_formats(dump_files, tmp_path, monkeypatch):
+    """Test loading many API dumps saved as deltas and as single JSON documents."""
+    delta_file = tmp_path / "delta.json"
+    _release(9).save_to_file(delta_file, base=dump_files[7])
+    document_file = tmp_path / "document.json"
+    dump = _release(10)
+    content = {"modules": dump.modules, "api": sorted(dump.api)}
+    document_file.write_text(json.dumps(content, indent=2))
+
+    # Base dumps of deltas are reused if they were loaded before the delta
+    loaded = []
+    load_from_file = APIDump._load_from_file.__func__
+    monkeypatch.setattr(
+        APIDump,
+        "_load_from_file",
+        classmethod(
+            lambda cls, f, *args: loaded.append(f) or load_from_file(cls, f, *args)
+        ),
+    )
+    dumps = APIDump.load_many([dump_files[7], delta_file, document_file])
+    assert loaded == []
+    assert dumps[1] == _release(9)
+    assert dumps[1]._delta_depth == 1
+    assert dumps[2] == dump
+    dumps = APIDump.load_many([delta_file])
+    assert loaded == [dump_files[7]]
+    assert dumps[0] == _release(9)
+
+    # Truncated files
+    lines = dump_files[0].read_text().splitlines(keepends=True)
+    dump_files[0].write_text("".join(lines[:-1]))
+    with pytest.raises(ValueError, match=f"{dump_files[0]} is truncated"):
+        APIDump.load_many(dump_files)
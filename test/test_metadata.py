@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test distribution metadata index."""
+
+import importlib.metadata
+import sys
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDump, DistributionIndex
+from py_api_dumper.cli import cli
+
+
+@pytest.fixture
+def dist_path(tmp_path):
+    """Create a search path containing some fake distributions."""
+    for name, version, files, top_level in (
+        ("declared-dist", "1.0", [], "decl_mod\n_decl_priv\n"),
+        (
+            "inferred_dist",
+            "2.0",
+            [
+                "inf_pkg/__init__.py",
+                "inf_pkg/sub.py",
+                "inf_mod.py",
+                "inf_ext.cpython-311-x86_64-linux-gnu.so",
+                "inf_data.txt",
+                "__pycache__/inf_mod.cpython-311.pyc",
+                "inferred_dist-2.0.dist-info/METADATA",
+                "../../../bin/inf_script",
+            ],
+            None,
+        ),
+        ("declared-dist", "0.5", [], "shadowed_mod\n"),
+    ):
+        dist_info = tmp_path / f"{name}-{version}.dist-info"
+        if dist_info.exists():
+            dist_info = tmp_path / "shadow" / dist_info.name
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+        )
+        (dist_info / "RECORD").write_text("".join(f"{f},,\n" for f in files))
+        if top_level is not None:
+            (dist_info / "top_level.txt").write_text(top_level)
+    return [str(tmp_path), str(tmp_path / "shadow")]
+
+
+def test_index(dist_path):
+    """Test indexing distributions."""
+    dist_index = DistributionIndex.from_path(dist_path)
+    assert dist_index.lookup("decl_mod") == ("declared-dist", "1.0")
+    assert dist_index.lookup("decl_mod.sub") == ("declared-dist", "1.0")
+    assert dist_index.lookup("shadowed_mod") == (None, None)
+    assert dist_index.lookup("inf_pkg.sub") == ("inferred_dist", "2.0")
+    assert dist_index.lookup("inferred_dist") == ("inferred_dist", "2.0")
+    assert dist_index.lookup("not_a_module") == (None, None)
+    assert dist_index.top_level_modules("Declared_Dist") == ["decl_mod"]
+    assert dist_index.top_level_modules("inferred-dist") == [
+        "inf_pkg",
+        "inf_mod",
+        "inf_ext",
+    ]
+    with pytest.raises(importlib.metadata.PackageNotFoundError):
+        dist_index.top_level_modules("not-a-dist")
+
+
+def test_index_cached(monkeypatch):
+    """Test indexing the current search path once per run."""
+    dist_index = DistributionIndex.cached()
+    assert DistributionIndex.cached() is dist_index
+    monkeypatch.setattr(sys, "path", sys.path + ["not-a-dir"])
+    assert DistributionIndex.cached() is not dist_index
+
+
+def test_index_persist(dist_path, tmp_path):
+    """Test persisting distribution indexes."""
+    cache_file = tmp_path / "cache" / "index.json"
+    cache_file.parent.mkdir()
+    dist_index = DistributionIndex.load(cache_file, dist_path)
+    assert cache_file.is_file()
+    dist_index_2 = DistributionIndex.load(cache_file, dist_path)
+    assert dist_index_2.lookup("decl_mod") == dist_index.lookup("decl_mod")
+    assert dist_index_2._distributions == dist_index._distributions
+    (tmp_path / "new_mod.py").write_text("")
+    dist_index_3 = DistributionIndex.load(cache_file, dist_path)
+    assert dist_index_3._stamps != dist_index._stamps
+
+
+@pytest.fixture
+def installed_dist(tmp_path, monkeypatch):
+    """Install a fake distribution whose name differs from its module name."""
+    (tmp_path / "inst_mod").mkdir()
+    (tmp_path / "inst_mod" / "__init__.py").write_text("x = 1\n")
+    (tmp_path / "inst_mod" / "sub.py").write_text("y = 2\n")
+    dist_info = tmp_path / "installed_dist-3.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: installed-dist\nVersion: 3.0\n"
+    )
+    (dist_info / "RECORD").write_text("inst_mod/__init__.py,,\ninst_mod/sub.py,,\n")
+    monkeypatch.syspath_prepend(tmp_path)
+    for module_name in ("inst_mod", "inst_mod.sub"):
+        monkeypatch.delitem(sys.modules, module_name, raising=False)
+    return "installed-dist"
+
+
+def test_dump_distribution(installed_dist):
+    """Test recording the distribution of a dumped module."""
+    api_dump = APIDump.from_modules("inst_mod")
+    assert api_dump.modules["inst_mod"]["distribution"] == installed_dist
+    assert api_dump.modules["inst_mod"]["version"] == "3.0"
+    api_dump = APIDump.from_modules(api_ref)
+    assert api_dump.modules["api_ref"]["distribution"] is None
+
+
+def test_dump_distribution_cli(installed_dist, tmp_path, capsys):
+    """Test dumping all modules of a distribution using the command-line interface."""
+    api_dump_file = tmp_path / "test_dump.tmp"
+    cache_file = tmp_path / "index.json"
+    cli(
+        "dump",
+        "--dist",
+        installed_dist,
+        "--dist-index-cache",
+        cache_file,
+        "-o",
+        api_dump_file,
+    )
+    assert cache_file.is_file()
+    api_dump = APIDump.load_from_file(api_dump_file)
+    assert api_dump == APIDump.from_modules("inst_mod")
+    assert api_dump.modules["inst_mod"]["version"] == "3.0"
+    cli("dump", "--dist", installed_dist, "-o", api_dump_file)
+    assert api_dump == APIDump.load_from_file(api_dump_file)
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "-o", api_dump_file)
+    assert "no modules to dump" in capsys.readouterr().err
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "--dist", "no-such-dist", "--dist-index-cache", cache_file)
+    assert "distribution no-such-dist is not installed" in capsys.readouterr().err
@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test pytest plugin providing the `api_snapshot` fixture."""
+
+import pytest
+
+from _py_api_dumper_digest import module_digest
+from py_api_dumper import APIDump
+
+TEST_API = """
+def test_api(api_snapshot):
+    api_snapshot("snapmod", "snapsingle")
+"""
+
+
+@pytest.fixture
+def snapshot_pytester(pytester):
+    """Create modules to snapshot, and a test of their API."""
+    pytester.syspathinsert()
+    pkg_dir = pytester.mkpydir("snapmod")
+    (pkg_dir / "__init__.py").write_text("def f(a):\n    pass\n")
+    pytester.makepyfile(snapsingle="X = 1\n")
+    pytester.makepyfile(test_api=TEST_API)
+    pytester.makeini("[pytest]\napi_snapshot_dir = snaps\n")
+    pytester.plugins = ["_py_api_dumper_pytestplugin"]
+    return pytester
+
+
+def _run(pytester, *args):
+
+    # Run pytest in-process; modules imported by each run are removed afterwards
+    return pytester.runpytest_inprocess(*args)
+
+
+def test_pytest_plugin(snapshot_pytester):
+    """Test creating, checking and updating API snapshots."""
+    pytester = snapshot_pytester
+    snapshot_file = pytester.path / "snaps" / "snapmod+snapsingle.json"
+
+    # Missing snapshot fails
+    result = _run(pytester)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*does not exist*--api-snapshot-update*"])
+
+    # Snapshot is created, then matches
+    _run(pytester, "--api-snapshot-update").assert_outcomes(passed=1)
+    assert snapshot_file.is_file()
+    mtime = snapshot_file.stat().st_mtime_ns
+    _run(pytester).assert_outcomes(passed=1)
+    _run(pytester, "--api-snapshot-update").assert_outcomes(passed=1)
+    assert snapshot_file.stat().st_mtime_ns == mtime
+
+    # Changed API fails, showing differences
+    (pytester.path / "snapmod" / "__init__.py").write_text("def f(a, b):\n    pass\n")
+    result = _run(pytester)
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(
+        [
+            "*API of snapmod, snapsingle differs from snapshot*",
+            "+*REQUIRED : 1 : b : no-type",
+        ]
+    )
+
+    # Snapshot is rewritten with changed API
+    _run(pytester, "--api-snapshot-update").assert_outcomes(passed=1)
+    _run(pytester).assert_outcomes(passed=1)
+    snapshot = APIDump.load_from_file(snapshot_file)
+    assert sorted(snapshot.modules) == ["snapmod", "snapsingle"]
+
+
+def test_pytest_plugin_cache(snapshot_pytester, monkeypatch):
+    """Test caching API dumps in the pytest cache directory."""
+    pytester = snapshot_pytester
+    pytester.makepyfile(test_api=TEST_API + """
+def test_api_named(api_snapshot):
+    api_snapshot("snapmod", name="named")
+""")
+    _run(pytester, "--api-snapshot-update").assert_outcomes(passed=2)
+    assert (pytester.path / "snaps" / "named.json").is_file()
+
+    # Dumps are saved in the cache directory
+    _run(pytester, "--api-snapshot-cache").assert_outcomes(passed=2)
+    cache_dir = pytester.path / ".pytest_cache" / "d" / "py-api-dumper"
+    cache_files = sorted(p.name.split("-")[0] for p in cache_dir.glob("*.json"))
+    assert cache_files == ["snapmod", "snapsingle"]
+
+    # Dumps are reused from the cache directory, without dumping modules
+    def from_modules(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr(APIDump, "from_modules", from_modules)
+    _run(pytester, "--api-snapshot-cache").assert_outcomes(passed=2)
+
+
+def test_source_digest(snapshot_pytester):
+    """Test digests of module source files."""
+    pytester = snapshot_pytester
+    digest = module_digest("snapmod")
+    assert module_digest("snapmod.sub") == digest
+    assert module_digest("snapmod", "1.0") != digest
+    assert module_digest("snapsingle") is not None
+    assert module_digest("sys") is None
+    assert module_digest("not_a_module") is None
+    (pytester.path / "snapmod" / "sub.py").write_text("Y = 2\n")
+    assert module_digest("snapmod") != digest
+
+
+def test_pytest_plugin_lazy(pytester, monkeypatch):
+    """Test that registering the plugin does not import `py_api_dumper`."""
+    pytester.makepyfile(test_lazy="""
+import sys
+
+def test_lazy(request):
+    assert request.config.getoption("api_snapshot_update") is False
+    assert "py_api_dumper" not in sys.modules
+""")
+    monkeypatch.setenv("PYTEST_DISABLE_PLUGIN_AUTOLOAD", "1")
+    result = pytester.runpytest_subprocess("-p", "_py_api_dumper_pytestplugin")
+    result.assert_outcomes(passed=1)
@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test dumping installed distributions to shard files."""
+
+import pytest
+
+from py_api_dumper import APIDump, DistributionIndex
+from py_api_dumper.cli import cli
+
+
+@pytest.fixture
+def dist_index(tmp_path, monkeypatch):
+    """Create a search path containing some distributions to dump."""
+    site_dir = tmp_path / "site"
+    for name, version, modules in (
+        (
+            "Good_Dist",
+            "1.0",
+            {"shgood/__init__.py": "def f(a):\n    pass\n", "shsingle.py": "X = 1\n"},
+        ),
+        (
+            "bad-dist",
+            "2.0",
+            {
+                "shbad.py": "raise ImportError('no')\n",
+                "shexit.py": "raise SystemExit(3)\n",
+                "shok.py": "def g():\n    pass\n",
+            },
+        ),
+        ("crash-dist", "0.1", {"shcrash.py": "import os\nos._exit(3)\n"}),
+        ("priv-dist", "0.1", {"_shpriv.py": ""}),
+    ):
+        dist_info = site_dir / f"{name}-{version}.dist-info"
+        dist_info.mkdir(parents=True)
+        (dist_info / "METADATA").write_text(
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+        )
+        (dist_info / "RECORD").write_text("".join(f"{f},,\n" for f in modules))
+        for file_name, content in modules.items():
+            (site_dir / file_name).parent.mkdir(parents=True, exist_ok=True)
+            (site_dir / file_name).write_text(content)
+    monkeypatch.syspath_prepend(site_dir)
+    return DistributionIndex.from_path([str(site_dir)])
+
+
+def test_dump_installed(dist_index, tmp_path):
+    """Test dumping distributions in the current process."""
+    shard_dir = tmp_path / "shards"
+    summary = APIDump.dump_installed(
+        shard_dir, "good-dist", "bad-dist", dist_index=dist_index, max_workers=1
+    )
+    assert [s["distribution"] for s in summary["shards"]] == ["bad-dist", "Good_Dist"]
+    assert summary["errors"] == 2
+    bad, good = summary["shards"]
+    assert bad["errors"] == {
+        "shbad": "ImportError: no",
+        "shexit": "SystemExit: 3",
+    }
+    assert good["errors"] == {}
+    assert good["shard"] == str(shard_dir / "good-dist-1.0.json.gz")
+
+    # Shards are loadable API dumps, which record modules that failed to import
+    shard = APIDump.load_from_file(bad["shard"])
+    assert shard.modules["shbad"]["error"] == "ImportError: no"
+    assert shard.modules["shok"]["distribution"] == "bad-dist"
+    assert len(shard.api) == bad["entries"] > 0
+    shard = APIDump.load_from_file(good["shard"])
+    assert sorted(shard.modules) == ["shgood", "shsingle"]
+    assert len(shard.query("shgood.f.a")) == 1
+
+    # Distributions already dumped are skipped
+    (shard_dir / "bad-dist-2.0.json.gz").unlink()
+    summary = APIDump.dump_installed(
+        shard_dir, "good-dist", "bad-dist", dist_index=dist_index, max_workers=1
+    )
+    assert summary["shards"][0]["errors"] == bad["errors"]
+    assert summary["shards"][1] == {
+        "distribution": "Good_Dist",
+        "version": "1.0",
+        "shard": good["shard"],
+        "skipped": True,
+    }
+    assert sorted(p.name for p in shard_dir.iterdir()) == [
+        "bad-dist-2.0.json.gz",
+        "good-dist-1.0.json.gz",
+    ]
+
+
+def test_dump_installed_workers(dist_index, tmp_path):
+    """Test dumping all distributions in worker processes, some of which crash."""
+    shard_dir = tmp_path / "shards"
+    summary = APIDump.dump_installed(
+        shard_dir, dist_index=dist_index, max_workers=2, max_modules_per_worker=1
+    )
+    assert [s["distribution"] for s in summary["shards"]] == [
+        "bad-dist",
+        "crash-dist",
+        "Good_Dist",
+    ]
+    assert summary["shards"][0]["entries"] > 0
+    assert summary["shards"][1]["errors"] == {"shcrash": "worker process crashed"}
+    assert summary["shards"][2]["errors"] == {}
+    assert summary["errors"] == 3
+    shard = APIDump.load_from_file(shard_dir / "crash-dist-0.1.json.gz")
+    assert shard.modules["shcrash"]["error"] == "worker process crashed"
+
+
+def test_dump_installed_cli(dist_index, tmp_path, monkeypatch, capsys):
+    """Test dumping distributions using the command-line interface."""
+    shard_dir = tmp_path / "shards"
+    monkeypatch.setattr(DistributionIndex, "cached", lambda: dist_index)
+    args = ("dump", "--all-installed", "--shard-dir", shard_dir, "-j", "1")
+    assert cli(*args, "--dist", "good-dist", "--dist", "bad-dist") == 0
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "DISTRIBUTION  ENTRIES  ERRORS",
+        "bad-dist            2  2",
+        "Good_Dist           5  0",
+    ]
+    assert "shbad: ImportError: no" in captured.err
+    cache_file = tmp_path / "dist-index.json"
+    assert cli(*args, "--dist", "good-dist", "--dist-index-cache", cache_file) == 0
+    assert capsys.readouterr().out.splitlines()[1] == "Good_Dist           -  skipped"
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "--all-installed")
+    assert "--all-installed requires --shard-dir" in capsys.readouterr().err
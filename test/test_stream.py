@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test API dump files read from and written to streams."""
+
+import gzip
+import io
+import json
+import subprocess
+import sys
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDiff, APIDump, _load_dump_content
+from py_api_dumper.cli import cli
+
+
+@pytest.fixture
+def api_dump():
+    """Return API dump of `api_ref`."""
+    return APIDump.from_modules(api_ref)
+
+
+def _stdin(data):
+    """Return a standard input stream reading the given bytes."""
+    return io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)), encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    "suffix, magic",
+    [("", b'{"'), (".gz", b"\x1f\x8b"), (".bz2", b"BZh"), (".xz", b"\xfd7zXZ")],
+)
+def test_stream_compression(api_dump, tmp_path, suffix, magic):
+    """Test that compression is chosen by suffix, and detected by magic bytes."""
+    dump_file = tmp_path / f"dump.json{suffix}"
+    api_dump.save_to_file(dump_file)
+    assert dump_file.read_bytes().startswith(magic)
+    assert APIDump.load_from_file(dump_file) == api_dump
+    renamed_file = dump_file.rename(tmp_path / "dump.json")
+    assert APIDump.load_from_file(renamed_file) == api_dump
+
+
+def test_stream_layout(api_dump, tmp_path):
+    """Test the layout of API dump files, with one line per entry."""
+    dump_file = tmp_path / "dump.json"
+    api_dump.save_to_file(dump_file)
+    lines = dump_file.read_text().splitlines()
+    header = json.loads(lines[0])
+    assert header["format"] == 2
+    assert header["entry_lines"] == {"api": len(api_dump.api)}
+    assert [tuple(tuple(e) for e in json.loads(line)) for line in lines[1:]] == (
+        api_dump._sorted()
+    )
+
+    # Dump files saved as a single JSON document are loaded
+    content = {"modules": api_dump.modules, "api": sorted(api_dump.api)}
+    dump_file.write_text(json.dumps(content, indent=2))
+    assert APIDump.load_from_file(dump_file) == api_dump
+
+    # Truncated dump files are not loaded
+    dump_file.write_text("\n".join(lines[:-1]))
+    with pytest.raises(ValueError, match="truncated"):
+        APIDump.load_from_file(dump_file)
+
+    # Dump files in a newer format are not loaded
+    header["format"] = 3
+    dump_file.write_text("\n".join([json.dumps(header)] + lines[1:]))
+    with pytest.raises(ValueError, match="format version 3"):
+        APIDump.load_from_file(dump_file)
+    with pytest.raises(ValueError, match="format version 3"):
+        APIDiff.bisect([dump_file, dump_file], "api_ref.*")
+
+
+def test_stream_unbuffered(api_dump, tmp_path):
+    """Test reading API dumps from binary streams which cannot be peeked at."""
+    dump_file = tmp_path / "dump.json"
+    api_dump.save_to_file(dump_file)
+    for data in (dump_file.read_bytes(), gzip.compress(dump_file.read_bytes())):
+        stream = io.BytesIO(data)
+        content = _load_dump_content(stream)
+        assert set(content["api"]) == api_dump.api
+        assert not stream.closed
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_stream_cli(api_dump, tmp_path, monkeypatch, capsysbinary, compress):
+    """Test reading and writing API dumps and diffs using standard input/output."""
+    old_file = tmp_path / "old.json"
+    api_dump.save_to_file(old_file)
+    monkeypatch.setattr(api_ref, "new1", 42, raising=False)
+
+    # Write API dump to standard output
+    cli("dump", "-o", "-", "api_ref")
+    dump_data = capsysbinary.readouterr().out
+    assert dump_data.startswith(b'{"modules": ')
+    if compress:
+        dump_data = gzip.compress(dump_data)
+
+    # Read API dump from standard input, and write API diff to standard output
+    for args in (("-o", "-"), ("-t", "-o", "-"), ()):
+        monkeypatch.setattr(sys, "stdin", _stdin(dump_data))
+        cli("diff", *args, old_file, "-")
+        diff_data = capsysbinary.readouterr().out
+        if args == ("-o", "-"):
+            diff_json = json.loads(diff_data)
+            assert diff_json["new_dump"] == "-"
+            assert diff_json["added"] == [
+                [["MODULE", "api_ref"], ["MEMBER", "new1", "int"]]
+            ]
+        else:
+            assert diff_data.decode().splitlines()[2:] == [
+                "+MODULE : api_ref",
+                "+\tMEMBER : new1 : int",
+            ]
+    monkeypatch.setattr(sys, "stdin", _stdin(dump_data))
+    api_diff = APIDiff.from_files("-", old_file)
+    assert len(api_diff.removed) == 1 and len(api_diff.added) == 0
+
+    # Write API dump as text to standard output
+    cli("dump", "-t", "-o", "-", "api_ref")
+    assert capsysbinary.readouterr().out.startswith(b"MODULE : api_ref\n")
+
+    # Only one input can be read from standard input
+    with pytest.raises(SystemExit, match="2"):
+        cli("diff", "-", "-")
+    assert b"only one of" in capsysbinary.readouterr().err
+
+
+def test_stream_pipeline(api_dump, tmp_path, request):
+    """Test piping an API dump to an API diff without an intermediate file."""
+    old_file = tmp_path / "old.json.gz"
+    api_dump.save_to_file(old_file)
+    command = "import sys; from py_api_dumper.cli import cli; sys.exit(cli({}))"
+    dump = subprocess.Popen(
+        [sys.executable, "-c", command.format("'dump', '-o', '-', 'api_ref'")],
+        cwd=request.path.parent,
+        stdout=subprocess.PIPE,
+    )
+    diff = subprocess.run(
+        [sys.executable, "-c", command.format(f"'diff', {str(old_file)!r}, '-'")],
+        stdin=dump.stdout,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    dump.stdout.close()
+    assert dump.wait() == 0
+    assert diff.stdout.splitlines() == [f"--- {old_file} ", "+++ - "]
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test suppression rules for API diffs."""
+
+import fnmatch
+import itertools
+
+import pytest
+
+from py_api_dumper import APIDiff, APIDump, SuppressionRules
+from py_api_dumper.cli import cli
+
+
+def test_suppress_match():
+    """Test matching entry paths against suppression rules."""
+    rules = SuppressionRules(
+        [
+            "m.f",
+            "-m.C.*",
+            "+m.C.x",
+            "*.deprecated*",
+            "m.C.[xy]",
+            "m.sub.g?",
+            "m.f",
+        ]
+    )
+    assert rules.match("m.f", "-") == 0
+    assert rules.match("m.f", "+") == 0
+    assert rules.match("m.C.x", "-") == 1
+    assert rules.match("m.C.x", "+") == 2
+    assert rules.match("m.C.y", "+") == 4
+    assert rules.match("m.C", "-") is None
+    assert rules.match("m.C.deprecated_x", "-") == 1
+    assert rules.match("m.C.deprecated_x", "+") == 3
+    assert rules.match("m.sub.g1", "+") == 5
+    assert rules.match("m.sub.g12", "+") is None
+    assert rules.match("m.sub", "+") is None
+    assert rules.match("n.f", "-") is None
+    with pytest.raises(ValueError, match="empty pattern"):
+        SuppressionRules(["m.f", "+"])
+
+
+def test_suppress_match_groups(monkeypatch):
+    """Test matching rules whose translated patterns contain groups of their own."""
+
+    # Patterns with several wildcards are translated with groups on Python 3.10;
+    # emulate that on any version
+    translate = fnmatch.translate
+    groups = itertools.count()
+    monkeypatch.setattr(
+        fnmatch,
+        "translate",
+        lambda pattern: f"(?:(?P<g{next(groups)}>){translate(pattern)})",
+    )
+    rules = SuppressionRules(["pkg.a*b*c", "pkg.x*", "pkg.*y*z*", "pkg.x*z"])
+    assert rules.match("pkg.xyz", "-") == 1
+    assert rules.match("pkg.ayz", "-") == 2
+    assert rules.match("pkg.a1b2c", "+") == 0
+    assert rules.match("pkg.a1b2", "+") is None
+
+
+def test_suppress_from_file(tmp_path):
+    """Test reading suppression rules from a file."""
+    rules_file = tmp_path / "rules.txt"
+    rules_file.write_text("# known changes\n\nm.f\n  -m.C.*  \n")
+    rules = SuppressionRules.from_file(rules_file)
+    assert rules.rules == ["m.f", "-m.C.*"]
+
+
+def test_diff_suppress(tmp_path, capfd):
+    """Test API diff with suppressed entries."""
+    old = APIDump(
+        modules={},
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("CLASS", "A")),
+            (("MODULE", "m"), ("CLASS", "A"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("MEMBER", "old", "int")),
+        },
+    )
+    new = APIDump(
+        modules={},
+        api={
+            (("MODULE", "m"),),
+            (("MODULE", "m"), ("CLASS", "B")),
+            (("MODULE", "m"), ("CLASS", "B"), ("MEMBER", "x", "int")),
+            (("MODULE", "m"), ("MEMBER", "new", "int")),
+        },
+    )
+    rules = SuppressionRules(["-m.old", "+m.B*", "m.gone"])
+    api_diff = APIDiff(old, new, suppress=rules, detect_moves=True)
+    assert api_diff.removed == {
+        (("MODULE", "m"), ("CLASS", "A")),
+        (("MODULE", "m"), ("CLASS", "A"), ("MEMBER", "x", "int")),
+    }
+    assert api_diff.added == {(("MODULE", "m"), ("MEMBER", "new", "int"))}
+    assert api_diff.renamed == set()
+    assert api_diff.suppressed == [("-m.old", 1), ("+m.B*", 2), ("m.gone", 0)]
+    assert APIDiff(old, new).suppressed == []
+    assert APIDiff(old, new, suppress=SuppressionRules(["m.*"])).equal()
+
+    # Suppress entries using the command-line interface
+    old.save_to_file(tmp_path / "old.json")
+    new.save_to_file(tmp_path / "new.json")
+    rules_file = tmp_path / "rules.txt"
+    rules_file.write_text("\n".join(rules.rules))
+    args = ("diff", tmp_path / "old.json", tmp_path / "new.json")
+    capfd.readouterr()
+    assert cli(*args, "--suppress", rules_file) == 0
+    out, err = capfd.readouterr()
+    assert out.splitlines()[2:] == [
+        "-MODULE : m",
+        "-\tCLASS : A",
+        "-\t\tMEMBER : x : int",
+        "+MODULE : m",
+        "+\tMEMBER : new : int",
+    ]
+    assert err.splitlines() == [
+        "suppressed 1 entries: -m.old",
+        "suppressed 2 entries: +m.B*",
+        "warning: stale suppression rule: m.gone",
+    ]
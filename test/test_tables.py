@@ -0,0 +1,200 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test compacting tables of members in API dumps."""
+
+import json
+import sys
+
+import pytest
+
+from py_api_dumper import APIDiff, APIDump
+from py_api_dumper.cli import cli
+
+_TBL_MOD = """
+import enum
+
+class Colour(enum.Enum):
+    RED = 1
+    GREEN = 2
+    BLUE = 3
+
+name = "table"
+{constants}
+"""
+
+
+@pytest.fixture
+def dumps(tmp_path, monkeypatch):
+    """Dump two versions of a module with tables, compacted and not."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    dumps = []
+    for constants in (["A", "B", "C", "D", "E"], ["A", "C", "D", "E", "F"]):
+        text = _TBL_MOD.format(constants="\n".join(f"GL_{c} = 1" for c in constants))
+        (tmp_path / "tbl_mod.py").write_text(text)
+        sys.modules.pop("tbl_mod", None)
+        dumps.append(
+            (
+                APIDump.from_modules("tbl_mod"),
+                APIDump.from_modules("tbl_mod", compact_tables=3),
+            )
+        )
+    yield dumps
+    sys.modules.pop("tbl_mod", None)
+
+
+def _table(dump, prefix, member_type):
+    """Return the table entry of members of a type, and the names of its members."""
+    (entry,) = [e for e in dump.api if e[:-1] == prefix and e[-1][0] == "MEMBERS"]
+    assert entry[-1][:2] == ("MEMBERS", member_type)
+    return entry, dump.tables[entry[-1][3]]
+
+
+def test_compact_tables(dumps):
+    """Test dumping tables of members as single entries."""
+    (full, compact), _ = dumps
+    module = (("MODULE", "tbl_mod"),)
+    entry, names = _table(compact, module, "int")
+    assert names == ["GL_A", "GL_B", "GL_C", "GL_D", "GL_E"]
+    assert entry[-1][2] == 5
+    entry, names = _table(compact, module + (("CLASS", "Colour"),), "Colour")
+    assert names == ["BLUE", "GREEN", "RED"]
+    assert module + (("MEMBER", "name", "str"),) in compact.api
+    assert len(compact.api) == len(full.api) - 6
+    assert full.tables == {}
+
+    # Tables are expanded to their members
+    assert compact.expand_tables() == full
+    assert compact.expand_tables().tables == {}
+    assert full.expand_tables() == full
+
+    # Tables whose names are unknown are re-derived from the live module, if their
+    # digests match, and otherwise are not expanded
+    unknown = APIDump(modules={}, api=frozenset([entry]))
+    assert len(unknown.expand_tables().api) == 3
+    for prefix, digest in ((entry[:-1], "0" * 32), ((("MODULE", "no_mod"),), "")):
+        unknown = APIDump(
+            modules={}, api=frozenset([prefix + (entry[-1][:3] + (digest,),)])
+        )
+        assert unknown.expand_tables() == unknown
+
+    # Set operations keep the tables of members
+    assert (compact | full).tables == compact.tables
+    assert (compact & full).tables == compact.tables
+    assert len((compact - full).expand_tables().api) == 8
+    assert compact.restrict_to("tbl_mod").tables == compact.tables
+
+
+def test_compact_tables_files(dumps, tmp_path):
+    """Test saving and loading tables of members."""
+    (_, old), (_, new) = dumps
+    old_file = tmp_path / "old.json"
+    old.save_to_file(old_file)
+    header = json.loads(old_file.read_text().splitlines()[0])
+    assert "tables" not in header
+    assert APIDump.load_from_file(old_file).tables == {}
+
+    # Names of tables are saved to a separate file, if requested
+    old.save_to_file(old_file, tables_file=tmp_path / "old.tables.gz")
+    header = json.loads(old_file.read_text().splitlines()[0])
+    assert header["tables_file"] == "old.tables.gz"
+    loaded = APIDump.load_from_file(old_file)
+    assert loaded == old
+    assert loaded.tables == old.tables
+    (tmp_path / "old.tables.gz").unlink()
+    assert APIDump.load_from_file(old_file).tables == {}
+
+    # Deltas save the tables of removed and added entries
+    old.save_to_file(old_file, tables_file=tmp_path / "old.tables")
+    loaded = APIDump.load_from_file(old_file)
+    new_file = tmp_path / "new.json"
+    new.save_to_file(new_file, base=loaded, tables_file=tmp_path / "new.tables")
+    assert len(json.loads((tmp_path / "new.tables").read_text())) == 2
+    loaded = APIDump.load_from_file(new_file)
+    assert loaded.expand_tables() == new.expand_tables()
+    diff = APIDiff.from_delta(new_file, expand_tables=True)
+    assert [e[-1][1] for e in diff.removed] == ["GL_B"]
+    assert [e[-1][1] for e in diff.added] == ["GL_F"]
+
+
+def test_diff_tables(dumps, tmp_path):
+    """Test comparing the members of tables which differ."""
+    (old_full, old), (new_full, new) = dumps
+    diff = APIDiff(old, new)
+    assert [e[-1][0] for e in diff.removed] == ["MEMBERS"]
+    assert [e[-1][0] for e in diff.added] == ["MEMBERS"]
+    expected = APIDiff(old_full, new_full)
+    assert expected.removed == {(("MODULE", "tbl_mod"), ("MEMBER", "GL_B", "int"))}
+    assert expected.added == {(("MODULE", "tbl_mod"), ("MEMBER", "GL_F", "int"))}
+    for old_dump, new_dump in ((old, new), (old_full, new), (old, new_full)):
+        diff = APIDiff(old_dump, new_dump, expand_tables=True)
+        assert (diff.removed, diff.added) == (expected.removed, expected.added)
+    assert APIDiff(old, old_full, expand_tables=True).equal
+
+    # Dumps compared in columnar form
+    # - names of the new tables are re-derived from the live module
+    old_file, new_file = tmp_path / "old.json", tmp_path / "new.json"
+    old.save_to_file(old_file, tables_file=tmp_path / "old.tables")
+    new.save_to_file(new_file)
+    diff = APIDiff.from_files(old_file, new_file, engine="numpy", expand_tables=True)
+    assert (diff.removed, diff.added) == (expected.removed, expected.added)
+
+
+def test_tables_cli(dumps, tmp_path, capsys):
+    """Test compacting and expanding tables using the command-line interface."""
+    (_, old), (_, new) = dumps
+    old_file, new_file = tmp_path / "old.json", tmp_path / "new.json"
+    old.save_to_file(old_file, tables_file=tmp_path / "old.tables")
+    cli("dump", "tbl_mod", "--compact-tables", "3", "-o", new_file)
+    assert APIDump.load_from_file(new_file) == new
+    assert APIDump.load_from_file(new_file).tables == {}
+    tables_file = tmp_path / "new.tables"
+    cli("dump", "tbl_mod", "--compact-tables", "3", "--tables-file", tables_file)
+    assert not tables_file.exists()
+    cli(
+        "dump",
+        "tbl_mod",
+        "--compact-tables",
+        "3",
+        "--tables-file",
+        tables_file,
+        "-o",
+        new_file,
+    )
+    assert APIDump.load_from_file(new_file).tables == new.tables
+    cli("dump", "tbl_mod", "--compact-tables", "-o", new_file)
+    assert APIDump.load_from_file(new_file) == new.expand_tables()
+    new.save_to_file(new_file)
+    capsys.readouterr()
+    cli("diff", "--expand-tables", old_file, new_file)
+    out, _ = capsys.readouterr()
+    assert out.splitlines()[2:] == [
+        "-MODULE : tbl_mod",
+        "-\tMEMBER : GL_B : int",
+        "+MODULE : tbl_mod",
+        "+\tMEMBER : GL_F : int",
+    ]
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "--all-installed", "--compact-tables", "3")
+    assert "--compact-tables is not supported" in capsys.readouterr().err
+
+
+def test_check_tables(dumps, tmp_path):
+    """Test checking modules against a baseline with compacted tables."""
+    (_, old), (_, new) = dumps
+    old_file = tmp_path / "old.json"
+    old.save_to_file(old_file)
+    header = json.loads(old_file.read_text().splitlines()[0])
+    assert header["compact_tables"] == 3
+    assert APIDump.load_from_file(old_file)._compact_threshold == 3
+
+    # The module is dumped as `new`, with its tables compacted as in the baseline
+    differences = APIDump.check(old_file, "tbl_mod", max_differences=None)
+    assert sorted(differences) == sorted(
+        [("-", e) for e in old.api - new.api] + [("+", e) for e in new.api - old.api]
+    )
+    assert [e[-1][:3] for _, e in differences] == [("MEMBERS", "int", 5)] * 2
+    new.save_to_file(old_file)
+    assert APIDump.check(old_file, "tbl_mod", max_differences=None) == []
+    assert APIDump.check(new.expand_tables(), "tbl_mod") == []
@@ -0,0 +1,129 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test restricting API dumps to the APIs used by a consumer codebase."""
+
+import pytest
+
+import py_api_dumper.usage
+from py_api_dumper import APIDump, DistributionIndex, UsedNames
+from py_api_dumper.cli import cli
+
+_CONSUMER = """
+import os.path
+import api_ref
+import api_ref.pub_mod as pm
+from api_ref import F1, v1 as value
+from api_ref.ext_mod import *
+from . import sibling
+from .sibling import helper
+
+def main():
+    os.path.join("a", "b")
+    api_ref.F2(1, 2)
+    pm.C1.M1(None, 3)
+    value + F1(2)
+    (lambda: None)().attr
+    unbound.name
+"""
+
+
+@pytest.fixture
+def consumer_dir(tmp_path):
+    """Create a consumer codebase which uses the API of `api_ref`."""
+    consumer_dir = tmp_path / "consumer"
+    (consumer_dir / "pkg").mkdir(parents=True)
+    (consumer_dir / "pkg" / "main.py").write_text(_CONSUMER)
+    (consumer_dir / "pkg" / "broken.py").write_text("import api_ref.\n")
+    (consumer_dir / "pkg" / "data.txt").write_text("import other_mod\n")
+    return consumer_dir
+
+
+def test_used_names(consumer_dir):
+    """Test scanning a consumer codebase for the names of the APIs it uses."""
+    used_names = UsedNames.from_paths(consumer_dir, consumer_dir / "missing.py")
+    assert used_names.names == {
+        "os.path",
+        "os.path.join",
+        "api_ref",
+        "api_ref.F1",
+        "api_ref.F2",
+        "api_ref.v1",
+        "api_ref.pub_mod",
+        "api_ref.pub_mod.C1.M1",
+        "api_ref.ext_mod.*",
+    }
+    assert used_names.top_level_modules() == ["api_ref", "os"]
+    assert UsedNames.from_paths(consumer_dir / "pkg" / "broken.py").names == set()
+
+
+def test_used_names_parallel(tmp_path, monkeypatch):
+    """Test scanning a consumer codebase in parallel worker processes."""
+    monkeypatch.setattr(py_api_dumper.usage, "_FILES_PER_TASK", 2)
+    for i in range(5):
+        (tmp_path / f"mod{i}.py").write_text(f"import api_ref\napi_ref.F{i}()\n")
+    expected = {"api_ref"} | {f"api_ref.F{i}" for i in range(5)}
+    assert UsedNames.from_paths(tmp_path, max_workers=2).names == expected
+    assert UsedNames.from_paths(tmp_path, max_workers=1).names == expected
+
+
+def test_dump_used_names(consumer_dir, monkeypatch):
+    """Test dumping only the APIs used by a consumer codebase."""
+    imported = []
+    import_module = APIDump._import_module
+    monkeypatch.setattr(
+        APIDump,
+        "_import_module",
+        staticmethod(lambda name: imported.append(name) or import_module(name)),
+    )
+    used_names = UsedNames.from_paths(consumer_dir)
+    api_dump = APIDump.from_modules("api_ref", used_names=used_names)
+    full_dump = APIDump.from_modules("api_ref")
+
+    # Used names have all of their entries, and enclosing names only their own
+    for name in ("api_ref.F1", "api_ref.F2", "api_ref.pub_mod.C1.M1"):
+        assert api_dump.query(name + "*") == full_dump.query(name + "*")
+    assert api_dump.query("api_ref.v1") == full_dump.query("api_ref.v1")
+    assert len(api_dump.query("api_ref.pub_mod.C1")) == 1
+    assert api_dump.query("api_ref.F4*") == []
+    assert api_dump.query("api_ref.pub_mod.C1.f1") == []
+    assert api_dump.query("api_ref.C1*") == []
+    assert 0 < len(api_dump.api) < len(full_dump.api)
+
+    # All entries of modules imported by `*`
+    assert api_dump.query("api_ref.ext_mod*") == full_dump.query("api_ref.ext_mod*")
+    assert imported == ["api_ref", "api_ref.ext_mod", "api_ref.pub_mod"] * 2
+
+    # No unused submodules, or names which are not submodules, are imported
+    used_names = UsedNames(["api_ref.pub_mod.C1.M1", "api_ref.nomod.x", "api_ref.F1.x"])
+    imported.clear()
+    api_dump = APIDump.from_modules("api_ref", used_names=used_names)
+    assert imported == ["api_ref", "api_ref.pub_mod"]
+    assert api_dump.query("api_ref.F1*") == full_dump.query("api_ref.F1*")
+    assert api_dump.query("api_ref.v1") == []
+
+
+def test_dump_used_names_cli(consumer_dir, tmp_path, monkeypatch, capsys):
+    """Test dumping the APIs used by a consumer codebase using the command-line interface."""
+    api_dump_file = tmp_path / "dump.json"
+    used_names = UsedNames.from_paths(consumer_dir)
+    expected = APIDump.from_modules("api_ref", used_names=used_names)
+    cli("dump", "api_ref", "--used-by", consumer_dir, "-o", api_dump_file)
+    assert APIDump.load_from_file(api_dump_file) == expected
+
+    # Default to the installed modules which are used
+    dist_info = tmp_path / "api_ref-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: api_ref\n")
+    (dist_info / "top_level.txt").write_text("api_ref\n")
+    dist_index = DistributionIndex.from_path([str(tmp_path)])
+    monkeypatch.setattr(DistributionIndex, "cached", lambda: dist_index)
+    cli("dump", "--used-by", consumer_dir, "-o", api_dump_file)
+    assert APIDump.load_from_file(api_dump_file) == expected
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "--used-by", consumer_dir / "pkg" / "broken.py")
+    assert "no modules to dump" in capsys.readouterr().err
+    with pytest.raises(SystemExit, match="2"):
+        cli("dump", "--all-installed", "--used-by", consumer_dir)
+    assert "--used-by is not supported" in capsys.readouterr().err
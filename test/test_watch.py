@@ -0,0 +1,188 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test watching modules for API changes."""
+
+import sys
+import threading
+
+import pytest
+
+import py_api_dumper.watch
+from py_api_dumper import APIDump
+from py_api_dumper.cli import cli
+from py_api_dumper.watch import APIWatch, _dump_modules_main
+
+
+@pytest.fixture
+def watched_pkg(tmp_path, monkeypatch):
+    """Create a package to watch."""
+    pkg_dir = tmp_path / "wpkg"
+    pkg_dir.mkdir()
+    for name, content in (
+        ("__init__.py", "from .core import f\n"),
+        ("core.py", "def f(a):\n    pass\n"),
+        ("user.py", "from .core import f\nclass U:\n    def m(self): pass\n"),
+        ("other.py", "def g():\n    pass\n"),
+        ("_priv.py", ""),
+    ):
+        (pkg_dir / name).write_text(content)
+    (tmp_path / "wsingle.py").write_text("def s(x):\n    pass\n")
+    monkeypatch.syspath_prepend(tmp_path)
+    yield pkg_dir
+    sys.modules.pop("wsingle", None)
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "poll"])
+def use_inotify(request):
+    """Watch with inotify or by polling."""
+    return request.param
+
+
+def test_watch_update(watched_pkg, use_inotify):
+    """Test re-dumping modules affected by changed files."""
+    with APIWatch("wpkg", use_inotify=use_inotify) as watch:
+        assert watch.root == watched_pkg
+        assert watch.current == watch.baseline
+        assert len(watch.current.query("wpkg.other.g")) == 1
+
+        # Changing a module re-dumps it and the modules which import it
+        core = watched_pkg / "core.py"
+        core.write_text("def f(a, b):\n    pass\n")
+        affected, diff = watch.update({core})
+        assert affected == ["wpkg", "wpkg.core", "wpkg.user"]
+        assert [e[-1][:3] for e in diff.added] == [("REQUIRED", 1, "b")]
+        assert diff.removed == frozenset()
+
+        # Removing and adding modules
+        (watched_pkg / "other.py").unlink()
+        (watched_pkg / "new.py").write_text("def h():\n    pass\n")
+        affected, diff = watch.update(
+            {watched_pkg / "other.py", watched_pkg / "new.py"}
+        )
+        assert affected == ["wpkg.new", "wpkg.other"]
+        assert len(diff.removed) == 2
+        assert len(diff.added) == 2
+        assert watch.current.query("wpkg.other*") == []
+
+        # Nothing is re-dumped if no public module is affected
+        watch._dump_in_subprocess = None
+        (watched_pkg / "_priv.py").write_text("x = 1\n")
+        affected, diff = watch.update(
+            {watched_pkg / "_priv.py", watched_pkg / "notes.txt"}
+        )
+        assert affected == []
+        assert diff.equal
+        del watch._dump_in_subprocess
+
+        # Modules which fail to import are reported
+        core.write_text("def f(a, b:\n")
+        with pytest.raises(RuntimeError, match="SyntaxError"):
+            watch.update({core})
+
+
+def test_watch_changed_files(watched_pkg, use_inotify):
+    """Test waiting for changed files."""
+    with APIWatch(
+        "wpkg", use_inotify=use_inotify, debounce=0.1, poll_interval=0.05
+    ) as watch:
+
+        def edit():
+            (watched_pkg / "core.py").write_text("def f(a, b):\n    pass\n")
+            (watched_pkg / "sub").mkdir()
+            (watched_pkg / "sub" / "__init__.py").write_text("")
+            (watched_pkg / "notes.txt").write_text("")
+
+        timer = threading.Timer(0.1, edit)
+        timer.start()
+        changed = set()
+        for changed_files in watch.changed_files():
+            changed |= changed_files
+            if watched_pkg / "sub" / "__init__.py" in changed:
+                break
+        timer.join()
+        assert changed == {watched_pkg / "core.py", watched_pkg / "sub" / "__init__.py"}
+
+
+def test_watch_debounce(watched_pkg):
+    """Test that bursts of changes are debounced."""
+    core, user = watched_pkg / "core.py", watched_pkg / "user.py"
+    polled = iter([set(), {core}, {user}, set()])
+    with APIWatch("wpkg", use_inotify=False) as watch:
+        watch._watcher.poll = lambda timeout: next(polled)
+        assert next(watch.changed_files()) == {core, user}
+
+
+def test_watch_removed_dir(watched_pkg):
+    """Test watching with inotify while directories are removed."""
+    (watched_pkg / "data").mkdir()
+    with APIWatch("wpkg", use_inotify=True) as watch:
+        (watched_pkg / "data").rmdir()
+        assert watch._watcher.poll(1.0) | watch._watcher.poll(0.1) == set()
+        assert list(py_api_dumper.watch._walk_dirs(watched_pkg / "data")) == [
+            watched_pkg / "data"
+        ]
+
+
+def test_watch_single_module(watched_pkg, tmp_path, use_inotify):
+    """Test watching a module which is not a package, against a baseline."""
+    baseline_file = tmp_path / "baseline.json"
+    _dump_modules_main([str(baseline_file), "wsingle"])
+    baseline = APIDump.load_from_file(baseline_file)
+    module_file = tmp_path / "wsingle.py"
+    module_file.write_text("def s(x, y):\n    pass\n")
+    with APIWatch(
+        "wsingle", baseline_file, use_inotify=use_inotify, poll_interval=0.05
+    ) as watch:
+        assert watch.root == module_file
+        assert watch.baseline == baseline
+
+        # Only the module file is watched, not the other files in its directory
+        (tmp_path / "wother.py").write_text("")
+        (watched_pkg / "core.py").write_text("def f(a, b):\n    pass\n")
+        assert watch._watcher.poll(0.2) == set()
+        module_file.unlink()
+        assert watch._watcher.poll(0.2) == {module_file}
+        module_file.write_text("def s(x, y):\n    pass\n")
+        assert watch._watcher.poll(0.2) == {module_file}
+        affected, diff = watch.update({module_file})
+        assert affected == ["wsingle"]
+        assert len(diff.added) == 1
+    with APIWatch("wsingle", baseline) as watch:
+        assert watch.baseline is baseline
+
+
+def test_watch_errors(watched_pkg, monkeypatch):
+    """Test errors in watching modules."""
+    with pytest.raises(ValueError):
+        APIWatch("not_a_module")
+    with pytest.raises(ValueError):
+        APIWatch("sys")
+    monkeypatch.setattr(py_api_dumper.watch, "_load_libc_inotify", lambda: None)
+    with pytest.raises(ValueError):
+        APIWatch("wpkg", use_inotify=True)
+    with APIWatch("wpkg") as watch:
+        assert isinstance(watch._watcher, py_api_dumper.watch._PollingWatcher)
+
+
+def test_watch_cli(watched_pkg, monkeypatch, capsys):
+    """Test watching modules using the command-line interface."""
+    core = watched_pkg / "core.py"
+
+    def changed_files(self):
+        yield {watched_pkg / "_priv.py"}
+        core.write_text("def f(a, b:\n")
+        yield {core}
+        core.write_text("def f(a, b):\n    pass\n")
+        yield {core}
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(APIWatch, "changed_files", changed_files)
+    assert cli("watch", "--poll", "wpkg") == 0
+    captured = capsys.readouterr()
+    assert "SyntaxError" in captured.err
+    lines = captured.out.splitlines()
+    assert lines[0].endswith("re-dumped wpkg wpkg.core wpkg.user")
+    assert lines[-1] == "+\t\t\tREQUIRED : 1 : b : no-type"
+    assert "wpkg" not in sys.modules
@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: 2026 Karl Wette
+#
+# SPDX-License-Identifier: MIT
+
+"""Test dumping APIs from wheel files."""
+
+import sys
+import zipfile
+from pathlib import Path
+
+import api_ref
+import pytest
+
+from py_api_dumper import APIDump, WheelImporter
+from py_api_dumper.cli import cli
+
+
+def _make_wheel(wheel_file, files):
+    """Create a wheel file for distribution `whl-dist` containing some files."""
+    dist_info = "whl_dist-1.2.dist-info"
+    files = dict(files)
+    files[f"{dist_info}/METADATA"] = (
+        "Metadata-Version: 2.1\nName: whl-dist\nVersion: 1.2\n"
+    )
+    files[f"{dist_info}/RECORD"] = "".join(f"{f},,\n" for f in files)
+    with zipfile.ZipFile(wheel_file, "w") as wheel:
+        for name, content in files.items():
+            wheel.writestr(name, content)
+    return wheel_file
+
+
+@pytest.fixture
+def pure_wheel(tmp_path):
+    """Create a pure-Python wheel file."""
+    return _make_wheel(
+        tmp_path / "whl_dist-1.2-py3-none-any.whl",
+        {
+            "whl_mod/__init__.py": "__version__ = '0.0'\ndef f(a, b=1): pass\n",
+            "whl_mod/sub.py": "class C:\n    x = 1\n",
+            "_whl_priv.py": "",
+        },
+    )
+
+
+@pytest.fixture
+def ext_wheel(tmp_path):
+    """Create a wheel file containing an extension module."""
+    ext_mod_file = next(Path(api_ref.__file__).parent.glob("ext_mod.*.so"))
+    return _make_wheel(
+        tmp_path / "whl_dist-1.2-cp3-cp3-linux.whl",
+        {
+            "whl_mod/__init__.py": "",
+            f"whl_mod/{ext_mod_file.name}": ext_mod_file.read_bytes(),
+        },
+    )
+
+
+def test_dump_pure_wheel(pure_wheel, monkeypatch):
+    """Test dumping a pure-Python wheel directly from the archive."""
+    monkeypatch.setitem(sys.modules, "whl_mod", api_ref)
+    api_dump = APIDump.from_wheel(pure_wheel)
+    assert sys.modules["whl_mod"] is api_ref
+    assert "whl_mod.sub" not in sys.modules
+    assert set(api_dump.modules) == {"whl_mod"}
+    assert api_dump.modules["whl_mod"]["distribution"] == "whl-dist"
+    assert api_dump.modules["whl_mod"]["version"] == "1.2"
+    assert api_dump.modules["whl_mod"]["path"].startswith(str(pure_wheel))
+    assert len(api_dump.query("whl_mod.f.*")) == 2
+    assert len(api_dump.query("whl_mod.sub.C.x")) == 1
+    api_dump_sub = APIDump.from_wheel(pure_wheel, "whl_mod.sub")
+    assert set(api_dump_sub.modules) == {"whl_mod.sub"}
+
+
+def test_dump_ext_wheel(ext_wheel, tmp_path):
+    """Test dumping a wheel containing an extension module."""
+    api_dump = APIDump.from_wheel(ext_wheel)
+    assert api_dump.query("whl_mod.ext_mod.do_task") != []
+    assert api_dump.modules["whl_mod"]["version"] == "1.2"
+
+    # Extracted wheel is cached by hash, and reused
+    cache_dir = tmp_path / "cache"
+    with WheelImporter(ext_wheel, cache_dir) as importer:
+        assert importer.path.parent == cache_dir
+        assert importer.modules == ["whl_mod"]
+    (importer.path / "marker").write_text("")
+    with WheelImporter(ext_wheel, cache_dir) as importer_2:
+        assert (importer_2.path / "marker").is_file()
+    assert APIDump.from_wheel(ext_wheel, cache_dir=cache_dir) == api_dump
+
+
+def test_dump_not_wheel(tmp_path):
+    """Test dumping from a file which is not a wheel."""
+    with zipfile.ZipFile(tmp_path / "not.whl", "w") as wheel:
+        wheel.writestr("mod.py", "")
+    with pytest.raises(ValueError):
+        APIDump.from_wheel(tmp_path / "not.whl")
+
+
+def test_dump_wheel_cli(ext_wheel, tmp_path, monkeypatch):
+    """Test dumping a wheel using the command-line interface."""
+    api_dump_file = tmp_path / "test_dump.json"
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+    cli("dump", "--wheel", ext_wheel, "-o", api_dump_file)
+    assert len(list((cache_dir / "py-api-dumper" / "wheels").iterdir())) == 1
+    api_dump = APIDump.load_from_file(api_dump_file)
+    assert api_dump == APIDump.from_wheel(ext_wheel)
+    cli(
+        "dump",
+        "--wheel",
+        ext_wheel,
+        "--wheel-cache",
+        cache_dir,
+        "-o",
+        api_dump_file,
+        "whl_mod.ext_mod",
+    )
+    assert len(list(cache_dir.iterdir())) == 2
+    assert set(APIDump.load_from_file(api_dump_file).modules) == {"whl_mod.ext_mod"}